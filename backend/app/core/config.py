@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from typing import List
 from functools import lru_cache
+from pathlib import Path
 import os
 from dotenv import load_dotenv
 
@@ -22,11 +23,25 @@ class Settings(BaseSettings):
         "DATABASE_URL",
         "sqlite:///./test.db"
     )
-    
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 1800  # seconds before a pooled connection is replaced
+    DB_ECHO: bool = False
+
     # File uploads
     MAX_UPLOAD_SIZE: int = 52428800  # 50MB
     UPLOAD_DIR: str = "./uploads"
     ALLOWED_EXTENSIONS: set = {"pdf", "docx"}
+    BULK_MAX_FILES: int = 10000  # per bulk request, archives included
+    BULK_BATCH_SIZE: int = 64  # documents extracted/processed/embedded together
+    BULK_BUSY_RETRIES: int = 3  # waits for a saturated worker pool before a batch is rejected
+    
+    # PDF text extraction
+    PDF_BACKEND: str = "auto"  # "auto", "pdfium", "pdfminer" or "pdfplumber"
+    PDF_MAX_PAGES: int = 0  # 0 = all; set to read only the first pages of long documents
+    PDF_MAX_CHARS: int = 500000  # 0 = unlimited
+    PDF_PARALLEL_WORKERS: int = 4  # processes for page-parallel extraction; <2 disables (always off in pool workers)
+    PDF_PARALLEL_MIN_PAGES: int = 32  # shorter documents are read sequentially
     
     # CORS
     CORS_ORIGINS: List[str] = [
@@ -37,10 +52,89 @@ class Settings(BaseSettings):
     
     # NLP/ML models
     SPACY_MODEL: str = "en_core_web_sm"
+    SPACY_BATCH_SIZE: int = 32
+    SPACY_N_PROCESS: int = 1  # >1 spreads nlp.pipe batches across processes
     SBERT_MODEL: str = "all-MiniLM-L6-v2"
+    # "torch" (sentence-transformers) or "onnx" (onnxruntime on CPU, exported by
+    # `python -m app.services.onnx_encoder`; needs onnxruntime and tokenizers)
+    EMBEDDING_BACKEND: str = "torch"
+    ONNX_MODEL_DIR: str = "./models/onnx"
+    ONNX_QUANTIZED: bool = True  # int8 dynamically quantized weights
+    ONNX_INTRA_OP_THREADS: int = 0  # threads inside one operator; 0 = one per core
+    ONNX_INTER_OP_THREADS: int = 1  # operators run concurrently; 1 = sequential
+    # "lazy": load on first use; "background": start serving, load right after startup;
+    # "preload": load at import, before gunicorn --preload forks workers (shared copy-on-write)
+    MODEL_LOADING: str = "background"
+    SKILLS_TAXONOMY_PATH: str = str(Path(__file__).resolve().parent.parent / "data" / "skill_taxonomy.json")
+    
+    # Worker pool for CPU-bound extraction, NLP and inference
+    WORKER_POOL_KIND: str = "thread"  # "thread" or "process"
+    WORKER_POOL_SIZE: int = os.cpu_count() or 4
+    WORKER_QUEUE_DEPTH: int = 32  # waiting tasks allowed before answering 429
+    RANK_SHARDS: int = 0  # >1: /match/rank scatters over this many processes, each holding a shard of resumes
+    
+    # Encoder calls from concurrent requests are coalesced into one batch
+    INFERENCE_MAX_BATCH_SIZE: int = 64  # texts waiting before a batch leaves early
+    INFERENCE_MAX_WAIT_MS: float = 5.0  # longest a request waits for others; 0 = no batching
+    
+    # Background ingestion queue (SQLite, survives restarts)
+    INGEST_QUEUE_PATH: str = "./ingestion.db"
+    INGEST_EXTRACT_WORKERS: int = 2
+    INGEST_NLP_WORKERS: int = 2
+    INGEST_EMBED_WORKERS: int = 1
+    INGEST_PERSIST_WORKERS: int = 1
+    INGEST_MAX_ATTEMPTS: int = 3
+    INGEST_POLL_INTERVAL: float = 0.5  # seconds an idle worker waits before re-polling
+    INGEST_LEASE_SECONDS: float = 60.0  # a claimed job without a heartbeat for this long is taken over
+    
+    # Derived artifacts of uploaded files, keyed by content hash
+    ARTIFACT_CACHE_DIR: str = "./artifacts"
+    
+    # Long documents are embedded as sentence-aligned chunks
+    EMBED_CHUNK_WORDS: int = 120  # fits the encoder's 256 word-piece window
+    EMBED_MAX_CHUNKS: int = 32  # per document, bounds encoding cost
+    # "pooled" or "max_sim" over chunks; max_sim keeps every resume's chunk
+    # embeddings in each process and scans all of them per ranking
+    SIMILARITY_MODE: str = "pooled"
     
+    # Embedding cache
+    EMBEDDING_CACHE_DIR: str = "./embeddings"
+    EMBEDDING_CACHE_SIZE: int = 10000  # in-process LRU entries
+    
+    # Approximate nearest-neighbour index over resume embeddings
+    VECTOR_INDEX_PATH: str = "./embeddings/resume_index.npz"
+    ANN_N_LISTS: int = 0  # 0 = 4 * sqrt(n) at training time
+    ANN_NPROBE: int = 16
+    ANN_MIN_POOL_SIZE: int = 5000  # below this, ranking scans every resume
+    ANN_CANDIDATE_MULTIPLIER: int = 20  # candidates retrieved per requested result
+    
+    # Lexical (BM25) prefilter over resume tokens, for rank requests with terms
+    BM25_K1: float = 1.2  # term frequency saturation
+    BM25_B: float = 0.75  # document length normalization
+    
+    # Streamed rankings (/match/rank/{job_id}/stream)
+    RANK_STREAM_MAX_LIMIT: int = 100000  # results per page
+    RANK_STREAM_FLUSH_SIZE: int = 256  # results per write to the client
+    
+    # Quantized alternative to the float IVF index: "none", "int8" or "binary"
+    EMBEDDING_QUANTIZATION: str = "none"
+    QUANTIZED_STORE_DIR: str = "./embeddings/quantized"
+    QUANTIZED_RERANK: int = 256  # shortlist re-ranked with float vectors
+
+    # Cached /analyze results, keyed by document content, model and scoring weights
+    MATCH_CACHE_SIZE: int = 10000  # in-process LRU entries
+    MATCH_CACHE_TTL: int = 3600  # seconds an in-process entry stays valid
+    MATCH_CACHE_PERSISTENT: bool = True  # also reuse results stored in match_results
+
+    # Monitoring: /metrics is always on; Server-Timing only for "X-Server-Timing: 1" requests
+    SERVER_TIMING: bool = True
+    # Shared by gunicorn workers so /metrics sums them all (set by gunicorn.conf.py); "" = this process only
+    METRICS_MULTIPROCESS_DIR: str = ""
+    METRICS_FLUSH_INTERVAL: float = 5.0  # seconds between a worker's snapshots
+
     class Config:
         env_file = ".env"
+        extra = "ignore"  # .env also carries FASTAPI_ENV, read via os.getenv above
 
 @lru_cache()
 def get_settings() -> Settings:
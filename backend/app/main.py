@@ -3,7 +3,19 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import logging
 from app.core.config import get_settings
-from app.routes import matching, upload
+from app.routes import matching, metrics, upload
+from app.services.db_service import DatabaseService
+from app.services.document_store import document_store
+from app.services.ml_service import get_ml_service
+from app.services.worker_pool import get_worker_pool, readiness
+from app.services.model_registry import get_model_registry
+from app.services.pdf_extractor import get_pdf_extractor
+from app.services.metrics import get_metrics, start_request_timing, server_timing_header
+import asyncio
+import time
+from app.services.ingestion_service import get_ingestion_service
+from app.services.rank_shards import get_rank_shards
+from app.services.reembed_service import get_reembed_service
 import uvicorn
 
 # Configure logging
@@ -16,6 +28,11 @@ logger = logging.getLogger(__name__)
 # Initialize settings
 settings = get_settings()
 
+# Preload-then-fork: load models in the master before `gunicorn --preload`
+# forks its workers, so they share one copy of the weights copy-on-write
+if settings.MODEL_LOADING == "preload":
+    get_model_registry().warm_up()
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
@@ -32,6 +49,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency for /metrics, and a Server-Timing header for requests that ask for one
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    timings = None
+    if settings.SERVER_TIMING and request.headers.get("x-server-timing") == "1":
+        timings = start_request_timing()
+    
+    start = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - start
+    
+    route = request.scope.get("route")
+    get_metrics().request_seconds.observe(
+        elapsed, request.method, route.path if route is not None else "unmatched", str(response.status_code)
+    )
+    if timings is not None:
+        response.headers["Server-Timing"] = server_timing_header(timings, elapsed)
+        # Lets the frontend's origin read the entries through the Resource Timing API
+        response.headers["Timing-Allow-Origin"] = ", ".join(settings.CORS_ORIGINS)
+    return response
+
 # Custom exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -41,18 +79,85 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"detail": "Internal server error", "error": str(exc)}
     )
 
+@app.on_event("startup")
+async def init_database():
+    DatabaseService.initialize()
+    # Resumes stored before shard keys existed are invisible to rank shards until keyed
+    await asyncio.to_thread(document_store.backfill_shard_keys)
+
+@app.on_event("startup")
+async def share_metrics():
+    # Each worker publishes its metrics for whichever worker answers /metrics
+    get_metrics().start_sharing()
+
+@app.on_event("startup")
+async def sync_vector_index():
+    # The saved index may predate the last uploads or deletes (e.g. after a crash)
+    await asyncio.to_thread(get_ml_service().sync_index, document_store)
+
+@app.on_event("startup")
+async def reembed_stale_documents():
+    # Documents embedded by a previously configured model are re-encoded in the background
+    app.state.reembed = asyncio.create_task(get_reembed_service().run())
+
+@app.on_event("startup")
+async def warm_up_models():
+    # Background: answer liveness immediately and report ready once loaded
+    if settings.MODEL_LOADING == "background":
+        app.state.model_warm_up = asyncio.create_task(
+            asyncio.to_thread(get_worker_pool().warm_up)
+        )
+
+@app.on_event("startup")
+async def start_ingestion_workers():
+    await get_ingestion_service().start()
+
+@app.on_event("startup")
+async def start_rank_shards():
+    # Shards load their resumes in the background; a query before then waits for them
+    if settings.RANK_SHARDS > 1:
+        app.state.rank_shards_sync = asyncio.create_task(get_rank_shards().sync())
+
+@app.on_event("shutdown")
+async def stop_ingestion_workers():
+    await get_ingestion_service().stop()
+
+@app.on_event("shutdown")
+async def stop_reembedding():
+    app.state.reembed.cancel()
+    await asyncio.gather(app.state.reembed, return_exceptions=True)
+
+@app.on_event("shutdown")
+async def save_vector_index():
+    get_ml_service().save_index()
+
+@app.on_event("shutdown")
+async def stop_worker_pool():
+    get_worker_pool().shutdown()
+    get_pdf_extractor().shutdown()
+    if settings.RANK_SHARDS > 1:
+        get_rank_shards().shutdown()
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     return {
         "status": "healthy",
         "app": settings.APP_NAME,
-        "version": settings.APP_VERSION
+        "version": settings.APP_VERSION,
+        **readiness()
     }
 
+# Readiness probe: 503 until the models needed for matching are loaded
+@app.get("/ready")
+async def ready_check():
+    state = readiness()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
 # Include routers
 app.include_router(upload.router, prefix=f"{settings.API_PREFIX}/upload", tags=["upload"])
 app.include_router(matching.router, prefix=f"{settings.API_PREFIX}/match", tags=["matching"])
+app.include_router(metrics.router, tags=["monitoring"])
 
 @app.get("/")
 async def root():
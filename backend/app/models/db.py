@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Float, Text, Integer
+from sqlalchemy import Column, String, DateTime, Float, Text, Integer, LargeBinary, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import uuid
@@ -12,7 +12,14 @@ class Resume(Base):
     filename = Column(String, nullable=False)
     extracted_text = Column(Text)
     skills = Column(Text)  # JSON string
-    experience_years = Column(Integer)
+    entities = Column(Text)  # JSON string
+    tokens = Column(Text)  # JSON list, NLPService.tokenize output for the lexical index
+    experience_years = Column(Integer, index=True)
+    experience_years_max = Column(Integer)
+    embedding = Column(LargeBinary)  # float32 bytes, pooled over chunks
+    chunk_embeddings = Column(LargeBinary)  # float32 bytes, n_chunks x dim
+    embedding_model = Column(String)  # MLService.model_id() that produced the embeddings
+    shard_key = Column(Integer, index=True)  # document_store.shard_key(id); rank shard = shard_key % shards
     upload_timestamp = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -23,18 +30,32 @@ class JobDescription(Base):
     filename = Column(String, nullable=False)
     extracted_text = Column(Text)
     required_skills = Column(Text)  # JSON string
+    entities = Column(Text)  # JSON string
     experience_required = Column(Integer)
+    experience_required_max = Column(Integer)
+    embedding = Column(LargeBinary)  # float32 bytes, pooled over chunks
+    chunk_embeddings = Column(LargeBinary)  # float32 bytes, n_chunks x dim
+    embedding_model = Column(String)  # MLService.model_id() that produced the embeddings
     upload_timestamp = Column(DateTime, default=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
 
 class MatchResult(Base):
     __tablename__ = "match_results"
+    __table_args__ = (
+        Index("ix_match_results_job_score", "job_id", "match_score"),
+        Index("ix_match_results_resume", "resume_id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     resume_id = Column(String, nullable=False)
     job_id = Column(String, nullable=False)
     match_score = Column(Float)
+    # Score components, kept so a job edit only recomputes the ones it affects
     similarity_score = Column(Float)
+    skill_score = Column(Float)  # fraction of required skills matched
+    experience_match = Column(Boolean)
+    education_match = Column(Boolean)
     matched_skills = Column(Text)  # JSON string
     missing_skills = Column(Text)  # JSON string
+    cache_key = Column(String)  # MatchCache key of the inputs this result was computed from
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -9,10 +9,29 @@ class FileUploadResponse(BaseModel):
     file_type: str  # 'resume' or 'job_description'
     upload_timestamp: datetime
     extracted_text: Optional[str] = None
+    duplicate: bool = False  # identical file already uploaded; file_id is the original's
     
     class Config:
         from_attributes = True
 
+class BulkUploadItem(BaseModel):
+    """Outcome for one file of a bulk upload"""
+    filename: str
+    file_id: Optional[str] = None
+    status: str  # 'processed', 'failed' or 'rejected' (server busy; not stored, upload again)
+    error: Optional[str] = None
+    skills: List[str] = []
+    experience_years: Optional[int] = None
+
+class BulkUploadResponse(BaseModel):
+    """Response after a bulk upload"""
+    total: int
+    processed: int
+    failed: int
+    rejected: int = 0
+    results: List[BulkUploadItem]
+    upload_timestamp: datetime
+
 class MatchRequest(BaseModel):
     """Request to perform matching"""
     resume_id: str
@@ -44,3 +63,92 @@ class MatchResponse(BaseModel):
     job_id: str
     results: MatchResult
     recommendations: List[str] = []
+
+class RankRequest(BaseModel):
+    """Request to rank stored resumes against a job description"""
+    job_id: str
+    top_k: int = Field(default=10, ge=1, le=1000)
+    min_experience_years: Optional[int] = Field(default=None, ge=0)
+    must_have_skills: List[str] = []
+    resume_ids: Optional[List[str]] = None
+    # Lexical prefilter: only resumes containing every required term (or, with
+    # none, any keyword) are scored semantically, the BM25 top lexical_top_n if set
+    required_terms: List[str] = []
+    keywords: List[str] = []
+    lexical_top_n: Optional[int] = Field(default=None, ge=1)
+    lexical_weight: float = Field(default=0.0, ge=0, le=1)  # share of the BM25 score in the ranking order
+
+class RankedCandidate(BaseModel):
+    """Single entry in a ranking"""
+    resume_id: str
+    filename: str
+    match_score: float = Field(..., ge=0, le=100)
+    similarity_score: float
+    matched_skills: List[str]
+    missing_skills: List[str]
+    experience_match: bool
+    lexical_score: Optional[float] = None  # BM25, 100 = best in the prefilter
+    combined_score: Optional[float] = None  # the ranking order when lexical_weight is set
+
+class RankResponse(BaseModel):
+    """API response for ranking results"""
+    job_id: str
+    total_candidates: int
+    results: List[RankedCandidate]
+    timestamp: datetime
+
+class StoredMatch(BaseModel):
+    """Persisted result of a match or ranking"""
+    resume_id: str
+    job_id: str
+    match_score: float
+    similarity_score: float
+    matched_skills: List[str]
+    missing_skills: List[str]
+    created_at: datetime
+
+class MatchHistoryResponse(BaseModel):
+    """Stored match results for a job, best first"""
+    job_id: str
+    results: List[StoredMatch]
+
+class JobUpdateRequest(BaseModel):
+    """Edit of a stored job description; omitted fields stay as they are.
+
+    New text is re-processed, and its extracted skills/experience apply
+    unless required_skills/experience_years are given explicitly.
+    """
+    text: Optional[str] = None
+    required_skills: Optional[List[str]] = None
+    experience_years: Optional[int] = Field(default=None, ge=0)
+
+class JobUpdateResponse(BaseModel):
+    """Result of a job edit and the incremental re-scoring it triggered"""
+    job_id: str
+    changed_components: List[str]
+    rescored_matches: int
+    timestamp: datetime
+
+class IngestionJobResponse(BaseModel):
+    """Response after queueing a file for background ingestion"""
+    job_id: str
+    file_id: str
+    filename: str
+    file_type: str
+    status: str
+    stage: str
+
+class IngestionStatusResponse(BaseModel):
+    """Progress of a background ingestion job"""
+    job_id: str
+    file_id: str
+    filename: str
+    file_type: str
+    status: str  # 'queued', 'running', 'completed' or 'failed'
+    stage: str  # 'extract', 'nlp', 'embed', 'persist' or 'done'
+    progress: float = Field(..., ge=0, le=1)
+    attempts: int
+    error: Optional[str] = None
+    extracted_text: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
@@ -1,79 +1,84 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query, Request
+from fastapi.responses import StreamingResponse
 from app.core.config import get_settings
-from app.services.nlp_service import NLPService
-from app.services.ml_service import MLService
+from app.services.ml_service import get_ml_service, SBERT_MODEL_KEY
+from app.services.nlp_service import SPACY_MODEL_KEY
 from app.services.file_service import FileService
-from app.models.schemas import MatchRequest, MatchResponse, MatchResult, SkillMatch
+from app.services.document_store import document_store
+from app.services.candidate_table import get_candidate_table
+from app.services.lexical_index import get_lexical_index
+from app.services.rank_shards import get_rank_shards
+from app.services.match_cache import get_match_cache
+from app.services.reembed_service import get_reembed_service
+from app.services.metrics import get_metrics
+from app.services.worker_pool import get_worker_pool, readiness
+from app.services.inference_scheduler import get_inference_scheduler
+from app.services.artifact_cache import get_artifact_cache
+from app.models.schemas import (
+    MatchRequest, MatchResponse, MatchResult, SkillMatch,
+    RankRequest, RankResponse, RankedCandidate, StoredMatch, MatchHistoryResponse
+)
 from datetime import datetime
-from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import asyncio
+import base64
+import binascii
+import json
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 # Initialize services
-nlp_service = NLPService()
-ml_service = MLService()
+ml_service = get_ml_service()
 file_service = FileService()
-
-# In-memory storage for demo (replace with DB in production)
-uploaded_documents = {}
+worker_pool = get_worker_pool()
+match_cache = get_match_cache()
+reembed_service = get_reembed_service()
+metrics = get_metrics()
 
 @router.post("/analyze")
 async def analyze_match(request: MatchRequest, settings = Depends(get_settings)):
     """Perform semantic matching between resume and job description"""
     
+    with metrics.stage("analyze", "load"):
+        resume = await asyncio.to_thread(document_store.get, request.resume_id)
+        job = await asyncio.to_thread(document_store.get, request.job_id)
+    
+    if resume is None or resume['document_type'] != "resume":
+        raise HTTPException(status_code=404, detail=f"Resume not found: {request.resume_id}")
+    if job is None or job['document_type'] != "job_description":
+        raise HTTPException(status_code=404, detail=f"Job description not found: {request.job_id}")
+    
     try:
-        # Get documents (mock implementation - replace with DB queries)
-        resume_path = Path(settings.UPLOAD_DIR) / f"{request.resume_id}.pdf"
-        job_path = Path(settings.UPLOAD_DIR) / f"{request.job_id}.pdf"
-        
-        # For demo, we'll use sample texts
-        resume_text = """Senior Software Engineer with 5 years of experience in Python,
-        JavaScript, React, and FastAPI. Expert in machine learning and NLP.
-        Worked on distributed systems and microservices."""
-        
-        job_text = """We are hiring a Software Engineer with:
-        - 3+ years Python experience
-        - React and JavaScript skills required
-        - Machine Learning knowledge preferred
-        - Experience with FastAPI or similar frameworks"""
-        
-        # Process documents with NLP
-        resume_processed = nlp_service.process_document(resume_text, "resume")
-        job_processed = nlp_service.process_document(job_text, "job_description")
+        # Vectors embedded by a previously configured model are not comparable
+        with metrics.stage("analyze", "reembed"):
+            resume = await reembed_service.current(resume)
+            job = await reembed_service.current(job)
         
-        # Extract skills
-        resume_skills = resume_processed['skills']
-        job_skills = job_processed['skills']
+        # Same documents, model and weights as an earlier call: reuse its result
+        with metrics.stage("analyze", "cache"):
+            cache_key = match_cache.key(resume, job)
+            match = await asyncio.to_thread(match_cache.get, cache_key, request.job_id, request.resume_id)
         
-        # Skill matching
-        skill_match = ml_service.match_skills(job_skills, resume_skills)
+        if match is None:
+            match = await asyncio.to_thread(compute_match, resume, job)
+            match['cache_key'] = cache_key
+            with metrics.stage("analyze", "persist"):
+                await asyncio.to_thread(document_store.save_matches, request.job_id, [match])
+            match_cache.put(cache_key, match)
         
-        # Semantic similarity
-        semantic_score = ml_service.semantic_similarity(resume_text, job_text)
-        
-        # Experience matching (mock)
-        resume_years_min, resume_years_max = resume_processed['experience_years']
-        experience_match = resume_years_min >= 3  # Job requires 3+ years
-        
-        # Education matching (mock)
-        education_match = True
-        
-        # Calculate overall score
-        match_score = ml_service.calculate_match_score(
-            semantic_score,
-            skill_match['match_percentage'] / 100,
-            experience_match,
-            education_match
-        )
+        match_score = match['match_score']
+        semantic_score = match['similarity_score']
+        match_percentage = match['skill_score'] * 100
         
         # Generate recommendations
         recommendations = ml_service.generate_recommendations(
             match_score,
-            skill_match['missing_skills'],
-            1 - skill_match['match_percentage'] / 100
+            match['missing_skills'],
+            1 - match['skill_score']
         )
         
         # Create response
@@ -82,12 +87,12 @@ async def analyze_match(request: MatchRequest, settings = Depends(get_settings))
             similarity_score=round(semantic_score, 3),
             matched_skills=[
                 SkillMatch(skill=s, matched=True)
-                for s in skill_match['matched_skills']
+                for s in match['matched_skills']
             ],
-            missing_skills=skill_match['missing_skills'],
-            experience_match=experience_match,
-            education_match=education_match,
-            explanation=f"Resume shows {skill_match['match_percentage']:.0f}% skill match with semantic similarity of {semantic_score:.2f}",
+            missing_skills=match['missing_skills'],
+            experience_match=match['experience_match'],
+            education_match=match['education_match'],
+            explanation=f"Resume shows {match_percentage:.0f}% skill match with semantic similarity of {semantic_score:.2f}",
             timestamp=datetime.now()
         )
         
@@ -100,18 +105,374 @@ async def analyze_match(request: MatchRequest, settings = Depends(get_settings))
             recommendations=recommendations
         )
     
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error during matching: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def compute_match(resume: Dict, job: Dict) -> Dict:
+    """Score one stored resume against one stored job, as a save_matches dict"""
+    # Skills, experience and embeddings were extracted once at upload
+    with metrics.stage("analyze", "skills"):
+        skill_match = ml_service.match_skills(job['skills'], resume['skills'])
+    
+    # Semantic similarity
+    with metrics.stage("analyze", "semantic"):
+        semantic_score = float(ml_service.document_similarities(job, [resume])[0])
+    
+    with metrics.stage("analyze", "scoring"):
+        # Experience matching
+        experience_match = resume['experience_years'][0] >= job['experience_years'][0]
+        
+        # Education matching (mock)
+        education_match = True
+        
+        # Calculate overall score
+        match_score = ml_service.calculate_match_score(
+            semantic_score,
+            skill_match['match_percentage'] / 100,
+            experience_match,
+            education_match
+        )
+    
+    return {
+        'resume_id': resume['file_id'],
+        'match_score': match_score,
+        'similarity_score': semantic_score,
+        'skill_score': skill_match['match_percentage'] / 100,
+        'experience_match': experience_match,
+        'education_match': education_match,
+        'matched_skills': skill_match['matched_skills'],
+        'missing_skills': skill_match['missing_skills']
+    }
+
+@router.post("/rank", response_model=RankResponse)
+async def rank_resumes(request: RankRequest, settings = Depends(get_settings)):
+    """Rank stored resumes against a job description and return the top-K"""
+    
+    with metrics.stage("rank", "load"):
+        job = await asyncio.to_thread(document_store.get, request.job_id)
+    if job is None or job['document_type'] != "job_description":
+        raise HTTPException(status_code=404, detail=f"Job description not found: {request.job_id}")
+    
+    try:
+        job = await reembed_service.current(job)
+        file_ids, lexical = await lexical_prefilter(request)
+        
+        if settings.RANK_SHARDS > 1:
+            # Every shard process scores its resumes in parallel; the top-Ks are merged here
+            with metrics.stage("rank", "scatter"):
+                total, ranked = await get_rank_shards().rank(
+                    job['embedding'],
+                    job['skills'],
+                    job['experience_years'][0],
+                    request.top_k,
+                    job['chunks'],
+                    file_ids,
+                    request.min_experience_years,
+                    request.must_have_skills,
+                    lexical,
+                    request.lexical_weight
+                )
+        else:
+            total, ranked = await rank_in_process(job, request, settings, file_ids, lexical)
+        
+        results = [
+            RankedCandidate(
+                resume_id=r['file_id'],
+                filename=r['filename'],
+                match_score=round(r['match_score'], 2),
+                similarity_score=round(r['similarity_score'], 3),
+                matched_skills=r['matched_skills'],
+                missing_skills=r['missing_skills'],
+                experience_match=r['experience_match'],
+                lexical_score=round(r['lexical_score'], 2) if 'lexical_score' in r else None,
+                combined_score=round(r['combined_score'], 2) if 'combined_score' in r else None
+            )
+            for r in ranked
+        ]
+        
+        with metrics.stage("rank", "persist"):
+            await asyncio.to_thread(document_store.save_matches, request.job_id, [
+                {
+                    'resume_id': r['file_id'],
+                    'match_score': r['match_score'],
+                    'similarity_score': r['similarity_score'],
+                    'skill_score': r['skill_match_percentage'] / 100,
+                    'experience_match': r['experience_match'],
+                    'education_match': r['education_match'],
+                    'matched_skills': r['matched_skills'],
+                    'missing_skills': r['missing_skills']
+                }
+                for r in ranked
+            ])
+        
+        logger.info(f"Ranked {total} resumes against job {request.job_id}")
+        
+        return RankResponse(
+            job_id=request.job_id,
+            total_candidates=total,
+            results=results,
+            timestamp=datetime.now()
+        )
+    
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error during ranking: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def lexical_prefilter(request: RankRequest) -> Tuple[Optional[List[str]], Optional[Dict[str, float]]]:
+    """(resume ids to score, their normalized BM25 scores); (request.resume_ids, None) without terms"""
+    if not request.required_terms and not request.keywords:
+        return request.resume_ids, None
+    
+    def search() -> Dict[str, float]:
+        index = get_lexical_index(document_store)
+        return index.search(request.required_terms, request.keywords, request.lexical_top_n)
+    
+    with metrics.stage("rank", "lexical"):
+        lexical = await asyncio.to_thread(search)
+    if request.resume_ids is None:
+        return list(lexical), lexical
+    return [file_id for file_id in request.resume_ids if file_id in lexical], lexical
+
+async def rank_in_process(
+    job: Dict,
+    request: RankRequest,
+    settings,
+    file_ids: Optional[List[str]] = None,
+    lexical: Optional[Dict[str, float]] = None
+) -> Tuple[int, List[Dict]]:
+    """(candidates passing the filters, top-K) from this process's candidate table, among file_ids if given"""
+    # In-memory columnar view of all resumes, refreshed from the database
+    with metrics.stage("rank", "sync"):
+        table = await asyncio.to_thread(
+            get_candidate_table,
+            document_store,
+            ml_service.similarity_mode == "max_sim",
+            None,
+            ml_service.model_name
+        )
+    
+    # Apply optional filters before scoring, as vectorized column filters
+    with metrics.stage("rank", "filter"):
+        rows = table.select(file_ids, request.min_experience_years, request.must_have_skills)
+    pool = rows
+    
+    if file_ids is None and len(rows) >= settings.ANN_MIN_POOL_SIZE:
+        # Large pool: re-rank only its semantic neighbours, unless too few of
+        # them pass the filters, in which case every filtered row is scanned
+        with metrics.stage("rank", "retrieve"):
+            await asyncio.to_thread(ml_service.refresh_index, document_store)
+            retrieved = await asyncio.to_thread(
+                ml_service.retrieve_candidates,
+                job['embedding'],
+                request.top_k * settings.ANN_CANDIDATE_MULTIPLIER
+            )
+            neighbours = rows[np.isin(rows, table.rows_for(retrieved))]
+        if len(neighbours) >= request.top_k:
+            rows = neighbours
+    
+    # The table lives in this process, so score on a thread (NumPy releases the GIL)
+    with metrics.stage("rank", "scoring"):
+        ranked = await asyncio.to_thread(
+            ml_service.rank_table,
+            table,
+            rows,
+            job['embedding'],
+            job['skills'],
+            job['experience_years'][0],
+            request.top_k,
+            job['chunks'],
+            lexical,
+            request.lexical_weight
+        )
+    return len(pool), ranked
+
+def encode_cursor(job_id: str, result: Dict, rank: int) -> str:
+    """Opaque keyset position just after a ranked result"""
+    position = json.dumps([job_id, result['match_score'], result['file_id'], rank])
+    return base64.urlsafe_b64encode(position.encode('utf-8')).decode('ascii')
+
+def decode_cursor(job_id: str, cursor: str) -> Tuple[Tuple[float, str], int]:
+    """((score, file_id), rank) of a cursor issued for this job, or 400"""
+    try:
+        cursor_job, score, file_id, rank = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        position = ((float(score), str(file_id)), int(rank))
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+    if cursor_job != job_id:
+        raise HTTPException(status_code=400, detail="Cursor belongs to another job")
+    return position
+
+def stream_frame(event: str, data: Dict, sse: bool, event_id: Optional[str] = None) -> str:
+    """One NDJSON line, or one Server-Sent Event"""
+    if not sse:
+        return json.dumps({'type': event, **data}) + "\n"
+    frame = f"event: {event}\n"
+    if event_id is not None:
+        frame += f"id: {event_id}\n"
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+def stream_ranking_frames(
+    job_id: str,
+    total: int,
+    remaining: int,
+    results: Iterator[Dict],
+    rank: int,
+    sse: bool,
+    flush_size: int
+) -> Iterator[str]:
+    """meta, one result per ranked resume, then end with the next page's cursor.
+    
+    Results are serialized as they are produced and written in groups of
+    flush_size, so memory stays flat however large the page is.
+    """
+    yield stream_frame("meta", {'job_id': job_id, 'total_candidates': total, 'remaining': remaining}, sse)
+    
+    returned = 0
+    last = None
+    buffer = []
+    try:
+        with metrics.stage("rank_stream", "stream"):
+            for result in results:
+                returned += 1
+                last = result
+                payload = {
+                    'rank': rank + returned,
+                    'resume_id': result['file_id'],
+                    'filename': result['filename'],
+                    'match_score': round(result['match_score'], 2),
+                    'similarity_score': round(result['similarity_score'], 3),
+                    'matched_skills': result['matched_skills'],
+                    'missing_skills': result['missing_skills'],
+                    'experience_match': result['experience_match']
+                }
+                # SSE ids let an EventSource resume after the last result it saw
+                buffer.append(stream_frame("result", payload, sse, encode_cursor(job_id, result, rank + returned) if sse else None))
+                if len(buffer) >= flush_size:
+                    yield "".join(buffer)
+                    buffer = []
+    except Exception as e:
+        # The status line is already sent, so the failure is reported in-stream
+        logger.error(f"Error streaming ranking for job {job_id}: {e}")
+        buffer.append(stream_frame("error", {'detail': str(e)}, sse))
+        yield "".join(buffer)
+        return
+    
+    next_cursor = encode_cursor(job_id, last, rank + returned) if last is not None and returned < remaining else None
+    buffer.append(stream_frame("end", {'returned': returned, 'next_cursor': next_cursor}, sse))
+    yield "".join(buffer)
+
+@router.get("/rank/{job_id}/stream")
+async def stream_ranking(
+    job_id: str,
+    request: Request,
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    min_experience_years: Optional[int] = Query(None, ge=0),
+    must_have_skills: List[str] = Query([]),
+    resume_ids: Optional[List[str]] = Query(None),
+    format: Optional[str] = Query(None, pattern="^(ndjson|sse)$"),
+    settings = Depends(get_settings)
+):
+    """Stream the full ranking of stored resumes for a job, best first, a page at a time.
+    
+    Emits NDJSON lines (or Server-Sent Events, with format=sse or
+    "Accept: text/event-stream"): a 'meta' record, one 'result' per
+    resume, then an 'end' record whose next_cursor fetches the next page.
+    Every selected resume is scored (no approximate retrieval), so pages
+    are exact and consistent; streamed pages are not saved to match history.
+    """
+    if limit > settings.RANK_STREAM_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be at most {settings.RANK_STREAM_MAX_LIMIT}")
+    
+    # An EventSource reconnecting sends the id of the last event it received,
+    # while its URL still carries the cursor of the page it first asked for
+    cursor = request.headers.get("last-event-id") or cursor
+    after, rank = decode_cursor(job_id, cursor) if cursor else (None, 0)
+    sse = format == "sse" or (format is None and "text/event-stream" in request.headers.get("accept", ""))
+    
+    with metrics.stage("rank_stream", "load"):
+        job = await asyncio.to_thread(document_store.get, job_id)
+    if job is None or job['document_type'] != "job_description":
+        raise HTTPException(status_code=404, detail=f"Job description not found: {job_id}")
+    
+    try:
+        job = await reembed_service.current(job)
+        with metrics.stage("rank_stream", "sync"):
+            table = await asyncio.to_thread(
+                get_candidate_table,
+                document_store,
+                ml_service.similarity_mode == "max_sim",
+                None,
+                ml_service.model_name
+            )
+        with metrics.stage("rank_stream", "filter"):
+            rows = table.select(resume_ids, min_experience_years, must_have_skills)
+        
+        # Scores and page order are computed up front; result entries are built while streaming
+        with metrics.stage("rank_stream", "scoring"):
+            remaining, results = await asyncio.to_thread(
+                ml_service.rank_page,
+                table,
+                rows,
+                job['embedding'],
+                job['skills'],
+                job['experience_years'][0],
+                limit,
+                after,
+                job['chunks']
+            )
+        
+        # A plain generator: Starlette iterates it on a worker thread, off the event loop
+        return StreamingResponse(
+            stream_ranking_frames(job_id, len(rows), remaining, results, rank, sse, settings.RANK_STREAM_FLUSH_SIZE),
+            media_type="text/event-stream" if sse else "application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error during streamed ranking: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/results/{job_id}", response_model=MatchHistoryResponse)
+async def match_results(job_id: str, limit: int = Query(100, ge=1, le=1000)):
+    """Stored match results for a job, best first"""
+    
+    try:
+        matches = await asyncio.to_thread(document_store.list_matches, job_id, limit)
+        
+        return MatchHistoryResponse(
+            job_id=job_id,
+            results=[StoredMatch(**match) for match in matches]
+        )
+    
+    except Exception as e:
+        logger.error(f"Error loading match results: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/health")
-async def health_check():
+async def health_check(settings = Depends(get_settings)):
     """Check if matching service is healthy"""
+    state = readiness()
+    models = state['models']
     return {
         "status": "operational",
+        "ready": state['ready'],
         "services": {
-            "nlp": "ready",
-            "ml": "ready",
+            "nlp": models.get(SPACY_MODEL_KEY, {}).get('state', "not_loaded"),
+            "ml": models.get(SBERT_MODEL_KEY, {}).get('state', "not_loaded"),
             "file_processor": "ready"
-        }
+        },
+        "models": models,
+        "embedding_cache": ml_service.embedding_store.stats(),
+        "match_cache": match_cache.stats(),
+        "worker_pool": worker_pool.stats(),
+        "inference_scheduler": get_inference_scheduler().stats(),
+        "artifact_cache": get_artifact_cache(settings.ARTIFACT_CACHE_DIR).stats()
     }
@@ -0,0 +1,76 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.config import get_settings
+from app.services.metrics import get_metrics
+from app.services.ml_service import get_ml_service
+from app.services.worker_pool import get_worker_pool
+from app.services.ingestion_queue import IngestionQueue, get_ingestion_queue
+from app.services.artifact_cache import get_artifact_cache
+from app.services.match_cache import get_match_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+metrics = get_metrics()
+
+# Everything below is read from the services when /metrics is scraped
+
+def worker_pool_gauges():
+    stats = get_worker_pool().stats()
+    busy = min(stats['pending'], stats['workers'])
+    return {
+        ('pending',): stats['pending'],
+        ('queued',): stats['pending'] - busy,
+        ('capacity',): stats['capacity'],
+        ('utilization',): busy / stats['workers']
+    }
+
+def worker_pool_counters():
+    stats = get_worker_pool().stats()
+    return {('completed',): stats['completed'], ('rejected',): stats['rejected']}
+
+def ingestion_queue_depth():
+    depth = {(stage, status): 0 for stage in IngestionQueue.STAGES for status in ("queued", "running")}
+    queue = get_ingestion_queue(get_settings().INGEST_QUEUE_PATH)
+    for row in queue.counts():
+        if (row['stage'], row['status']) in depth:
+            depth[(row['stage'], row['status'])] = row['jobs']
+    return depth
+
+def model_load_seconds():
+    return {(name,): status['load_seconds'] for name, status in get_worker_pool().model_status().items()}
+
+def model_ready():
+    return {(name,): status['state'] == "ready" for name, status in get_worker_pool().model_status().items()}
+
+def cache_lookups():
+    settings = get_settings()
+    caches = {
+        'embedding': get_ml_service().embedding_store.stats(),
+        'match': get_match_cache().stats(),
+        'artifact': get_artifact_cache(settings.ARTIFACT_CACHE_DIR).stats()
+    }
+    return {
+        (cache, result): value
+        for cache, stats in caches.items()
+        for result, value in stats.items()
+        if result.endswith(('hits', 'misses'))
+    }
+
+metrics.callback("worker_pool", "Worker pool load (tasks, or busy fraction for utilization)", ["measure"], worker_pool_gauges)
+metrics.callback("worker_pool_tasks_total", "Worker pool tasks by outcome", ["outcome"], worker_pool_counters, "counter")
+metrics.callback("ingestion_jobs", "Ingestion jobs waiting or running per stage", ["stage", "status"], ingestion_queue_depth)
+metrics.callback("model_load_seconds", "Time taken to load each model", ["model"], model_load_seconds)
+metrics.callback("model_ready", "1 once a model is loaded", ["model"], model_ready)
+metrics.callback("cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"], cache_lookups, "counter")
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus text exposition of timings, gauges and cache counters.
+    
+    Under gunicorn the workers share METRICS_MULTIPROCESS_DIR, so counters
+    and histograms cover every worker and gauges carry a pid label.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,9 +1,26 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
 from app.core.config import get_settings
-from app.services.file_service import FileService
-from app.services.nlp_service import NLPService
-from app.models.schemas import FileUploadResponse
+from app.services.file_service import FileService, FileTooLargeError
+from app.services.ml_service import get_ml_service
+from app.services.document_store import document_store
+from app.services.lexical_index import index_resume, remove_resume
+from app.services import worker_pool as tasks
+from app.services.worker_pool import get_worker_pool
+from app.services.inference_scheduler import get_inference_scheduler
+from app.services.ingestion_queue import IngestionQueue
+from app.services.ingestion_service import get_ingestion_service
+from app.services.artifact_cache import get_artifact_cache
+from app.services.rescoring_service import get_rescoring_service
+from app.services.reembed_service import get_reembed_service
+from app.services.metrics import get_metrics
+from app.models.schemas import (
+    FileUploadResponse, IngestionJobResponse, IngestionStatusResponse,
+    BulkUploadItem, BulkUploadResponse, JobUpdateRequest, JobUpdateResponse
+)
 from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,7 +29,33 @@ router = APIRouter()
 
 # Initialize services
 file_service = FileService()
-nlp_service = NLPService()
+ml_service = get_ml_service()
+worker_pool = get_worker_pool()
+inference_scheduler = get_inference_scheduler()
+reembed_service = get_reembed_service()
+artifact_cache = get_artifact_cache(get_settings().ARTIFACT_CACHE_DIR)
+metrics = get_metrics()
+
+async def save_streamed(file: UploadFile, settings) -> Tuple[str, str, str]:
+    """Stream an upload to disk in chunks, off the event loop"""
+    try:
+        return await asyncio.to_thread(
+            FileService.save_stream,
+            settings.UPLOAD_DIR,
+            FileService.iter_chunks(file.file),
+            file.filename,
+            settings.MAX_UPLOAD_SIZE
+        )
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def reuse_duplicate(file_path: str, content_hash: str, doc_type: str) -> Optional[Dict]:
+    """If identical bytes were processed before, drop the new copy and return the cached artifacts"""
+    cached = artifact_cache.get(content_hash, doc_type)
+    if cached is not None:
+        Path(file_path).unlink(missing_ok=True)
+        logger.info(f"Duplicate upload of {cached['file_id']} ({doc_type})")
+    return cached
 
 @router.post("/resume", response_model=FileUploadResponse)
 async def upload_resume(file: UploadFile = File(...), settings = Depends(get_settings)):
@@ -26,28 +69,37 @@ async def upload_resume(file: UploadFile = File(...), settings = Depends(get_set
                 detail=f"File type not allowed. Allowed types: {FileService.ALLOWED_EXTENSIONS}"
             )
         
-        # Read file content
-        content = await file.read()
+        # Stream file to disk, enforcing the size limit as it is written
+        with metrics.stage("upload_resume", "save"):
+            file_id, file_path, content_hash = await save_streamed(file, settings)
         
-        if len(content) > FileService.MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail="File size exceeds limit (50MB)"
-            )
-        
-        # Save file
-        file_id, file_path = file_service.save_upload(
-            settings.UPLOAD_DIR,
-            content,
-            file.filename
-        )
-        
-        # Extract text
-        file_ext = file.filename.rsplit('.', 1)[1].lower()
-        extracted_text = file_service.extract_text(file_path, file_ext)
+        # Identical file seen before: reuse its id and everything derived from it
+        cached = reuse_duplicate(file_path, content_hash, "resume")
+        if cached is not None:
+            file_id = cached['file_id']
+            nlp_result = cached['nlp']
+            extracted_text = nlp_result['original_text']
+        else:
+            # Extract text
+            file_ext = file.filename.rsplit('.', 1)[1].lower()
+            with metrics.stage("upload_resume", "extract"):
+                extracted_text = await worker_pool.run(tasks.extract_text, file_path, file_ext)
+            
+            # Process with NLP
+            with metrics.stage("upload_resume", "nlp"):
+                nlp_result = await worker_pool.run(tasks.process_document, extracted_text, "resume")
+            artifact_cache.put(content_hash, "resume", file_id, file_path, file.filename, nlp_result)
         
-        # Process with NLP
-        nlp_result = nlp_service.process_document(extracted_text, "resume")
+        # Embed once at upload, store it with the document and index it
+        with metrics.stage("upload_resume", "embed"):
+            embedded = (await inference_scheduler.embed_documents([extracted_text]))[0]
+        with metrics.stage("upload_resume", "persist"):
+            await asyncio.to_thread(
+                document_store.add, file_id, file.filename, "resume", nlp_result,
+                embedded['embedding'], embedded['chunks'], ml_service.model_name
+            )
+            await asyncio.to_thread(ml_service.index_embedding, file_id, embedded['embedding'])
+            await asyncio.to_thread(index_resume, file_id, nlp_result)
         
         logger.info(f"Resume uploaded and processed: {file_id}")
         
@@ -56,7 +108,8 @@ async def upload_resume(file: UploadFile = File(...), settings = Depends(get_set
             filename=file.filename,
             file_type="resume",
             upload_timestamp=datetime.now(),
-            extracted_text=extracted_text[:500]  # Return first 500 chars
+            extracted_text=extracted_text[:500],  # Return first 500 chars
+            duplicate=cached is not None
         )
     
     except HTTPException as e:
@@ -77,41 +130,399 @@ async def upload_job(file: UploadFile = File(...), settings = Depends(get_settin
                 detail=f"File type not allowed. Allowed types: {FileService.ALLOWED_EXTENSIONS}"
             )
         
-        # Read file content
-        content = await file.read()
+        # Stream file to disk, enforcing the size limit as it is written
+        with metrics.stage("upload_job", "save"):
+            file_id, file_path, content_hash = await save_streamed(file, settings)
+        
+        # Identical file seen before: reuse its id and everything derived from it
+        cached = reuse_duplicate(file_path, content_hash, "job_description")
+        if cached is not None:
+            file_id = cached['file_id']
+            nlp_result = cached['nlp']
+            extracted_text = nlp_result['original_text']
+        else:
+            # Extract text
+            file_ext = file.filename.rsplit('.', 1)[1].lower()
+            with metrics.stage("upload_job", "extract"):
+                extracted_text = await worker_pool.run(tasks.extract_text, file_path, file_ext)
+            
+            # Process with NLP
+            with metrics.stage("upload_job", "nlp"):
+                nlp_result = await worker_pool.run(tasks.process_document, extracted_text, "job_description")
+            artifact_cache.put(content_hash, "job_description", file_id, file_path, file.filename, nlp_result)
+        
+        # Embed once at upload and store it with the document for every later match
+        with metrics.stage("upload_job", "embed"):
+            embedded = (await inference_scheduler.embed_documents([extracted_text]))[0]
+        with metrics.stage("upload_job", "persist"):
+            await asyncio.to_thread(
+                document_store.add, file_id, file.filename, "job_description", nlp_result,
+                embedded['embedding'], embedded['chunks'], ml_service.model_name
+            )
+        
+        logger.info(f"Job description uploaded and processed: {file_id}")
+        
+        return FileUploadResponse(
+            file_id=file_id,
+            filename=file.filename,
+            file_type="job_description",
+            upload_timestamp=datetime.now(),
+            extracted_text=extracted_text[:500],
+            duplicate=cached is not None
+        )
+    
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error uploading job description: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def process_bulk_batch(saved: List[Dict], doc_type: str) -> List[BulkUploadItem]:
+    """Extract, process and embed a batch of saved files together"""
+    results = []
+    duplicates = []
+    new = []
+    for item in saved:
+        cached = reuse_duplicate(item['file_path'], item['content_hash'], doc_type)
+        if cached is None:
+            new.append(item)
+        else:
+            duplicates.append(({**item, 'file_id': cached['file_id']}, cached['nlp']))
+    
+    with metrics.stage("bulk_upload", "extract"):
+        extracted = await worker_pool.run(
+            tasks.extract_texts,
+            [(item['file_path'], item['filename'].rsplit('.', 1)[1].lower()) for item in new]
+        ) if new else []
+    
+    ready = []
+    for item, extraction in zip(new, extracted):
+        if 'error' in extraction:
+            results.append(BulkUploadItem(
+                filename=item['filename'],
+                file_id=item['file_id'],
+                status="failed",
+                error=extraction['error']
+            ))
+        else:
+            ready.append((item, extraction['text']))
+    
+    if ready:
+        with metrics.stage("bulk_upload", "nlp"):
+            nlp_results = await worker_pool.run(
+                tasks.process_documents,
+                [text for _, text in ready],
+                doc_type
+            )
+        for (item, _), nlp_result in zip(ready, nlp_results):
+            artifact_cache.put(
+                item['content_hash'], doc_type, item['file_id'],
+                item['file_path'], item['filename'], nlp_result
+            )
+    else:
+        nlp_results = []
+    
+    processed = duplicates + [(item, nlp_result) for (item, _), nlp_result in zip(ready, nlp_results)]
+    if processed:
+        # Duplicates hit the embedding cache, so only new texts are encoded
+        with metrics.stage("bulk_upload", "embed"):
+            embedded_docs = await inference_scheduler.embed_documents(
+                [nlp_result['original_text'] for _, nlp_result in processed]
+            )
+        
+        for (item, nlp_result), embedded in zip(processed, embedded_docs):
+            with metrics.stage("bulk_upload", "persist"):
+                await asyncio.to_thread(
+                    document_store.add, item['file_id'], item['filename'], doc_type, nlp_result,
+                    embedded['embedding'], embedded['chunks'], ml_service.model_name
+                )
+                if doc_type == "resume":
+                    await asyncio.to_thread(ml_service.index_embedding, item['file_id'], embedded['embedding'])
+                    await asyncio.to_thread(index_resume, item['file_id'], nlp_result)
+            results.append(BulkUploadItem(
+                filename=item['filename'],
+                file_id=item['file_id'],
+                status="processed",
+                skills=nlp_result['skills'],
+                experience_years=nlp_result['experience_years'][0]
+            ))
+    
+    return results
+
+async def process_bulk_batch_when_free(saved: List[Dict], doc_type: str, retries: int) -> List[BulkUploadItem]:
+    """process_bulk_batch, waiting out a saturated worker pool a few times.
+    
+    A 429 is raised before anything of the batch is stored, so once the
+    retries run out its files are reported as rejected (and removed from
+    disk) while earlier batches keep their results.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return await process_bulk_batch(saved, doc_type)
+        except HTTPException as e:
+            if e.status_code != 429:
+                raise
+            if attempt < retries:
+                await asyncio.sleep(float(e.headers.get("Retry-After", 1)) * (attempt + 1))
+    
+    for item in saved:
+        await asyncio.to_thread(Path(item['file_path']).unlink, missing_ok=True)
+    return [
+        BulkUploadItem(filename=item['filename'], status="rejected", error="Server is busy, retry this file")
+        for item in saved
+    ]
+
+@router.post("/resumes/bulk", response_model=BulkUploadResponse)
+async def upload_resumes_bulk(files: List[UploadFile] = File(...), settings = Depends(get_settings)):
+    """Upload many resumes at once, as multiple files and/or ZIP archives"""
+    
+    results: List[BulkUploadItem] = []
+    batch: List[Dict] = []
+    received = 0
+    
+    try:
+        for file in files:
+            if received >= settings.BULK_MAX_FILES:
+                results.append(BulkUploadItem(
+                    filename=file.filename,
+                    status="failed",
+                    error=f"Bulk upload exceeds {settings.BULK_MAX_FILES} files"
+                ))
+                continue
+            
+            # Stream each file (or each archive member) to disk
+            if file.filename.lower().endswith('.zip'):
+                try:
+                    saved = await asyncio.to_thread(
+                        FileService.save_zip_members,
+                        settings.UPLOAD_DIR,
+                        file.file,
+                        settings.MAX_UPLOAD_SIZE,
+                        settings.BULK_MAX_FILES - received
+                    )
+                except Exception as e:
+                    saved = [{'filename': file.filename, 'error': f"Invalid archive: {e}"}]
+            elif not FileService.allowed_file(file.filename):
+                saved = [{'filename': file.filename, 'error': "File type not allowed"}]
+            else:
+                try:
+                    file_id, file_path, content_hash = await save_streamed(file, settings)
+                    saved = [{
+                        'filename': file.filename,
+                        'file_id': file_id,
+                        'file_path': file_path,
+                        'content_hash': content_hash
+                    }]
+                except HTTPException as e:
+                    saved = [{'filename': file.filename, 'error': e.detail}]
+            
+            for item in saved:
+                received += 1
+                if 'error' in item:
+                    results.append(BulkUploadItem(filename=item['filename'], status="failed", error=item['error']))
+                    continue
+                
+                batch.append(item)
+                if len(batch) >= settings.BULK_BATCH_SIZE:
+                    results.extend(await process_bulk_batch_when_free(batch, "resume", settings.BULK_BUSY_RETRIES))
+                    batch = []
+        
+        if batch:
+            results.extend(await process_bulk_batch_when_free(batch, "resume", settings.BULK_BUSY_RETRIES))
+        
+        processed = sum(1 for result in results if result.status == "processed")
+        rejected = sum(1 for result in results if result.status == "rejected")
+        
+        logger.info(f"Bulk upload: {processed} of {len(results)} resumes processed")
         
-        if len(content) > FileService.MAX_FILE_SIZE:
+        return BulkUploadResponse(
+            total=len(results),
+            processed=processed,
+            failed=len(results) - processed - rejected,
+            rejected=rejected,
+            results=results,
+            upload_timestamp=datetime.now()
+        )
+    
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error during bulk upload: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/ingest", response_model=IngestionJobResponse, status_code=202)
+async def ingest_file(
+    file: UploadFile = File(...),
+    file_type: str = Form("resume"),
+    settings = Depends(get_settings)
+):
+    """Save a file and queue it for background processing; returns immediately"""
+    
+    try:
+        if file_type not in ("resume", "job_description"):
             raise HTTPException(
                 status_code=400,
-                detail="File size exceeds limit (50MB)"
+                detail="file_type must be 'resume' or 'job_description'"
             )
         
-        # Save file
-        file_id, file_path = file_service.save_upload(
-            settings.UPLOAD_DIR,
-            content,
-            file.filename
-        )
+        # Validate file
+        if not FileService.allowed_file(file.filename):
+            raise HTTPException(
+                status_code=400,
+                detail=f"File type not allowed. Allowed types: {FileService.ALLOWED_EXTENSIONS}"
+            )
         
-        # Extract text
+        # Stream file to disk, enforcing the size limit as it is written
+        file_id, file_path, content_hash = await save_streamed(file, settings)
         file_ext = file.filename.rsplit('.', 1)[1].lower()
-        extracted_text = file_service.extract_text(file_path, file_ext)
         
-        # Process with NLP
-        nlp_result = nlp_service.process_document(extracted_text, "job_description")
+        # Queue for extract -> nlp -> embed -> persist; a known file skips straight to persist
+        cached = reuse_duplicate(file_path, content_hash, file_type)
+        if cached is not None:
+            file_id, file_path = cached['file_id'], cached['file_path']
+            stage = "persist"
+            payload = {
+                'content_hash': content_hash,
+                'text': cached['nlp']['original_text'],
+                'nlp': cached['nlp']
+            }
+        else:
+            stage = IngestionQueue.STAGES[0]
+            payload = {'content_hash': content_hash}
         
-        logger.info(f"Job description uploaded and processed: {file_id}")
+        ingestion_service = get_ingestion_service()
+        job_id = ingestion_service.queue.enqueue(
+            file_id, file.filename, file_path, file_ext, file_type, stage, payload
+        )
+        ingestion_service.notify(stage)
         
-        return FileUploadResponse(
+        logger.info(f"Queued {file_type} for ingestion: {file_id} (job {job_id})")
+        
+        return IngestionJobResponse(
+            job_id=job_id,
             file_id=file_id,
             filename=file.filename,
-            file_type="job_description",
-            upload_timestamp=datetime.now(),
-            extracted_text=extracted_text[:500]
+            file_type=file_type,
+            status="queued",
+            stage=stage
         )
     
     except HTTPException as e:
         raise e
     except Exception as e:
-        logger.error(f"Error uploading job description: {e}")
+        logger.error(f"Error queueing file for ingestion: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/status/{job_id}", response_model=IngestionStatusResponse)
+async def ingestion_status(job_id: str):
+    """Report the progress of a background ingestion job"""
+    
+    job = get_ingestion_service().queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Ingestion job not found: {job_id}")
+    
+    stages = IngestionQueue.STAGES
+    finished_stages = len(stages) if job['stage'] == "done" else stages.index(job['stage'])
+    
+    return IngestionStatusResponse(
+        job_id=job['id'],
+        file_id=job['file_id'],
+        filename=job['filename'],
+        file_type=job['document_type'],
+        status=job['status'],
+        stage=job['stage'],
+        progress=finished_stages / len(stages),
+        attempts=job['attempts'],
+        error=job['error'],
+        extracted_text=job['payload'].get('text_preview'),
+        created_at=job['created_at'],
+        updated_at=job['updated_at']
+    )
+
+@router.delete("/resume/{file_id}")
+async def delete_resume(file_id: str, settings = Depends(get_settings)):
+    """Remove a resume from the candidate pool"""
+    
+    document = await asyncio.to_thread(document_store.get, file_id)
+    if document is None or document['document_type'] != "resume":
+        raise HTTPException(status_code=404, detail=f"Resume not found: {file_id}")
+    
+    await asyncio.to_thread(document_store.remove, file_id)
+    await asyncio.to_thread(ml_service.remove_document, file_id)
+    await asyncio.to_thread(remove_resume, file_id)
+    
+    # Without the upload a re-upload of the same bytes must be processed anew
+    content_hash = await asyncio.to_thread(
+        FileService.remove_upload, settings.UPLOAD_DIR, file_id, document['filename']
+    )
+    if content_hash is not None:
+        await asyncio.to_thread(artifact_cache.delete, content_hash, "resume", file_id)
+    
+    logger.info(f"Resume deleted: {file_id}")
+    
+    return {"file_id": file_id, "deleted": True}
+
+@router.put("/job/{job_id}", response_model=JobUpdateResponse)
+async def update_job(job_id: str, request: JobUpdateRequest):
+    """Edit a job description and incrementally re-score its stored matches"""
+    
+    job = await asyncio.to_thread(document_store.get, job_id)
+    if job is None or job['document_type'] != "job_description":
+        raise HTTPException(status_code=404, detail=f"Job description not found: {job_id}")
+    
+    try:
+        text, entities, embedding, chunks = None, None, None, None
+        skills, experience_years = job['skills'], job['experience_years']
+        changed = set()
+        
+        # Only a text change needs NLP and a new embedding
+        if request.text is not None and request.text != job['text']:
+            text = request.text
+            processed = await worker_pool.run(tasks.process_document, text, "job_description")
+            embedded = (await inference_scheduler.embed_documents([text]))[0]
+            embedding, chunks, entities = embedded['embedding'], embedded['chunks'], processed['entities']
+            skills, experience_years = processed['skills'], tuple(processed['experience_years'])
+            changed.add('semantic')
+        elif job['embedding_model'] != ml_service.model_name:
+            # Embedded by a previously configured model: stored similarities are stale too
+            job = await reembed_service.current(job)
+            changed.add('semantic')
+        
+        if request.required_skills is not None:
+            skills = request.required_skills
+        if request.experience_years is not None:
+            experience_years = (request.experience_years, max(request.experience_years, experience_years[1]))
+        
+        if set(s.lower() for s in skills) != set(s.lower() for s in job['skills']):
+            changed.add('skills')
+        if experience_years[0] != job['experience_years'][0]:
+            changed.add('experience')
+        
+        await asyncio.to_thread(
+            document_store.update_job, job_id, text, skills, entities, experience_years, embedding, chunks,
+            ml_service.model_name if embedding is not None else None
+        )
+        
+        updated = {
+            **job,
+            'skills': skills,
+            'experience_years': experience_years,
+            'embedding': job['embedding'] if embedding is None else embedding,
+            'chunks': job['chunks'] if chunks is None else chunks
+        }
+        rescored = await asyncio.to_thread(get_rescoring_service().rescore_job, updated, changed)
+        
+        logger.info(f"Job description updated: {job_id} ({sorted(changed) or 'no score changes'})")
+        
+        return JobUpdateResponse(
+            job_id=job_id,
+            changed_components=sorted(changed),
+            rescored_matches=rescored,
+            timestamp=datetime.now()
+        )
+    
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error updating job description: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,101 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+import threading
+import json
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ArtifactCache:
+    """Content-addressed cache of everything derived from an uploaded file.
+
+    Keyed by the sha256 of the file bytes (computed while streaming) and the
+    document type, it maps a re-uploaded file to its original file_id,
+    extracted text and NLP result. Embeddings need no entry here: the
+    embedding store already keys them by text hash.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0}
+
+    def _path(self, content_hash: str, doc_type: str) -> Path:
+        return self.cache_dir / content_hash[:2] / f"{content_hash}.{doc_type}.json"
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def get(self, content_hash: str, doc_type: str) -> Optional[Dict]:
+        """Artifacts of a previously processed identical file, or None"""
+        path = self._path(content_hash, doc_type)
+
+        try:
+            with open(path, encoding='utf-8') as f:
+                artifact = json.load(f)
+        except FileNotFoundError:
+            artifact = None
+        except Exception as e:
+            logger.error(f"Error reading cached artifacts {path}: {e}")
+            artifact = None
+
+        # The original upload must still exist for its file_id to be reused
+        if artifact is None or not Path(artifact['file_path']).exists():
+            self._count('misses')
+            return None
+
+        self._count('hits')
+        return artifact
+
+    def put(self, content_hash: str, doc_type: str, file_id: str, file_path: str, filename: str, nlp_result: Dict):
+        """Record the artifacts of a processed file"""
+        path = self._path(content_hash, doc_type)
+        artifact = {
+            'content_hash': content_hash,
+            'file_id': file_id,
+            'file_path': file_path,
+            'filename': filename,
+            'nlp': nlp_result
+        }
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(artifact, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error writing cached artifacts {path}: {e}")
+
+    def delete(self, content_hash: str, doc_type: str, file_id: str):
+        """Drop the entry for a file if it still points at this file_id"""
+        path = self._path(content_hash, doc_type)
+
+        try:
+            with open(path, encoding='utf-8') as f:
+                artifact = json.load(f)
+            if artifact['file_id'] == file_id:
+                path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error deleting cached artifacts {path}: {e}")
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for duplicate detection"""
+        with self._lock:
+            counters = dict(self._counters)
+
+        lookups = counters['hits'] + counters['misses']
+        return {
+            **counters,
+            'hit_ratio': round(counters['hits'] / lookups, 4) if lookups else 0.0
+        }
+
+@lru_cache()
+def get_artifact_cache(cache_dir: str) -> ArtifactCache:
+    return ArtifactCache(cache_dir)
@@ -0,0 +1,304 @@
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SkillVocabulary:
+    """Lowercased skill name <-> integer id, assigned on first sight"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._skills: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+    @property
+    def words(self) -> int:
+        """uint64 blocks needed for a bitset over the whole vocabulary"""
+        return max(1, (len(self._skills) + 63) // 64)
+
+    def id(self, skill: str) -> int:
+        skill = skill.lower()
+        skill_id = self._ids.get(skill)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._ids.setdefault(skill, len(self._skills))
+                if skill_id == len(self._skills):
+                    self._skills.append(skill)
+        return skill_id
+
+    def known(self, skill: str) -> bool:
+        return skill.lower() in self._ids
+
+    def encode(self, skills: Iterable[str], words: Optional[int] = None) -> np.ndarray:
+        """Bitset (uint64 blocks) with one bit per distinct skill"""
+        return self.encode_all([skills], words)[0]
+
+    def encode_all(self, skill_lists: List[Iterable[str]], words: Optional[int] = None) -> np.ndarray:
+        """One bitset row per skill list, all as wide as the final vocabulary"""
+        id_sets = [{self.id(skill) for skill in skills} for skills in skill_lists]
+        bits = np.zeros((len(id_sets), max(words or 0, self.words)), dtype=np.uint64)
+        for row, ids in enumerate(id_sets):
+            ids = np.fromiter(ids, dtype=np.int64, count=len(ids))
+            np.bitwise_or.at(bits[row], ids // 64, np.left_shift(np.uint64(1), (ids % 64).astype(np.uint64)))
+        return bits
+
+    def decode(self, bits: np.ndarray) -> List[str]:
+        """Skill names of the set bits, in id order"""
+        flags = np.unpackbits(np.ascontiguousarray(bits, dtype='<u8').view(np.uint8), bitorder='little')
+        return [self._skills[i] for i in np.flatnonzero(flags[:len(self._skills)])]
+
+class CandidateTable:
+    """Row-aligned columnar view of candidate resumes for vectorized ranking.
+
+    Skills are bitsets over a shared SkillVocabulary (uint64 blocks per
+    row), experience is an int array and embeddings a normalized float
+    matrix, so skill overlap is popcount(AND) and filters are array
+    comparisons over every candidate at once. Rows of removed resumes are
+    masked out until the next rebuild, or until they make up COMPACT_FRACTION
+    of the table and sync() compacts it.
+    """
+
+    COMPACT_FRACTION = 0.25
+
+    def __init__(self, vocabulary: Optional[SkillVocabulary] = None):
+        self.vocabulary = vocabulary if vocabulary is not None else get_skill_vocabulary()
+        self.dim: Optional[int] = None
+        self.ids: List[Optional[str]] = []
+        self.filenames: List[Optional[str]] = []
+        self.chunks: List[Optional[np.ndarray]] = []
+        self.skill_bits = np.zeros((0, 1), dtype=np.uint64)
+        self.experience = np.zeros(0, dtype=np.int32)
+        self.embeddings = np.zeros((0, 0), dtype=np.float32)
+        self.alive = np.zeros(0, dtype=bool)
+        self._rows: Dict[str, int] = {}
+        self._size = 0
+        self._signature: Optional[Tuple] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, file_id: str) -> bool:
+        return file_id in self._rows
+
+    @property
+    def dead_rows(self) -> int:
+        """Rows of removed or replaced candidates still taking space"""
+        return self._size - len(self._rows)
+
+    @classmethod
+    def from_records(cls, records: List[Dict], vocabulary: Optional[SkillVocabulary] = None) -> "CandidateTable":
+        """Table whose row i is records[i]"""
+        table = cls(vocabulary)
+        table.add(records)
+        return table
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _reserve(self, extra: int, words: int):
+        needed = self._size + extra
+        capacity = len(self.alive)
+        if needed > capacity:
+            capacity = max(needed, capacity * 2, 1024)
+            self.experience = np.resize(self.experience, capacity)
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:self._size] = self.alive[:self._size]
+            self.alive = alive
+            embeddings = np.zeros((capacity, self.dim or 0), dtype=np.float32)
+            embeddings[:self._size] = self.embeddings[:self._size]
+            self.embeddings = embeddings
+
+        # Widen every bitset when the vocabulary outgrows the blocks
+        if needed > self.skill_bits.shape[0] or words > self.skill_bits.shape[1]:
+            bits = np.zeros((capacity, max(words, self.skill_bits.shape[1])), dtype=np.uint64)
+            bits[:self._size, :self.skill_bits.shape[1]] = self.skill_bits[:self._size]
+            self.skill_bits = bits
+
+    def add(self, records: List[Dict]):
+        """Insert or replace candidates (dicts as returned by DocumentStore)"""
+        if not records:
+            return
+
+        with self._lock:
+            if self.dim is None and records[0].get('embedding') is not None:
+                self.dim = len(records[0]['embedding'])
+                self.embeddings = np.zeros((len(self.alive), self.dim), dtype=np.float32)
+
+            self.remove([record['file_id'] for record in records if record['file_id'] in self._rows])
+
+            # Encode first so the vocabulary (and bitset width) is final
+            encoded = self.vocabulary.encode_all([record['skills'] for record in records])
+            self._reserve(len(records), encoded.shape[1])
+
+            rows = slice(self._size, self._size + len(records))
+            for offset, (record, bits) in enumerate(zip(records, encoded)):
+                row = self._size + offset
+                self.skill_bits[row, :len(bits)] = bits
+                self._rows[record['file_id']] = row
+                self.ids.append(record['file_id'])
+                self.filenames.append(record.get('filename'))
+                self.chunks.append(record.get('chunks'))
+            self.experience[rows] = [record['experience_years'][0] for record in records]
+            if self.dim is not None:
+                self.embeddings[rows] = self._normalize([
+                    np.zeros(self.dim, dtype=np.float32) if record.get('embedding') is None else record['embedding']
+                    for record in records
+                ])
+            self.alive[rows] = True
+            self._size += len(records)
+
+    def compacted(self) -> "CandidateTable":
+        """A copy holding only the live rows, renumbered in order"""
+        with self._lock:
+            rows = np.flatnonzero(self.alive[:self._size])
+            table = CandidateTable(self.vocabulary)
+            table.dim = self.dim
+            table.ids = [self.ids[row] for row in rows]
+            table.filenames = [self.filenames[row] for row in rows]
+            table.chunks = [self.chunks[row] for row in rows]
+            table.skill_bits = self.skill_bits[rows]
+            table.experience = self.experience[rows]
+            table.embeddings = self.embeddings[rows]
+            table.alive = np.ones(len(rows), dtype=bool)
+            table._rows = {file_id: row for row, file_id in enumerate(table.ids)}
+            table._size = len(rows)
+            return table
+
+    def remove(self, file_ids: Iterable[str]):
+        with self._lock:
+            for file_id in file_ids:
+                row = self._rows.pop(file_id, None)
+                if row is not None:
+                    # ids stay readable so a ranking already holding the row can finish
+                    self.alive[row] = False
+
+    def rows_for(self, file_ids: Iterable[str]) -> np.ndarray:
+        """Row indices of the given ids that are in the table"""
+        return np.array([self._rows[f] for f in file_ids if f in self._rows], dtype=np.int64)
+
+    def select(
+        self,
+        file_ids: Optional[Iterable[str]] = None,
+        min_experience_years: Optional[int] = None,
+        must_have_skills: Optional[List[str]] = None
+    ) -> np.ndarray:
+        """Rows passing every filter, evaluated column-wise"""
+        with self._lock:
+            mask = self.alive[:self._size].copy()
+            if file_ids is not None:
+                wanted = np.zeros(self._size, dtype=bool)
+                wanted[self.rows_for(file_ids)] = True
+                mask &= wanted
+            if min_experience_years is not None:
+                mask &= self.experience[:self._size] >= min_experience_years
+            if must_have_skills:
+                # A skill no resume has ever listed cannot be satisfied
+                if not all(self.vocabulary.known(skill) for skill in must_have_skills):
+                    return np.zeros(0, dtype=np.int64)
+                required = self.skill_bits_for(must_have_skills)
+                mask &= ((self.skill_bits[:self._size] & required) == required).all(axis=1)
+            return np.flatnonzero(mask)
+
+    def skill_bits_for(self, skills: Iterable[str]) -> np.ndarray:
+        """Bitset of a skill list, as wide as the table's rows"""
+        with self._lock:
+            bits = self.vocabulary.encode(skills, self.skill_bits.shape[1])
+            self._reserve(0, len(bits))
+            return bits
+
+    def skill_counts(self, rows: np.ndarray, job_bits: np.ndarray) -> np.ndarray:
+        """Number of job skills each row has: popcount of the AND"""
+        # One snapshot: a concurrent add() swaps in a wider array rather than
+        # widening this one, so the rows and their width stay consistent
+        bits = self.skill_bits
+        return np.bitwise_count(bits[rows] & self._fit(job_bits, bits.shape[1])).sum(axis=1, dtype=np.int64)
+
+    @staticmethod
+    def _fit(job_bits: np.ndarray, width: int) -> np.ndarray:
+        """A bitset padded or cut to `width` blocks; cut blocks hold no skill of a narrower table"""
+        if len(job_bits) == width:
+            return job_bits
+        fitted = np.zeros(width, dtype=np.uint64)
+        fitted[:min(width, len(job_bits))] = job_bits[:width]
+        return fitted
+
+    def skill_split(self, row: int, job_bits: np.ndarray) -> Tuple[List[str], List[str]]:
+        """Matched and missing job skills of one row"""
+        bits = self._fit(self.skill_bits[row], len(job_bits))
+        return self.vocabulary.decode(bits & job_bits), self.vocabulary.decode(job_bits & ~bits)
+
+    def sync(
+        self,
+        store,
+        with_chunks: bool = True,
+        shard: Optional[Tuple[int, int]] = None,
+        embedding_model: Optional[str] = None
+    ) -> "CandidateTable":
+        """Bring the table up to date with a DocumentStore.
+
+        Resumes (re-)uploaded since the last sync are upserted in place; if
+        the counts then disagree (deletes, possibly by another worker
+        process, or uploads sharing the last seen timestamp) the table is
+        rebuilt from the store, and once dead rows pile up it is compacted.
+        Returns the table to use: this one, or its replacement. With
+        shard=(index, shards) only the resumes of that shard are loaded
+        (selected in SQL), and with embedding_model only those whose
+        embeddings that model produced.
+        """
+        signature = store.resume_signature(embedding_model, shard)
+        with self._lock:
+            if signature == self._signature:
+                return self
+
+            count, latest = signature
+            previous = self._signature
+            if previous is not None and previous[1] is not None and latest is not None:
+                self.add(store.list_resumes(
+                    uploaded_after=previous[1], with_chunks=with_chunks, embedding_model=embedding_model, shard=shard
+                ))
+
+            table = self
+            if len(self) != count:
+                table = CandidateTable.from_records(
+                    store.list_resumes(with_chunks=with_chunks, embedding_model=embedding_model, shard=shard),
+                    self.vocabulary
+                )
+                logger.info(f"Candidate table rebuilt: {len(table)} resumes")
+            elif self.dead_rows > self.COMPACT_FRACTION * self._size:
+                table = self.compacted()
+            table._signature = signature
+            return table
+
+@lru_cache()
+def get_skill_vocabulary() -> SkillVocabulary:
+    return SkillVocabulary()
+
+_table: Optional[CandidateTable] = None
+_table_lock = threading.Lock()
+
+def get_candidate_table(
+    store,
+    with_chunks: bool = True,
+    shard: Optional[Tuple[int, int]] = None,
+    embedding_model: Optional[str] = None
+) -> CandidateTable:
+    """Process-wide table of every stored resume (or of one shard), synced with the store on each call.
+
+    A rebuild swaps in a new table, so callers ranking against the previous
+    one keep a consistent view.
+    """
+    global _table
+    with _table_lock:
+        _table = (_table if _table is not None else CandidateTable()).sync(store, with_chunks, shard, embedding_model)
+        return _table
@@ -1,6 +1,10 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
+from contextlib import contextmanager
+from typing import Iterator
 from app.core.config import get_settings
+from app.models.db import Base
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,45 +12,119 @@ logger = logging.getLogger(__name__)
 class DatabaseService:
     _engine = None
     _SessionLocal = None
+    _lock = threading.Lock()
 
     @classmethod
     def initialize(cls):
         settings = get_settings()
-        
-        try:
-            cls._engine = create_engine(
-                settings.DATABASE_URL,
-                echo=settings.DEBUG,
-                pool_pre_ping=True,
-            )
-            cls._SessionLocal = sessionmaker(
-                autocommit=False,
-                autoflush=False,
-                bind=cls._engine,
-            )
-            logger.info("Database connection initialized")
-        except Exception as e:
-            logger.error(f"Database initialization error: {e}")
-            raise
+
+        with cls._lock:
+            if cls._engine is not None:
+                return
+
+            try:
+                if settings.DATABASE_URL.startswith("sqlite"):
+                    # One file, many threads: share connections across threads and use WAL
+                    engine = create_engine(
+                        settings.DATABASE_URL,
+                        echo=settings.DB_ECHO,
+                        connect_args={"check_same_thread": False},
+                    )
+                    event.listen(engine, "connect", cls._configure_sqlite)
+                else:
+                    engine = create_engine(
+                        settings.DATABASE_URL,
+                        echo=settings.DB_ECHO,
+                        pool_pre_ping=True,
+                        pool_size=settings.DB_POOL_SIZE,
+                        max_overflow=settings.DB_MAX_OVERFLOW,
+                        pool_recycle=settings.DB_POOL_RECYCLE,
+                    )
+
+                Base.metadata.create_all(bind=engine)
+                cls._add_missing_columns(engine)
+
+                cls._SessionLocal = sessionmaker(
+                    autocommit=False,
+                    autoflush=False,
+                    expire_on_commit=False,
+                    bind=engine,
+                )
+                cls._engine = engine
+                logger.info("Database connection initialized")
+            except Exception as e:
+                logger.error(f"Database initialization error: {e}")
+                raise
+
+    @staticmethod
+    def _add_missing_columns(engine):
+        """Add columns (and their indexes) that the models gained since a table was created.
+
+        create_all only creates missing tables, so a database from an older
+        version would otherwise fail on every query naming a new column.
+        New columns are nullable and start out NULL.
+        """
+        inspector = inspect(engine)
+        with engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                if not inspector.has_table(table.name):
+                    continue
+                existing = {column['name'] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in existing:
+                        continue
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                    logger.info(f"Added column {table.name}.{column.name}")
+
+                indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+                for index in table.indexes:
+                    if index.name not in indexes:
+                        index.create(connection)
+                        logger.info(f"Added index {index.name}")
+
+    @staticmethod
+    def _configure_sqlite(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    @classmethod
+    def get_engine(cls):
+        if cls._engine is None:
+            cls.initialize()
+        return cls._engine
 
     @classmethod
     def get_db(cls) -> Session:
         if cls._SessionLocal is None:
             cls.initialize()
-        
+
+        db = cls._SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @classmethod
+    @contextmanager
+    def session(cls) -> Iterator[Session]:
+        """Transactional session for use outside request dependencies"""
+        if cls._SessionLocal is None:
+            cls.initialize()
+
         db = cls._SessionLocal()
         try:
             yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
         finally:
             db.close()
 
 def get_db_session():
-    """Dependency for getting DB session"""
-    settings = get_settings()
-    engine = create_engine(settings.DATABASE_URL)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    """Dependency for getting DB session from the shared connection pool"""
+    yield from DatabaseService.get_db()
@@ -0,0 +1,447 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, insert, select, update
+from app.models.db import Resume, JobDescription, MatchResult
+from app.services.db_service import DatabaseService
+import numpy as np
+import json
+import zlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+def shard_key(file_id: str) -> int:
+    """Stable hash of a resume id (unlike hash()), stored so rank shards select their rows in SQL"""
+    return zlib.crc32(file_id.encode('utf-8')) & 0x7FFFFFFF
+
+class DocumentStore:
+    """Processed documents and match results, persisted through the pooled database engine"""
+
+    @staticmethod
+    def _encode_embedding(embedding) -> Optional[bytes]:
+        if embedding is None:
+            return None
+        return np.asarray(embedding, dtype=np.float32).tobytes()
+
+    @staticmethod
+    def _decode_embedding(blob: Optional[bytes]) -> Optional[np.ndarray]:
+        if blob is None:
+            return None
+        return np.frombuffer(blob, dtype=np.float32)
+
+    @staticmethod
+    def _decode_chunks(blob: Optional[bytes], embedding: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        # Chunk rows share the pooled embedding's dimension
+        if blob is None or embedding is None:
+            return None
+        return np.frombuffer(blob, dtype=np.float32).reshape(-1, len(embedding))
+
+    def _resume_to_dict(self, row: Resume) -> Dict:
+        embedding = self._decode_embedding(getattr(row, 'embedding', None))
+        document = {
+            'file_id': row.id,
+            'filename': row.filename,
+            'document_type': "resume",
+            'skills': json.loads(row.skills or "[]"),
+            'experience_years': (row.experience_years or 0, row.experience_years_max or 0),
+            'embedding': embedding,
+            'chunks': self._decode_chunks(getattr(row, 'chunk_embeddings', None), embedding),
+            'embedding_model': getattr(row, 'embedding_model', None),
+            'uploaded_at': row.upload_timestamp
+        }
+        # Column-only rows from list_resumes may leave the text out
+        if hasattr(row, 'extracted_text'):
+            document['text'] = row.extracted_text
+            document['entities'] = json.loads(row.entities or "{}")
+        if hasattr(row, 'tokens'):
+            document['tokens'] = json.loads(row.tokens) if row.tokens is not None else None
+        return document
+
+    def _job_to_dict(self, row: JobDescription) -> Dict:
+        embedding = self._decode_embedding(row.embedding)
+        return {
+            'file_id': row.id,
+            'filename': row.filename,
+            'document_type': "job_description",
+            'text': row.extracted_text,
+            'skills': json.loads(row.required_skills or "[]"),
+            'entities': json.loads(row.entities or "{}"),
+            'experience_years': (row.experience_required or 0, row.experience_required_max or 0),
+            'embedding': embedding,
+            'chunks': self._decode_chunks(row.chunk_embeddings, embedding),
+            'embedding_model': row.embedding_model,
+            'uploaded_at': row.upload_timestamp
+        }
+
+    def add(
+        self,
+        file_id: str,
+        filename: str,
+        doc_type: str,
+        processed: Dict,
+        embedding=None,
+        chunk_embeddings=None,
+        embedding_model: Optional[str] = None
+    ) -> Dict:
+        """Store a processed document under its file_id (re-uploads overwrite).
+
+        embedding_model names the model that produced the embeddings, so
+        vectors of different models are never compared.
+        """
+        years_min, years_max = processed['experience_years']
+        skills = json.dumps(list(processed['skills']))
+        entities = json.dumps(processed.get('entities', {}))
+        blob = self._encode_embedding(embedding)
+        chunk_blob = self._encode_embedding(chunk_embeddings)
+
+        try:
+            with DatabaseService.session() as db:
+                if doc_type == "resume":
+                    row = Resume(
+                        id=file_id,
+                        filename=filename,
+                        extracted_text=processed['original_text'],
+                        skills=skills,
+                        entities=entities,
+                        tokens=json.dumps(processed['tokens']) if 'tokens' in processed else None,
+                        experience_years=years_min,
+                        experience_years_max=years_max,
+                        embedding=blob,
+                        chunk_embeddings=chunk_blob,
+                        embedding_model=embedding_model,
+                        shard_key=shard_key(file_id),
+                        upload_timestamp=datetime.utcnow()
+                    )
+                else:
+                    row = JobDescription(
+                        id=file_id,
+                        filename=filename,
+                        extracted_text=processed['original_text'],
+                        required_skills=skills,
+                        entities=entities,
+                        experience_required=years_min,
+                        experience_required_max=years_max,
+                        embedding=blob,
+                        chunk_embeddings=chunk_blob,
+                        embedding_model=embedding_model
+                    )
+                row = db.merge(row)
+                db.flush()
+                document = self._resume_to_dict(row) if doc_type == "resume" else self._job_to_dict(row)
+        except Exception as e:
+            logger.error(f"Error storing document {file_id}: {e}")
+            raise
+
+        logger.info(f"Document stored: {file_id} ({doc_type})")
+        return document
+
+    def get(self, file_id: str) -> Optional[Dict]:
+        """Get a resume or job description by file_id"""
+        with DatabaseService.session() as db:
+            row = db.get(Resume, file_id)
+            if row is not None:
+                return self._resume_to_dict(row)
+            row = db.get(JobDescription, file_id)
+            if row is not None:
+                return self._job_to_dict(row)
+        return None
+
+    def remove(self, file_id: str) -> bool:
+        """Remove a document and its match results, returning whether it existed"""
+        with DatabaseService.session() as db:
+            removed = 0
+            for model in (Resume, JobDescription):
+                removed += db.execute(delete(model).where(model.id == file_id)).rowcount
+            db.execute(delete(MatchResult).where(
+                (MatchResult.resume_id == file_id) | (MatchResult.job_id == file_id)
+            ))
+        return removed > 0
+
+    def count(self, doc_type: str) -> int:
+        """Number of stored documents of a given type"""
+        model = Resume if doc_type == "resume" else JobDescription
+        with DatabaseService.session() as db:
+            return db.query(model).count()
+
+    @staticmethod
+    def _filter_resumes(query, embedding_model: Optional[str], shard: Optional[Tuple[int, int]]):
+        if embedding_model is not None:
+            query = query.where(Resume.embedding_model == embedding_model)
+        if shard is not None:
+            query = query.where(Resume.shard_key % shard[1] == shard[0])
+        return query
+
+    def resume_signature(
+        self,
+        embedding_model: Optional[str] = None,
+        shard: Optional[Tuple[int, int]] = None
+    ) -> Tuple[int, Optional[datetime]]:
+        """(count, latest upload time) of stored resumes, to detect changes cheaply.
+
+        Filtered like list_resumes: by embedding model and by shard
+        (index, shards), if given.
+        """
+        query = self._filter_resumes(
+            select(func.count(Resume.id), func.max(Resume.upload_timestamp)), embedding_model, shard
+        )
+        with DatabaseService.session() as db:
+            count, latest = db.execute(query).one()
+        return count, latest
+
+    def resume_ids(self, embedding_model: Optional[str] = None, shard: Optional[Tuple[int, int]] = None) -> List[str]:
+        """Ids of every stored resume (embedded by one model, of one shard, if given)"""
+        query = self._filter_resumes(select(Resume.id), embedding_model, shard)
+        with DatabaseService.session() as db:
+            return list(db.execute(query).scalars())
+
+    def list_resumes(
+        self,
+        file_ids: Optional[Iterable[str]] = None,
+        min_experience_years: Optional[int] = None,
+        with_text: bool = False,
+        with_embedding: bool = True,
+        with_chunks: bool = False,
+        with_tokens: bool = False,
+        uploaded_after: Optional[datetime] = None,
+        embedding_model: Optional[str] = None,
+        shard: Optional[Tuple[int, int]] = None
+    ) -> List[Dict]:
+        """Candidate resumes for ranking, filtered in SQL.
+
+        The extracted text is only loaded when asked for; ranking needs
+        just the skills, experience and stored embedding (and chunk
+        embeddings for max-sim scoring, tokens for the lexical index).
+        With embedding_model, only resumes embedded by that model are listed,
+        and with shard=(index, shards) only those whose shard_key falls in
+        that shard. uploaded_after is exclusive, so a sync from the latest
+        timestamp it saw gets only newer uploads.
+        """
+        columns = [
+            Resume.id, Resume.filename, Resume.skills, Resume.experience_years,
+            Resume.experience_years_max, Resume.embedding_model, Resume.upload_timestamp
+        ]
+        if with_embedding:
+            columns.append(Resume.embedding)
+            if with_chunks:
+                columns.append(Resume.chunk_embeddings)
+        if with_text:
+            columns += [Resume.extracted_text, Resume.entities]
+        if with_tokens:
+            columns.append(Resume.tokens)
+
+        query = select(*columns)
+        if file_ids is not None:
+            query = query.where(Resume.id.in_(list(file_ids)))
+        if min_experience_years is not None:
+            query = query.where(Resume.experience_years >= min_experience_years)
+        if uploaded_after is not None:
+            query = query.where(Resume.upload_timestamp > uploaded_after)
+        query = self._filter_resumes(query, embedding_model, shard)
+
+        with DatabaseService.session() as db:
+            rows = db.execute(query).all()
+
+        return [self._resume_to_dict(row) for row in rows]
+
+    def backfill_shard_keys(self, batch_size: int = 1000) -> int:
+        """Set shard_key on resumes stored before it existed; returns how many were updated"""
+        updated = 0
+        while True:
+            with DatabaseService.session() as db:
+                ids = list(db.execute(select(Resume.id).where(Resume.shard_key.is_(None)).limit(batch_size)).scalars())
+                for file_id in ids:
+                    db.execute(update(Resume).where(Resume.id == file_id).values(shard_key=shard_key(file_id)))
+            updated += len(ids)
+            if len(ids) < batch_size:
+                break
+        if updated:
+            logger.info(f"Shard keys backfilled for {updated} resumes")
+        return updated
+
+    def stale_documents(self, embedding_model: str, limit: int = 100) -> List[Dict]:
+        """Documents whose embeddings were not produced by embedding_model (or predate tracking it)"""
+        documents = []
+        with DatabaseService.session() as db:
+            for model, doc_type in ((Resume, "resume"), (JobDescription, "job_description")):
+                stale = (model.embedding_model != embedding_model) | (model.embedding_model.is_(None))
+                query = select(model.id, model.extracted_text).where(stale).limit(limit - len(documents))
+                documents += [
+                    {'file_id': file_id, 'document_type': doc_type, 'text': text or ""}
+                    for file_id, text in db.execute(query).all()
+                ]
+                if len(documents) >= limit:
+                    break
+        return documents
+
+    def update_embedding(self, file_id: str, doc_type: str, embedding, chunk_embeddings, embedding_model: str):
+        """Replace a document's embeddings with ones from embedding_model"""
+        values = {
+            'embedding': self._encode_embedding(embedding),
+            'chunk_embeddings': self._encode_embedding(chunk_embeddings),
+            'embedding_model': embedding_model
+        }
+        model = Resume if doc_type == "resume" else JobDescription
+        if doc_type == "resume":
+            # Counts as a new upload, so synced tables and indexes pick the vectors up
+            values['upload_timestamp'] = datetime.utcnow()
+        with DatabaseService.session() as db:
+            db.execute(update(model).where(model.id == file_id).values(**values))
+
+    def save_matches(self, job_id: str, matches: List[Dict]):
+        """Bulk-insert match results for a job, replacing earlier results for the same resumes"""
+        if not matches:
+            return
+
+        rows = [
+            {
+                'job_id': job_id,
+                'resume_id': match['resume_id'],
+                'match_score': match['match_score'],
+                'similarity_score': match['similarity_score'],
+                'skill_score': match.get('skill_score'),
+                'experience_match': match.get('experience_match'),
+                'education_match': match.get('education_match'),
+                'matched_skills': json.dumps(match['matched_skills']),
+                'missing_skills': json.dumps(match['missing_skills']),
+                'cache_key': match.get('cache_key')
+            }
+            for match in matches
+        ]
+
+        try:
+            with DatabaseService.session() as db:
+                db.execute(delete(MatchResult).where(
+                    MatchResult.job_id == job_id,
+                    MatchResult.resume_id.in_([row['resume_id'] for row in rows])
+                ))
+                db.execute(insert(MatchResult), rows)
+        except Exception as e:
+            logger.error(f"Error saving match results for job {job_id}: {e}")
+            raise
+
+    def find_match(self, job_id: str, resume_id: str, cache_key: str) -> Optional[Dict]:
+        """Stored result for a pair if it was computed from inputs with this cache key"""
+        query = select(MatchResult).where(
+            MatchResult.job_id == job_id,
+            MatchResult.resume_id == resume_id,
+            MatchResult.cache_key == cache_key
+        ).limit(1)
+
+        with DatabaseService.session() as db:
+            row = db.execute(query).scalars().first()
+            if row is None:
+                return None
+            return {
+                'resume_id': row.resume_id,
+                'match_score': row.match_score,
+                'similarity_score': row.similarity_score,
+                'skill_score': row.skill_score,
+                'experience_match': row.experience_match,
+                'education_match': row.education_match,
+                'matched_skills': json.loads(row.matched_skills or "[]"),
+                'missing_skills': json.loads(row.missing_skills or "[]"),
+                'cache_key': row.cache_key
+            }
+
+    def match_components(self, job_id: str) -> List[Dict]:
+        """Stored score components of every match result for a job"""
+        query = select(
+            MatchResult.id, MatchResult.resume_id, MatchResult.similarity_score,
+            MatchResult.skill_score, MatchResult.experience_match, MatchResult.education_match
+        ).where(MatchResult.job_id == job_id)
+
+        with DatabaseService.session() as db:
+            return [dict(row._mapping) for row in db.execute(query).all()]
+
+    def update_matches(self, rows: List[Dict]):
+        """Bulk-update match results by primary key ('id' plus the columns to set)"""
+        if not rows:
+            return
+
+        encoded = [
+            {
+                **row,
+                **{key: json.dumps(row[key]) for key in ('matched_skills', 'missing_skills') if key in row}
+            }
+            for row in rows
+        ]
+
+        try:
+            with DatabaseService.session() as db:
+                db.execute(update(MatchResult), encoded)
+        except Exception as e:
+            logger.error(f"Error updating match results: {e}")
+            raise
+
+    def delete_matches(self, ids: List[int]):
+        """Delete match results by primary key"""
+        if not ids:
+            return
+
+        try:
+            with DatabaseService.session() as db:
+                db.execute(delete(MatchResult).where(MatchResult.id.in_(ids)))
+        except Exception as e:
+            logger.error(f"Error deleting match results: {e}")
+            raise
+
+    def update_job(
+        self,
+        job_id: str,
+        text: Optional[str] = None,
+        skills: Optional[List[str]] = None,
+        entities: Optional[Dict] = None,
+        experience_years: Optional[tuple] = None,
+        embedding=None,
+        chunk_embeddings=None,
+        embedding_model: Optional[str] = None
+    ):
+        """Overwrite the given fields of a stored job description"""
+        values = {}
+        if text is not None:
+            values['extracted_text'] = text
+        if skills is not None:
+            values['required_skills'] = json.dumps(list(skills))
+        if entities is not None:
+            values['entities'] = json.dumps(entities)
+        if experience_years is not None:
+            values['experience_required'], values['experience_required_max'] = experience_years
+        if embedding is not None:
+            values['embedding'] = self._encode_embedding(embedding)
+        if chunk_embeddings is not None:
+            values['chunk_embeddings'] = self._encode_embedding(chunk_embeddings)
+        if embedding_model is not None:
+            values['embedding_model'] = embedding_model
+        if not values:
+            return
+
+        with DatabaseService.session() as db:
+            db.execute(update(JobDescription).where(JobDescription.id == job_id).values(**values))
+
+    def list_matches(self, job_id: str, limit: int = 100) -> List[Dict]:
+        """Stored match results for a job, best first (served by ix_match_results_job_score)"""
+        query = (
+            select(MatchResult)
+            .where(MatchResult.job_id == job_id)
+            .order_by(MatchResult.match_score.desc())
+            .limit(limit)
+        )
+
+        with DatabaseService.session() as db:
+            rows = db.execute(query).scalars().all()
+
+        return [
+            {
+                'resume_id': row.resume_id,
+                'job_id': row.job_id,
+                'match_score': row.match_score,
+                'similarity_score': row.similarity_score,
+                'matched_skills': json.loads(row.matched_skills or "[]"),
+                'missing_skills': json.loads(row.missing_skills or "[]"),
+                'created_at': row.created_at
+            }
+            for row in rows
+        ]
+
+# Shared instance used by the upload and matching routes
+document_store = DocumentStore()
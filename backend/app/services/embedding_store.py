@@ -0,0 +1,114 @@
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+import hashlib
+import threading
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingStore:
+    """Embedding cache keyed by (model name, sha256 of normalized text).
+
+    An in-process LRU tier sits in front of a durable tier of float32 .npy
+    files, so a document is encoded once and reused by every match.
+    """
+
+    def __init__(self, model_name: str, cache_dir: str, max_memory_items: int = 10000):
+        self.model_name = model_name
+        self.max_memory_items = max_memory_items
+        self.cache_dir = Path(cache_dir) / model_name.replace('/', '__')
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """Hash of whitespace-normalized text"""
+        normalized = " ".join(text.split())
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.npy"
+
+    def _remember(self, key: str, embedding: np.ndarray):
+        with self._lock:
+            self._memory[key] = embedding
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Get a cached embedding, or None on a miss"""
+        key = self.content_hash(text)
+
+        with self._lock:
+            embedding = self._memory.get(key)
+            if embedding is not None:
+                self._memory.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                return embedding
+
+        path = self._path(key)
+        if path.exists():
+            try:
+                embedding = np.load(path)
+            except Exception as e:
+                logger.error(f"Error reading cached embedding {path}: {e}")
+            else:
+                self._remember(key, embedding)
+                self._count('disk_hits')
+                return embedding
+
+        self._count('misses')
+        return None
+
+    def put(self, text: str, embedding: np.ndarray):
+        """Store an embedding in both tiers"""
+        key = self.content_hash(text)
+        embedding = np.asarray(embedding, dtype=np.float32)
+        self._remember(key, embedding)
+
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                np.save(f, embedding)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error writing cached embedding {path}: {e}")
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up several texts at once"""
+        return [self.get(text) for text in texts]
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for the cache"""
+        with self._lock:
+            counters = dict(self._counters)
+            memory_items = len(self._memory)
+
+        lookups = counters['memory_hits'] + counters['disk_hits'] + counters['misses']
+        hits = counters['memory_hits'] + counters['disk_hits']
+
+        return {
+            'model': self.model_name,
+            **counters,
+            'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+            'memory_items': memory_items
+        }
+
+@lru_cache()
+def get_embedding_store(model_name: str, cache_dir: str, max_memory_items: int) -> EmbeddingStore:
+    """Process-wide store per model, shared by every MLService instance"""
+    return EmbeddingStore(model_name, cache_dir, max_memory_items)
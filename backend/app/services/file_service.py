@@ -1,17 +1,23 @@
-import pdfplumber
 from docx import Document
+from app.services.pdf_extractor import get_pdf_extractor
 from pathlib import Path
-from typing import Tuple
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+import zipfile
+import hashlib
 import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
+class FileTooLargeError(ValueError):
+    """Raised while streaming once a file passes the size limit"""
+
 class FileService:
     """Service for handling file uploads and text extraction"""
     
     ALLOWED_EXTENSIONS = {'pdf', 'docx'}
     MAX_FILE_SIZE = 52428800  # 50MB
+    CHUNK_SIZE = 1048576  # 1MB
     
     @staticmethod
     def allowed_file(filename: str) -> bool:
@@ -21,18 +27,18 @@ class FileService:
     
     @staticmethod
     def extract_text_from_pdf(file_path: str) -> str:
-        """Extract text from PDF file"""
+        """Extract text from PDF file (page and character limits from settings)"""
         try:
-            text = ""
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    text += page.extract_text() or ""
-                    text += "\n"
-            return text.strip()
+            return get_pdf_extractor().extract(file_path)
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
             raise
     
+    @staticmethod
+    def iter_pdf_pages(file_path: str) -> Iterator[str]:
+        """Yield PDF page texts one at a time, stopping at the configured limits"""
+        return get_pdf_extractor().iter_pages(file_path)
+    
     @staticmethod
     def extract_text_from_docx(file_path: str) -> str:
         """Extract text from DOCX file"""
@@ -40,7 +46,7 @@ class FileService:
             doc = Document(file_path)
             text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
             return text.strip()
-        except HTTPException as e:
+        except Exception as e:
             logger.error(f"Error extracting text from DOCX: {e}")
             raise
     
@@ -77,3 +83,122 @@ class FileService:
         logger.info(f"File saved: {file_path}")
         
         return file_id, str(file_path)
+    
+    @staticmethod
+    def iter_chunks(fileobj: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Read a file object in fixed-size chunks"""
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    
+    @staticmethod
+    def save_stream(
+        upload_dir: str,
+        chunks: Iterable[bytes],
+        filename: str,
+        max_size: int = MAX_FILE_SIZE
+    ) -> Tuple[str, str, str]:
+        """Stream chunks to a new upload file, enforcing max_size as bytes arrive.
+        
+        Returns file_id, file_path and the sha256 of the content, computed
+        on the same pass so duplicates can be detected without re-reading.
+        """
+        Path(upload_dir).mkdir(parents=True, exist_ok=True)
+        
+        file_id = str(uuid.uuid4())
+        file_ext = filename.rsplit('.', 1)[1].lower()
+        file_path = Path(upload_dir) / f"{file_id}.{file_ext}"
+        
+        size = 0
+        digest = hashlib.sha256()
+        try:
+            with open(file_path, 'wb') as f:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if size > max_size:
+                        raise FileTooLargeError(
+                            f"File size exceeds limit ({max_size / 1048576:g}MB)"
+                        )
+                    digest.update(chunk)
+                    f.write(chunk)
+        except Exception:
+            file_path.unlink(missing_ok=True)
+            raise
+        
+        logger.info(f"File saved: {file_path} ({size} bytes)")
+        
+        return file_id, str(file_path), digest.hexdigest()
+    
+    @staticmethod
+    def remove_upload(upload_dir: str, file_id: str, filename: str) -> Optional[str]:
+        """Delete a stored upload, returning the sha256 of its content (None if it was gone)"""
+        file_ext = filename.rsplit('.', 1)[1].lower()
+        file_path = Path(upload_dir) / f"{file_id}.{file_ext}"
+        
+        digest = hashlib.sha256()
+        try:
+            with open(file_path, 'rb') as f:
+                for chunk in FileService.iter_chunks(f):
+                    digest.update(chunk)
+        except FileNotFoundError:
+            return None
+        file_path.unlink(missing_ok=True)
+        
+        logger.info(f"File removed: {file_path}")
+        
+        return digest.hexdigest()
+    
+    @staticmethod
+    def save_zip_members(
+        upload_dir: str,
+        fileobj: BinaryIO,
+        max_size: int = MAX_FILE_SIZE,
+        max_files: int = 10000
+    ) -> List[Dict]:
+        """Stream every allowed member of a ZIP archive to disk.
+        
+        Returns one dict per member with filename plus either
+        file_id/file_path/content_hash or error, so a bad member never fails the whole archive.
+        """
+        results = []
+        
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or info.filename.startswith('__MACOSX/'):
+                    continue
+                
+                filename = Path(info.filename).name
+                if len(results) >= max_files:
+                    results.append({'filename': filename, 'error': f"Archive exceeds {max_files} files"})
+                    break
+                if not FileService.allowed_file(filename):
+                    results.append({'filename': filename, 'error': "File type not allowed"})
+                    continue
+                if info.file_size > max_size:
+                    results.append({
+                        'filename': filename,
+                        'error': f"File size exceeds limit ({max_size / 1048576:g}MB)"
+                    })
+                    continue
+                
+                try:
+                    # The declared size can lie, so the limit is enforced again while streaming
+                    with archive.open(info) as member:
+                        file_id, file_path, content_hash = FileService.save_stream(
+                            upload_dir,
+                            FileService.iter_chunks(member),
+                            filename,
+                            max_size
+                        )
+                    results.append({
+                        'filename': filename,
+                        'file_id': file_id,
+                        'file_path': file_path,
+                        'content_hash': content_hash
+                    })
+                except Exception as e:
+                    results.append({'filename': filename, 'error': str(e)})
+        
+        return results
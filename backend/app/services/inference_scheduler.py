@@ -0,0 +1,122 @@
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import threading
+import numpy as np
+import logging
+from app.core.config import get_settings
+from app.services import worker_pool as tasks
+from app.services.worker_pool import get_worker_pool
+from app.services.ml_service import get_ml_service
+from app.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Texts per encoder call; powers of two up to well past the default batch size
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+class InferenceScheduler:
+    """Coalesces encode requests from concurrent callers into batched model calls.
+
+    A single upload encodes a handful of chunks, so under concurrent load
+    the encoder would run many tiny forward passes. Instead, requests wait
+    up to `max_wait_ms` for company; the texts of everyone waiting then go
+    to the worker pool as one length-sorted batch, and each caller gets its
+    own rows back. A batch leaves early once `max_batch_size` texts are
+    waiting, so a lone request pays at most the wait budget in latency.
+    """
+
+    def __init__(self, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._pending: List[Tuple[List[str], asyncio.Future]] = []
+        self._pending_texts = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+        self._counters = {'requests': 0, 'batches': 0, 'texts': 0}
+        self._lock = threading.Lock()
+
+        self.batch_size = get_metrics().histogram(
+            "inference_batch_size", "Texts per coalesced encoder call", buckets=BATCH_SIZE_BUCKETS
+        )
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        """Embeddings of texts (rows in input order), encoded together with concurrent requests"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((list(texts), future))
+        self._pending_texts += len(texts)
+
+        if self._pending_texts >= self.max_batch_size or self.max_wait <= 0:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    async def embed_documents(self, texts: List[str]) -> List[Dict[str, np.ndarray]]:
+        """MLService.embed_documents, with the chunk encoding batched across requests"""
+        ml_service = get_ml_service()
+        chunked = await asyncio.to_thread(ml_service.chunk_documents, texts)
+        embeddings = await self.encode([chunk for chunks in chunked for chunk in chunks])
+        return ml_service.pool_chunks(chunked, embeddings)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending, self._pending_texts = self._pending, [], 0
+        if batch:
+            # Keep a reference so the task is not garbage collected mid-flight
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[List[str], asyncio.Future]]):
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        # Similar lengths side by side, so the encoder's mini-batches pad less
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+
+        with self._lock:
+            self._counters['requests'] += len(batch)
+            self._counters['batches'] += 1
+            self._counters['texts'] += len(texts)
+        self.batch_size.observe(len(texts))
+
+        try:
+            encoded = await get_worker_pool().run(tasks.get_embeddings, [texts[i] for i in order])
+        except Exception as e:
+            # Every caller in the batch sees the failure (including a 429 from the pool)
+            logger.error(f"Error encoding batch of {len(texts)} texts: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        embeddings = np.empty_like(encoded)
+        embeddings[order] = encoded
+        start = 0
+        for request_texts, future in batch:
+            if not future.done():
+                future.set_result(embeddings[start:start + len(request_texts)])
+            start += len(request_texts)
+
+    def stats(self) -> Dict:
+        """Requests served and how well they were coalesced"""
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            **counters,
+            'mean_batch_size': round(counters['texts'] / counters['batches'], 2) if counters['batches'] else 0.0,
+            'requests_per_batch': round(counters['requests'] / counters['batches'], 2) if counters['batches'] else 0.0
+        }
+
+@lru_cache()
+def get_inference_scheduler() -> InferenceScheduler:
+    """Process-wide scheduler in front of the worker pool's encoder"""
+    settings = get_settings()
+    return InferenceScheduler(settings.INFERENCE_MAX_BATCH_SIZE, settings.INFERENCE_MAX_WAIT_MS)
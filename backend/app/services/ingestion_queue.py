@@ -0,0 +1,248 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import sqlite3
+import threading
+import socket
+import json
+import uuid
+import os
+import logging
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+class IngestionQueue:
+    """Durable SQLite-backed queue of documents moving through ingestion stages.
+
+    Each job sits at one stage at a time; workers for that stage claim it,
+    run it and advance it to the next stage. Intermediate results live in
+    the job's JSON payload, so a restart resumes at the last finished stage.
+
+    A claim is a lease: the claiming process (owner = host:pid) renews
+    heartbeat_at while it works, and only a lease that has gone
+    lease_seconds without a heartbeat is taken over by another worker, so
+    several processes can share the queue without running a job twice.
+    """
+
+    STAGES = ["extract", "nlp", "embed", "persist"]
+
+    def __init__(self, db_path: str, lease_seconds: float = 60.0):
+        self.lease_seconds = lease_seconds
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS ingestion_jobs (
+                    id TEXT PRIMARY KEY,
+                    file_id TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    file_type TEXT NOT NULL,
+                    document_type TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    payload TEXT NOT NULL DEFAULT '{}',
+                    available_at TEXT NOT NULL,
+                    owner TEXT,
+                    heartbeat_at TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            # Queues created before leases existed
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(ingestion_jobs)")}
+            for column in ("owner", "heartbeat_at"):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE ingestion_jobs ADD COLUMN {column} TEXT")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_ingestion_jobs_claim "
+                "ON ingestion_jobs (stage, status, available_at)"
+            )
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.utcnow().isoformat()
+
+    @staticmethod
+    def owner() -> str:
+        """This process, as recorded on the jobs it holds (forked workers differ by pid)"""
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def _lease_cutoff(self) -> str:
+        """Leases whose last heartbeat is older than this have expired"""
+        return (datetime.utcnow() - timedelta(seconds=self.lease_seconds)).isoformat()
+
+    def enqueue(
+        self,
+        file_id: str,
+        filename: str,
+        file_path: str,
+        file_type: str,
+        doc_type: str,
+        stage: str = None,
+        payload: Dict = None
+    ) -> str:
+        """Add a saved file to the queue and return the job id.
+
+        Jobs start at the first stage unless `stage` skips ahead, in which
+        case `payload` must hold the results of the skipped stages.
+        """
+        job_id = str(uuid.uuid4())
+        now = self._now()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO ingestion_jobs (id, file_id, filename, file_path, file_type, "
+                "document_type, stage, status, payload, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (
+                    job_id, file_id, filename, file_path, file_type, doc_type,
+                    stage or self.STAGES[0], json.dumps(payload or {}), now, now, now
+                )
+            )
+
+        return job_id
+
+    def claim(self, stage: str) -> Optional[Dict]:
+        """Atomically lease the oldest ready job at a stage (or one whose lease expired), or None"""
+        now = self._now()
+
+        with self._lock:
+            row = self._conn.execute(
+                "UPDATE ingestion_jobs SET status = 'running', owner = ?, heartbeat_at = ?, updated_at = ? "
+                "WHERE id = (SELECT id FROM ingestion_jobs "
+                "            WHERE stage = ? AND ((status = 'queued' AND available_at <= ?) "
+                "                                 OR (status = 'running' AND COALESCE(heartbeat_at, '') < ?)) "
+                "            ORDER BY created_at LIMIT 1) "
+                "RETURNING *",
+                (self.owner(), now, now, stage, now, self._lease_cutoff())
+            ).fetchone()
+
+        return self._to_dict(row) if row else None
+
+    def heartbeat(self, job_ids: Iterable[str]) -> int:
+        """Renew this process's leases on the given jobs; returns how many it still holds"""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+        now = self._now()
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE ingestion_jobs SET heartbeat_at = ? "
+                f"WHERE status = 'running' AND owner = ? AND id IN ({', '.join('?' * len(job_ids))})",
+                (now, self.owner(), *job_ids)
+            )
+        return cursor.rowcount
+
+    def advance(self, job_id: str, payload: Dict) -> bool:
+        """Mark the job's current stage done and queue it for the next one.
+
+        Returns False, changing nothing, if this process no longer holds
+        the job (its lease expired and another worker took it over).
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stage FROM ingestion_jobs WHERE id = ? AND status = 'running' AND owner = ?",
+                (job_id, self.owner())
+            ).fetchone()
+            if row is None:
+                return False
+            stage = row['stage']
+            position = self.STAGES.index(stage) + 1
+            done = position == len(self.STAGES)
+            now = self._now()
+
+            self._conn.execute(
+                "UPDATE ingestion_jobs SET stage = ?, status = ?, attempts = 0, error = NULL, "
+                "payload = ?, available_at = ?, updated_at = ? WHERE id = ?",
+                (
+                    "done" if done else self.STAGES[position],
+                    "completed" if done else "queued",
+                    json.dumps(payload),
+                    now,
+                    now,
+                    job_id
+                )
+            )
+        return True
+
+    def release(self, job_id: str, delay_seconds: float = 0):
+        """Put a claimed job back without counting an attempt (e.g. pool saturated)"""
+        available_at = (datetime.utcnow() + timedelta(seconds=delay_seconds)).isoformat()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE ingestion_jobs SET status = 'queued', available_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'running' AND owner = ?",
+                (available_at, self._now(), job_id, self.owner())
+            )
+
+    def fail(self, job_id: str, error: str, max_attempts: int, backoff_seconds: float = 1.0) -> bool:
+        """Record a failed attempt; retry with exponential backoff until max_attempts.
+
+        Returns True if the job will be retried.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts FROM ingestion_jobs WHERE id = ? AND status = 'running' AND owner = ?",
+                (job_id, self.owner())
+            ).fetchone()
+            if row is None:
+                # Taken over by another worker, whose attempt it now is
+                return False
+            attempts = row['attempts'] + 1
+            retry = attempts < max_attempts
+            delay = backoff_seconds * 2 ** (attempts - 1)
+            available_at = (datetime.utcnow() + timedelta(seconds=delay)).isoformat()
+
+            self._conn.execute(
+                "UPDATE ingestion_jobs SET status = ?, attempts = ?, error = ?, "
+                "available_at = ?, updated_at = ? WHERE id = ?",
+                ("queued" if retry else "failed", attempts, error, available_at, self._now(), job_id)
+            )
+
+        return retry
+
+    def recover(self) -> int:
+        """Requeue running jobs whose lease expired (their worker stopped); live workers' jobs are left alone"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE ingestion_jobs SET status = 'queued', owner = NULL, updated_at = ? "
+                "WHERE status = 'running' AND COALESCE(heartbeat_at, '') < ?",
+                (self._now(), self._lease_cutoff())
+            )
+        if cursor.rowcount:
+            logger.info(f"Recovered {cursor.rowcount} interrupted ingestion jobs")
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Get a job by id"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM ingestion_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def counts(self) -> List[Dict]:
+        """Number of jobs per (stage, status), for monitoring"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, status, COUNT(*) AS jobs FROM ingestion_jobs GROUP BY stage, status"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _to_dict(self, row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        return job
+
+@lru_cache()
+def get_ingestion_queue(db_path: str) -> IngestionQueue:
+    return IngestionQueue(db_path, get_settings().INGEST_LEASE_SECONDS)
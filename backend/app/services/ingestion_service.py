@@ -0,0 +1,164 @@
+from fastapi import HTTPException
+from functools import lru_cache
+from typing import Dict, List, Set
+import asyncio
+import logging
+from app.core.config import get_settings
+from app.services import worker_pool as tasks
+from app.services.worker_pool import get_worker_pool
+from app.services.inference_scheduler import get_inference_scheduler
+from app.services.ml_service import get_ml_service
+from app.services.document_store import document_store
+from app.services.lexical_index import index_resume
+from app.services.artifact_cache import get_artifact_cache
+from app.services.ingestion_queue import IngestionQueue, get_ingestion_queue
+from app.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+class IngestionService:
+    """Background workers that drive queued documents through
+    extract -> nlp -> embed -> persist, with per-stage concurrency."""
+
+    def __init__(self, queue: IngestionQueue, concurrency: Dict[str, int], max_attempts: int, poll_interval: float):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+
+        self._wakeups = {stage: asyncio.Event() for stage in IngestionQueue.STAGES}
+        self._workers: List[asyncio.Task] = []
+        self._running: Set[str] = set()  # jobs this process holds leases on
+        self._stages = {
+            "extract": self._extract,
+            "nlp": self._nlp,
+            "embed": self._embed,
+            "persist": self._persist
+        }
+
+    async def start(self):
+        """Recover interrupted jobs and start the stage workers"""
+        await asyncio.to_thread(self.queue.recover)
+        self._workers.append(asyncio.create_task(self._heartbeat(), name="ingest-heartbeat"))
+
+        for stage in IngestionQueue.STAGES:
+            for i in range(self.concurrency.get(stage, 1)):
+                self._workers.append(asyncio.create_task(
+                    self._work(stage), name=f"ingest-{stage}-{i}"
+                ))
+
+        logger.info(f"Ingestion workers started: {self.concurrency}")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _heartbeat(self):
+        # Renew leases well within their expiry, so no other worker takes the jobs over
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self.queue.heartbeat, list(self._running))
+            except Exception as e:
+                logger.error(f"Error renewing ingestion leases: {e}")
+
+    def notify(self, stage: str = IngestionQueue.STAGES[0]):
+        """Wake idle workers of a stage instead of waiting for the next poll"""
+        self._wakeups[stage].set()
+
+    async def _work(self, stage: str):
+        while True:
+            job = await asyncio.to_thread(self.queue.claim, stage)
+
+            if job is None:
+                wakeup = self._wakeups[stage]
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._running.add(job['id'])
+            try:
+                with get_metrics().stage("ingest", stage):
+                    payload = await self._stages[stage](job)
+            except asyncio.CancelledError:
+                await asyncio.to_thread(self.queue.release, job['id'])
+                raise
+            except HTTPException as e:
+                if e.status_code == 429:
+                    # Worker pool saturated: back off without spending an attempt
+                    await asyncio.to_thread(self.queue.release, job['id'], self.poll_interval)
+                else:
+                    await asyncio.to_thread(self.queue.fail, job['id'], str(e.detail), self.max_attempts)
+                continue
+            except Exception as e:
+                retry = await asyncio.to_thread(self.queue.fail, job['id'], str(e), self.max_attempts)
+                logger.error(f"Ingestion {job['id']} failed at {stage} ({'retrying' if retry else 'giving up'}): {e}")
+                continue
+            finally:
+                self._running.discard(job['id'])
+
+            if not await asyncio.to_thread(self.queue.advance, job['id'], payload):
+                logger.warning(f"Ingestion {job['id']} was taken over by another worker; result of {stage} dropped")
+                continue
+
+            position = IngestionQueue.STAGES.index(stage) + 1
+            if position < len(IngestionQueue.STAGES):
+                self.notify(IngestionQueue.STAGES[position])
+            else:
+                logger.info(f"Ingestion completed: {job['file_id']} ({job['document_type']})")
+
+    async def _extract(self, job: Dict) -> Dict:
+        text = await get_worker_pool().run(tasks.extract_text, job['file_path'], job['file_type'])
+        return {**job['payload'], 'text': text}
+
+    async def _nlp(self, job: Dict) -> Dict:
+        payload = job['payload']
+        nlp_result = await get_worker_pool().run(tasks.process_document, payload['text'], job['document_type'])
+        return {**payload, 'nlp': nlp_result}
+
+    async def _embed(self, job: Dict) -> Dict:
+        # Chunk embeddings land in the embedding store, keyed by text hash
+        await get_inference_scheduler().embed_documents([job['payload']['text']])
+        return job['payload']
+
+    async def _persist(self, job: Dict) -> Dict:
+        payload = job['payload']
+        # Served from the embedding store, warmed by the embed stage
+        embedded = (await get_inference_scheduler().embed_documents([payload['text']]))[0]
+        await asyncio.to_thread(
+            document_store.add, job['file_id'], job['filename'], job['document_type'],
+            payload['nlp'], embedded['embedding'], embedded['chunks'], get_ml_service().model_name
+        )
+        
+        if 'content_hash' in payload:
+            get_artifact_cache(get_settings().ARTIFACT_CACHE_DIR).put(
+                payload['content_hash'], job['document_type'], job['file_id'],
+                job['file_path'], job['filename'], payload['nlp']
+            )
+
+        if job['document_type'] == "resume":
+            await asyncio.to_thread(get_ml_service().index_embedding, job['file_id'], embedded['embedding'])
+            await asyncio.to_thread(index_resume, job['file_id'], payload['nlp'])
+
+        # Keep only a preview once the document is stored elsewhere
+        return {'text_preview': payload['text'][:500], 'content_hash': payload.get('content_hash')}
+
+@lru_cache()
+def get_ingestion_service() -> IngestionService:
+    settings = get_settings()
+    return IngestionService(
+        get_ingestion_queue(settings.INGEST_QUEUE_PATH),
+        {
+            "extract": settings.INGEST_EXTRACT_WORKERS,
+            "nlp": settings.INGEST_NLP_WORKERS,
+            "embed": settings.INGEST_EMBED_WORKERS,
+            "persist": settings.INGEST_PERSIST_WORKERS
+        },
+        settings.INGEST_MAX_ATTEMPTS,
+        settings.INGEST_POLL_INTERVAL
+    )
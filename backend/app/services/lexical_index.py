@@ -0,0 +1,273 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import math
+import threading
+import numpy as np
+import logging
+from app.core.config import get_settings
+from app.services.skill_matcher import SkillMatcher, get_skill_matcher
+
+logger = logging.getLogger(__name__)
+
+# New postings are kept uncompressed until a term has this many
+TAIL_SIZE = 64
+
+class Postings:
+    """Sorted document numbers and term frequencies of one term.
+
+    Settled postings are stored as a first document number plus the gaps
+    between consecutive ones, in the narrowest unsigned dtype holding the
+    largest gap (for common terms most gaps fit a uint8). Documents added
+    since go to a plain tail that is folded in once it reaches TAIL_SIZE.
+    """
+
+    __slots__ = ('first', 'gaps', 'tfs', 'tail_docs', 'tail_tfs')
+
+    def __init__(self):
+        self.first = 0
+        self.gaps = np.zeros(0, dtype=np.uint8)
+        self.tfs = np.zeros(0, dtype=np.uint16)
+        self.tail_docs: List[int] = []
+        self.tail_tfs: List[int] = []
+
+    def __len__(self) -> int:
+        settled = len(self.gaps) + 1 if len(self.tfs) else 0
+        return settled + len(self.tail_docs)
+
+    def append(self, doc: int, tf: int):
+        """Add a document numbered above every document already present"""
+        self.tail_docs.append(doc)
+        self.tail_tfs.append(min(tf, np.iinfo(np.uint16).max))
+        if len(self.tail_docs) >= TAIL_SIZE:
+            self._settle()
+
+    def _settle(self):
+        docs, tfs = self.decode()
+        gaps = np.diff(docs)
+        dtype = np.min_scalar_type(int(gaps.max())) if len(gaps) else np.uint8
+        self.first = int(docs[0])
+        self.gaps = gaps.astype(dtype)
+        self.tfs = tfs
+        self.tail_docs, self.tail_tfs = [], []
+
+    def decode(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(document numbers, term frequencies), both ascending by document"""
+        if len(self.tfs):
+            docs = np.empty(len(self.gaps) + 1, dtype=np.int64)
+            docs[0] = self.first
+            np.cumsum(self.gaps, dtype=np.int64, out=docs[1:])
+            docs[1:] += self.first
+        else:
+            docs = np.zeros(0, dtype=np.int64)
+        if self.tail_docs:
+            docs = np.concatenate((docs, np.array(self.tail_docs, dtype=np.int64)))
+            return docs, np.concatenate((self.tfs, np.array(self.tail_tfs, dtype=np.uint16)))
+        return docs, self.tfs
+
+class LexicalIndex:
+    """In-process inverted index over resume tokens and skills, with BM25 scoring.
+
+    Terms are the lowercased tokens NLPService.tokenize produced at upload
+    (stop words and punctuation are not indexed) plus each extracted
+    skill as one term, so "go" or "machine learning" can be required even
+    though tokenization drops or splits them. Documents are numbered in
+    arrival order, so postings only ever grow at the end; removed
+    documents are masked out until the next rebuild, or until they make up
+    COMPACT_FRACTION of the index and sync() rebuilds it. With a
+    SkillMatcher, query phrases that are skill synonyms ("k8s") are looked
+    up under the canonical name the skill was indexed as ("kubernetes").
+    """
+
+    COMPACT_FRACTION = 0.25
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, skill_matcher: Optional[SkillMatcher] = None):
+        self.k1 = k1
+        self.b = b
+        self.skill_matcher = skill_matcher
+        self.file_ids: List[str] = []
+        self._docs: Dict[str, int] = {}
+        self._terms: Dict[str, Postings] = {}
+        self._df: Dict[str, int] = {}
+        self._doc_terms: List[Tuple[str, ...]] = []
+        self.lengths = np.zeros(0, dtype=np.int32)
+        self.alive = np.zeros(0, dtype=bool)
+        self._total_length = 0
+        self._signature: Optional[Tuple] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @property
+    def dead_docs(self) -> int:
+        """Removed or replaced documents whose postings are still stored"""
+        return len(self.file_ids) - len(self._docs)
+
+    @staticmethod
+    def terms_of(tokens: Iterable[str], skills: Iterable[str] = ()) -> Dict[str, int]:
+        """Term frequencies of a document"""
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            term = token.lower()
+            if any(c.isalnum() for c in term):
+                counts[term] = counts.get(term, 0) + 1
+        for skill in skills:
+            term = skill.lower()
+            counts[term] = max(counts.get(term, 0), 1)
+        return counts
+
+    def add(self, records: List[Dict]):
+        """Index documents ({'file_id', 'tokens', 'skills'}); re-added ids replace their old entry"""
+        with self._lock:
+            self.remove(record['file_id'] for record in records)
+
+            start = len(self.file_ids)
+            self.lengths = np.concatenate((self.lengths, np.zeros(len(records), dtype=np.int32)))
+            self.alive = np.concatenate((self.alive, np.ones(len(records), dtype=bool)))
+            for doc, record in enumerate(records, start):
+                counts = self.terms_of(record.get('tokens') or [], record.get('skills') or [])
+                for term, tf in counts.items():
+                    self._terms.setdefault(term, Postings()).append(doc, tf)
+                    self._df[term] = self._df.get(term, 0) + 1
+                length = len(record.get('tokens') or [])
+                self.lengths[doc] = length
+                self._total_length += length
+                self.file_ids.append(record['file_id'])
+                self._doc_terms.append(tuple(counts))
+                self._docs[record['file_id']] = doc
+
+    def remove(self, file_ids: Iterable[str]):
+        with self._lock:
+            for file_id in file_ids:
+                doc = self._docs.pop(file_id, None)
+                if doc is None:
+                    continue
+                self.alive[doc] = False
+                self._total_length -= int(self.lengths[doc])
+                for term in self._doc_terms[doc]:
+                    self._df[term] -= 1
+
+    def _query_terms(self, phrases: Iterable[str]) -> List[List[str]]:
+        """Each phrase as one term if indexed as such (a skill, by canonical name), else its words"""
+        groups = []
+        for phrase in phrases:
+            phrase = " ".join(phrase.lower().split())
+            if not phrase:
+                continue
+            canonical = self.skill_matcher.canonical(phrase) if self.skill_matcher is not None else None
+            if canonical is not None and canonical in self._terms:
+                groups.append([canonical])
+            else:
+                groups.append([phrase] if phrase in self._terms else phrase.split())
+        return groups
+
+    def search(
+        self,
+        required: Iterable[str] = (),
+        keywords: Iterable[str] = (),
+        limit: Optional[int] = None
+    ) -> Dict[str, float]:
+        """Documents having every required term, or any keyword if none is required,
+        with BM25 scores over all query terms normalized so the best is 1.0.
+
+        Keeps only the `limit` best when given.
+        """
+        with self._lock:
+            required_terms = [term for group in self._query_terms(required) for term in group]
+            keyword_terms = [term for group in self._query_terms(keywords) for term in group]
+            query = list(dict.fromkeys(required_terms + keyword_terms))
+            if not query:
+                return {}
+
+            postings = {term: self._terms[term].decode() for term in query if term in self._terms}
+            if required_terms:
+                if not all(term in postings for term in required_terms):
+                    return {}
+                # Intersect rarest first, so the candidate set shrinks fastest
+                candidates = None
+                for term in sorted(set(required_terms), key=lambda t: len(postings[t][0])):
+                    docs = postings[term][0]
+                    candidates = docs if candidates is None else np.intersect1d(candidates, docs, assume_unique=True)
+            elif postings:
+                candidates = np.unique(np.concatenate([docs for docs, _ in postings.values()]))
+            else:
+                return {}
+            candidates = candidates[self.alive[candidates]]
+            if not len(candidates):
+                return {}
+
+            scores = self._bm25(candidates, postings)
+            if limit is not None and len(candidates) > limit:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+                candidates, scores = candidates[top], scores[top]
+
+            best = scores.max()
+            scores = scores / best if best > 0 else np.ones(len(scores))
+            return {self.file_ids[doc]: float(score) for doc, score in zip(candidates, scores)}
+
+    def _bm25(self, candidates: np.ndarray, postings: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        n = max(len(self._docs), 1)
+        average_length = max(self._total_length / n, 1.0)
+        norms = self.k1 * (1 - self.b + self.b * self.lengths[candidates] / average_length)
+
+        scores = np.zeros(len(candidates))
+        for term, (docs, tfs) in postings.items():
+            df = self._df[term]
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            # Where each candidate would sit in this term's postings
+            positions = np.minimum(np.searchsorted(docs, candidates), len(docs) - 1)
+            present = docs[positions] == candidates
+            tf = tfs[positions[present]].astype(np.float64)
+            scores[present] += idf * tf * (self.k1 + 1) / (tf + norms[present])
+        return scores
+
+    def sync(self, store) -> "LexicalIndex":
+        """Bring the index up to date with a DocumentStore, like CandidateTable.sync.
+
+        Resumes uploaded since the last sync are indexed incrementally; if
+        the counts then disagree (deletes), or dead documents pile up, a
+        compacted index is rebuilt.
+        Returns the index to use: this one, or its replacement.
+        """
+        signature = store.resume_signature()
+        with self._lock:
+            if signature == self._signature:
+                return self
+
+            count, latest = signature
+            previous = self._signature
+            if previous is not None and previous[1] is not None and latest is not None:
+                self.add(store.list_resumes(uploaded_after=previous[1], with_embedding=False, with_tokens=True))
+
+            index = self
+            if len(self) != count or self.dead_docs > self.COMPACT_FRACTION * len(self.file_ids):
+                index = LexicalIndex(self.k1, self.b, self.skill_matcher)
+                index.add(store.list_resumes(with_embedding=False, with_tokens=True))
+                logger.info(f"Lexical index rebuilt: {len(index)} resumes, {len(index._terms)} terms")
+            index._signature = signature
+            return index
+
+_index: Optional[LexicalIndex] = None
+_index_lock = threading.Lock()
+
+def get_lexical_index(store) -> LexicalIndex:
+    """Process-wide lexical index of every stored resume, synced with the store on each call"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            settings = get_settings()
+            _index = LexicalIndex(
+                settings.BM25_K1, settings.BM25_B, get_skill_matcher(settings.SKILLS_TAXONOMY_PATH)
+            )
+        _index = _index.sync(store)
+        return _index
+
+def index_resume(file_id: str, processed: Dict):
+    """Index a just-stored resume now, so it is searchable before the next sync"""
+    with _index_lock:
+        if _index is not None:
+            _index.add([{'file_id': file_id, 'tokens': processed.get('tokens'), 'skills': processed['skills']}])
+
+def remove_resume(file_id: str):
+    with _index_lock:
+        if _index is not None:
+            _index.remove([file_id])
@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import hashlib
+import json
+import threading
+import time
+import logging
+from app.core.config import get_settings
+from app.services.document_store import DocumentStore, document_store
+from app.services.ml_service import get_ml_service
+
+logger = logging.getLogger(__name__)
+
+class MatchCache:
+    """Analyze results keyed by (resume content, job content, model name, scoring version).
+
+    Keys hash every input of a score, so editing either document or
+    changing the model or weights yields a new key and old entries are
+    never served; they just age out. An in-process TTL/LRU tier sits in
+    front of an optional persistent tier: match_results rows saved with
+    the same cache_key.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        scoring_version: str,
+        max_items: int = 10000,
+        ttl: float = 3600,
+        store: Optional[DocumentStore] = None
+    ):
+        self.model_name = model_name
+        self.scoring_version = scoring_version
+        self.max_items = max_items
+        self.ttl = ttl
+        self.store = store
+
+        self._memory: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'persistent_hits': 0, 'misses': 0}
+
+    @staticmethod
+    def fingerprint(document: Dict) -> str:
+        """Hash of what scoring reads from a document: text, skills and experience"""
+        content = json.dumps([
+            " ".join(document['text'].split()),
+            sorted(skill.lower() for skill in document['skills']),
+            list(document['experience_years'])
+        ])
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def key(self, resume: Dict, job: Dict) -> str:
+        parts = [self.fingerprint(resume), self.fingerprint(job), self.model_name, self.scoring_version]
+        return hashlib.sha256("|".join(parts).encode('utf-8')).hexdigest()
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def get(self, key: str, job_id: str, resume_id: str) -> Optional[Dict]:
+        """Cached match dict (as saved by save_matches), or None on a miss"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, match = entry
+                if expires_at > time.monotonic():
+                    self._memory.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    return match
+                del self._memory[key]
+
+        if self.store is not None:
+            try:
+                match = self.store.find_match(job_id, resume_id, key)
+            except Exception as e:
+                logger.error(f"Error reading cached match {job_id}/{resume_id}: {e}")
+            else:
+                if match is not None:
+                    self.put(key, match)
+                    self._count('persistent_hits')
+                    return match
+
+        self._count('misses')
+        return None
+
+    def put(self, key: str, match: Dict):
+        """Remember a match in the in-process tier (the persistent tier is the saved row)"""
+        with self._lock:
+            self._memory[key] = (time.monotonic() + self.ttl, match)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for the cache"""
+        with self._lock:
+            counters = dict(self._counters)
+            memory_items = len(self._memory)
+
+        lookups = counters['memory_hits'] + counters['persistent_hits'] + counters['misses']
+        hits = counters['memory_hits'] + counters['persistent_hits']
+
+        return {
+            'model': self.model_name,
+            'scoring_version': self.scoring_version,
+            **counters,
+            'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+            'memory_items': memory_items
+        }
+
+@lru_cache()
+def get_match_cache() -> MatchCache:
+    """Process-wide match cache for the current model and scoring weights"""
+    settings = get_settings()
+    ml_service = get_ml_service()
+    return MatchCache(
+        ml_service.model_name,
+        ml_service.scoring_version,
+        settings.MATCH_CACHE_SIZE,
+        settings.MATCH_CACHE_TTL,
+        document_store if settings.MATCH_CACHE_PERSISTENT else None
+    )
@@ -0,0 +1,315 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import threading
+import json
+import time
+import os
+import logging
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans cache hits (sub-millisecond) up to large PDF extractions
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Stage timings of the current request, when it asked for a Server-Timing header
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+class Counter:
+    """Monotonic count per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def snapshot(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    @staticmethod
+    def merge(values: Dict, other: Dict):
+        for key, value in other.items():
+            values[key] = values.get(key, 0) + value
+
+    def samples(self, values: Optional[Dict] = None) -> List[str]:
+        values = self.snapshot() if values is None else values
+        return [f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in values.items()]
+
+class Histogram:
+    """Cumulative-bucket histogram per label set; observe() is a bisect and an add"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last = +Inf)], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                label_values, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Tuple[List[int], float]]:
+        with self._lock:
+            return {key: (list(counts), total[0]) for key, (counts, total) in self._values.items()}
+
+    @staticmethod
+    def merge(values: Dict, other: Dict):
+        for key, (counts, total) in other.items():
+            if key in values:
+                merged, merged_total = values[key]
+                values[key] = ([a + b for a, b in zip(merged, counts)], merged_total + total)
+            else:
+                values[key] = (list(counts), total)
+
+    def samples(self, values: Optional[Dict] = None) -> List[str]:
+        values = self.snapshot() if values is None else values
+
+        lines = []
+        for key, (counts, total) in values.items():
+            cumulative = 0
+            for bound, count in zip([*self.buckets, "+Inf"], counts):
+                cumulative += count
+                labels = _format_labels((*self.labels, "le"), (*key, bound))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class CallbackMetric:
+    """Gauge or counter read from a callback at scrape time, so the hot path pays nothing.
+
+    The callback returns {label values tuple: value}.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str],
+        callback: Callable[[], Dict[Tuple[str, ...], float]],
+        kind: str = "gauge"
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.callback = callback
+        self.kind = kind
+
+    def snapshot(self) -> Dict[Tuple[str, ...], float]:
+        try:
+            values = self.callback()
+        except Exception as e:
+            logger.error(f"Error collecting metric {self.name}: {e}")
+            return {}
+        return {tuple(str(v) for v in key): float(value) for key, value in values.items() if value is not None}
+
+    # Counters add up across worker processes; gauges are reported per worker
+    merge = staticmethod(Counter.merge)
+
+    def samples(self, values: Optional[Dict] = None, labels: Optional[Sequence[str]] = None) -> List[str]:
+        values = self.snapshot() if values is None else values
+        labels = self.labels if labels is None else labels
+        return [f"{self.name}{_format_labels(labels, key)} {value}" for key, value in values.items()]
+
+class MetricsRegistry:
+    """Process-wide metrics, rendered in the Prometheus text exposition format.
+
+    With a multiprocess_dir (several gunicorn workers), every worker writes
+    a snapshot of its metrics there every flush_interval seconds and when
+    it answers a scrape, and render() merges all snapshots: counters and
+    histograms are summed across workers (including exited ones, so totals
+    never go back), gauges are reported per live worker with a "pid" label.
+    """
+
+    def __init__(self, namespace: str = "resume_matcher", multiprocess_dir: str = "", flush_interval: float = 5.0):
+        self.namespace = namespace
+        self.multiprocess_dir = Path(multiprocess_dir) if multiprocess_dir else None
+        self.flush_interval = flush_interval
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+        self.stage_seconds = self.histogram(
+            "stage_seconds", "Time spent in one stage of an operation", ["operation", "stage"]
+        )
+        self.request_seconds = self.histogram(
+            "http_request_seconds", "HTTP request latency by route", ["method", "route", "status"]
+        )
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(f"{self.namespace}_{name}", documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(f"{self.namespace}_{name}", documentation, labels, buckets))
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str],
+        callback: Callable[[], Dict[Tuple[str, ...], float]],
+        kind: str = "gauge"
+    ) -> CallbackMetric:
+        return self._register(CallbackMetric(f"{self.namespace}_{name}", documentation, labels, callback, kind))
+
+    @contextmanager
+    def stage(self, operation: str, stage: str) -> Iterator[None]:
+        """Time a block into stage_seconds, and into Server-Timing if the request asked for it"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stage_seconds.observe(elapsed, operation, stage)
+            timings = _request_timings.get()
+            if timings is not None:
+                timings.append((stage, elapsed))
+
+    def _snapshot_path(self, pid: int) -> Path:
+        return self.multiprocess_dir / f"metrics-{pid}.json"
+
+    def flush(self):
+        """Write this process's metrics to the multiprocess directory"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        snapshot = {
+            metric.name: [[list(key), value] for key, value in metric.snapshot().items()]
+            for metric in metrics
+        }
+        self.multiprocess_dir.mkdir(parents=True, exist_ok=True)
+        path = self._snapshot_path(os.getpid())
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+
+    def start_sharing(self):
+        """Flush periodically from this process (call once per worker, after forking)"""
+        if self.multiprocess_dir is None or (self._flusher is not None and self._flusher.is_alive()):
+            return
+
+        def run():
+            while True:
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Error writing metrics snapshot: {e}")
+                time.sleep(self.flush_interval)
+
+        self._flusher = threading.Thread(target=run, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    @staticmethod
+    def _alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _merged(self, metrics: List) -> Dict[str, Dict]:
+        """Every worker's snapshot combined per metric"""
+        self.flush()
+        merged: Dict[str, Dict] = {metric.name: {} for metric in metrics}
+        kinds = {metric.name: metric for metric in metrics}
+        for path in self.multiprocess_dir.glob("metrics-*.json"):
+            pid = int(path.stem.split("-")[1])
+            try:
+                with open(path, encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            alive = self._alive(pid)
+            for name, entries in snapshot.items():
+                metric = kinds.get(name)
+                if metric is None:
+                    continue
+                values = {tuple(key): value for key, value in entries}
+                if isinstance(metric, CallbackMetric) and metric.kind == "gauge":
+                    if alive:
+                        merged[name].update({(*key, str(pid)): value for key, value in values.items()})
+                else:
+                    metric.merge(merged[name], values)
+        return merged
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        merged = self._merged(metrics) if self.multiprocess_dir is not None else {}
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if metric.name not in merged:
+                lines.extend(metric.samples())
+            elif isinstance(metric, CallbackMetric) and metric.kind == "gauge":
+                lines.extend(metric.samples(merged[metric.name], (*metric.labels, "pid")))
+            else:
+                lines.extend(metric.samples(merged[metric.name]))
+        return "\n".join(lines) + "\n"
+
+def start_request_timing() -> List[Tuple[str, float]]:
+    """Collect stage timings of the current request (and threads it starts via to_thread)"""
+    timings: List[Tuple[str, float]] = []
+    _request_timings.set(timings)
+    return timings
+
+def server_timing_header(timings: List[Tuple[str, float]], total: float) -> str:
+    """Server-Timing value: one entry per stage, in milliseconds, plus the total"""
+    entries = [f"{name};dur={elapsed * 1000:.2f}" for name, elapsed in timings]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+@lru_cache()
+def get_metrics() -> MetricsRegistry:
+    settings = get_settings()
+    return MetricsRegistry(
+        multiprocess_dir=settings.METRICS_MULTIPROCESS_DIR,
+        flush_interval=settings.METRICS_FLUSH_INTERVAL
+    )
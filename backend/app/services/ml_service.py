@@ -1,52 +1,349 @@
-from sentence_transformers import SentenceTransformer, util
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+from functools import lru_cache
+import hashlib
+import json
+import threading
+from pathlib import Path
+from app.core.config import get_settings
+from app.services.embedding_store import get_embedding_store
+from app.services.vector_index import get_vector_index
+from app.services.quantized_store import get_quantized_store
+from app.services.model_registry import get_model_registry
+from app.services.text_chunker import TextChunker
+from app.services.onnx_encoder import OnnxEncoder
+from app.services.candidate_table import CandidateTable, get_skill_vocabulary
+from app.services.metrics import get_metrics
 import logging
 
 logger = logging.getLogger(__name__)
 
+SBERT_MODEL_KEY = "sbert"
+
+# Job-dependent parts of a match score that can be recomputed independently
+SCORE_COMPONENTS = ('semantic', 'skills', 'experience')
+
 class MLService:
     """Machine Learning service for semantic matching"""
     
+    # Weights for different factors
+    SCORE_WEIGHTS = {
+        'semantic': 0.4,      # 40%
+        'skills': 0.35,       # 35%
+        'experience': 0.15,   # 15%
+        'education': 0.10     # 10%
+    }
+    
     def __init__(self):
+        settings = get_settings()
+        
+        self.embedding_store = get_embedding_store(
+            self.model_id(),
+            settings.EMBEDDING_CACHE_DIR,
+            settings.EMBEDDING_CACHE_SIZE
+        )
+        self.chunker = TextChunker(settings.EMBED_CHUNK_WORDS, settings.EMBED_MAX_CHUNKS)
+        self.similarity_mode = settings.SIMILARITY_MODE
+        self.model_name = self.model_id()
+        self._index_signature = None
+        self._index_lock = threading.Lock()
+    
+    @property
+    def vector_index(self):
+        """Resume retrieval: float IVF index, or a memory-mapped quantized store.
+        
+        Resolved on first use, so processes that only score (rank shards)
+        never load it.
+        """
+        settings = get_settings()
+        if settings.EMBEDDING_QUANTIZATION != "none":
+            return get_quantized_store(
+                settings.QUANTIZED_STORE_DIR,
+                settings.EMBEDDING_QUANTIZATION,
+                settings.QUANTIZED_RERANK
+            )
+        return get_vector_index(
+            settings.VECTOR_INDEX_PATH,
+            settings.ANN_N_LISTS,
+            settings.ANN_NPROBE
+        )
+    
+    @property
+    def scoring_version(self) -> str:
+        """Digest of the scoring configuration; changes whenever a stored score would"""
+        config = {
+            'weights': self.SCORE_WEIGHTS,
+            'similarity_mode': self.similarity_mode,
+            'chunking': [self.chunker.max_words, self.chunker.max_chunks]
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    
+    @staticmethod
+    def model_id() -> str:
+        """Configured model and backend; ONNX/int8 vectors differ slightly, so they are cached apart"""
+        settings = get_settings()
+        if settings.EMBEDDING_BACKEND == "onnx":
+            return f"{settings.SBERT_MODEL}@onnx{'-int8' if settings.ONNX_QUANTIZED else ''}"
+        return settings.SBERT_MODEL
+    
+    @property
+    def model(self):
+        """Shared sentence encoder, loaded by the model registry on first use"""
+        return get_model_registry().get(SBERT_MODEL_KEY)
+    
+    @staticmethod
+    def load_model():
+        """Load the configured sentence encoder on the configured backend"""
+        settings = get_settings()
         try:
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("Sentence Transformer model loaded successfully")
+            if settings.EMBEDDING_BACKEND == "onnx":
+                model = OnnxEncoder(
+                    settings.ONNX_MODEL_DIR,
+                    settings.ONNX_QUANTIZED,
+                    settings.ONNX_INTRA_OP_THREADS,
+                    settings.ONNX_INTER_OP_THREADS
+                )
+                if model.model_name != settings.SBERT_MODEL:
+                    raise ValueError(
+                        f"{settings.ONNX_MODEL_DIR} holds {model.model_name}, not {settings.SBERT_MODEL}"
+                    )
+            elif settings.EMBEDDING_BACKEND == "torch":
+                # Imported here so the ONNX backend never pays for torch
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(settings.SBERT_MODEL)
+            else:
+                raise ValueError(f"Unknown embedding backend: {settings.EMBEDDING_BACKEND}")
+            logger.info(f"Sentence encoder loaded successfully ({settings.EMBEDDING_BACKEND} backend)")
+            return model
         except Exception as e:
             logger.error(f"Error loading model: {e}")
             raise
     
     def get_embeddings(self, texts: List[str]) -> np.ndarray:
-        """Generate embeddings for texts"""
-        return self.model.encode(texts, convert_to_tensor=False)
+        """Generate embeddings for texts, encoding only those not already cached"""
+        embeddings = self.embedding_store.get_many(texts)
+        
+        # Encode each distinct missing text once, in a single batch
+        missing = list(dict.fromkeys(
+            text for text, embedding in zip(texts, embeddings) if embedding is None
+        ))
+        if missing:
+            encoded = self.model.encode(missing, convert_to_tensor=False)
+            computed = dict(zip(missing, encoded))
+            for text, embedding in computed.items():
+                self.embedding_store.put(text, embedding)
+            embeddings = [
+                computed[text] if embedding is None else embedding
+                for text, embedding in zip(texts, embeddings)
+            ]
+        
+        return np.asarray(embeddings, dtype=np.float32)
+    
+    def embed_documents(self, texts: List[str]) -> List[Dict[str, np.ndarray]]:
+        """Chunk documents and encode every chunk of every document in one batch.
+        
+        Returns per document its 'chunks' (n_chunks x dim, normalized) and the
+        pooled 'embedding' (normalized mean of the chunks) used for
+        retrieval and pooled scoring.
+        """
+        chunked = self.chunk_documents(texts)
+        return self.pool_chunks(chunked, self.get_embeddings([chunk for chunks in chunked for chunk in chunks]))
+    
+    def chunk_documents(self, texts: List[str]) -> List[List[str]]:
+        """Encoder-sized chunks of each document"""
+        return [self.chunker.chunk(text) for text in texts]
+    
+    def pool_chunks(self, chunked: List[List[str]], embeddings: np.ndarray) -> List[Dict[str, np.ndarray]]:
+        """Per-document 'chunks' and pooled 'embedding' from the flat chunk embeddings"""
+        vectors = self.normalize(embeddings)
+        documents = []
+        start = 0
+        for chunks in chunked:
+            doc_chunks = vectors[start:start + len(chunks)]
+            start += len(chunks)
+            documents.append({
+                'chunks': doc_chunks,
+                'embedding': self.normalize(doc_chunks.mean(axis=0))[0]
+            })
+        return documents
     
     def semantic_similarity(self, text1: str, text2: str) -> float:
-        """Calculate semantic similarity between two texts"""
-        embeddings = self.model.encode([text1, text2], convert_to_tensor=False)
-        similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
-        return float(similarity)
+        """Calculate semantic similarity between two texts (text2 being the job side)"""
+        doc1, doc2 = self.embed_documents([text1, text2])
+        return float(self.document_similarities(doc2, [doc1])[0])
+    
+    def document_similarities(self, job: Dict, candidates: List[Dict]) -> np.ndarray:
+        """Similarity of each candidate to a job under the configured mode.
+        
+        "max_sim": every job chunk is matched to its most similar candidate
+        chunk and those maxima are averaged, so a requirement met anywhere in
+        a long CV counts. "pooled": cosine of the pooled document vectors.
+        Documents stored before chunking (no 'chunks') act as one chunk.
+        """
+        return self.similarities(
+            job['embedding'],
+            job.get('chunks'),
+            self.normalize([candidate['embedding'] for candidate in candidates]),
+            [candidate.get('chunks') for candidate in candidates]
+        )
+    
+    def similarities(
+        self,
+        job_embedding: np.ndarray,
+        job_chunks: Optional[np.ndarray],
+        candidate_embeddings: np.ndarray,
+        candidate_chunks: List[Optional[np.ndarray]]
+    ) -> np.ndarray:
+        """document_similarities over normalized candidate embedding rows"""
+        if self.similarity_mode != "max_sim" or job_chunks is None:
+            return candidate_embeddings @ self.normalize(job_embedding)[0]
+        
+        job_chunks = self.normalize(job_chunks)
+        candidate_chunks = [
+            embedding if chunks is None else chunks
+            for embedding, chunks in zip(candidate_embeddings, candidate_chunks)
+        ]
+        counts = np.array([len(np.atleast_2d(chunks)) for chunks in candidate_chunks])
+        stacked = self.normalize(np.vstack(candidate_chunks))
+        
+        # One product for all chunks of all candidates, then per-candidate max
+        similarities = stacked @ job_chunks.T
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        best = np.maximum.reduceat(similarities, offsets, axis=0)
+        return best.mean(axis=1)
+    
+    def get_normalized_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Generate L2-normalized float32 embeddings, so dot product equals cosine"""
+        return self.normalize(self.get_embeddings(texts))
+    
+    @staticmethod
+    def normalize(embeddings) -> np.ndarray:
+        """L2-normalize rows of an embedding matrix as float32"""
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return embeddings / norms
+    
+    def index_document(self, doc_id: str, text: str):
+        """Add (or replace) a document in the nearest-neighbour index"""
+        self.index_embedding(doc_id, self.embed_documents([text])[0]['embedding'])
+    
+    def index_embedding(self, doc_id: str, embedding: np.ndarray):
+        """Add (or replace) a precomputed embedding in the nearest-neighbour index"""
+        self.vector_index.add([doc_id], embedding)
+    
+    def remove_document(self, doc_id: str):
+        """Remove a document from the nearest-neighbour index"""
+        self.vector_index.remove([doc_id])
+    
+    def retrieve_candidates(self, embedding: np.ndarray, n: int) -> List[str]:
+        """Approximate top-n document ids by semantic similarity to an embedding"""
+        doc_ids, _ = self.vector_index.search(embedding, n)
+        return doc_ids
+    
+    def sync_index(self, store, batch_size: int = 1000) -> Dict[str, int]:
+        """Reconcile the retrieval index with the resumes in a DocumentStore.
+        
+        The index is loaded from its last saved copy, which misses whatever
+        changed after it was written (a crash, another process's uploads),
+        and a missing resume is silently never retrieved. Only vectors of the
+        configured model are indexed: an index saved under another model is
+        emptied and rebuilt. Returns how many vectors were added and removed.
+        """
+        index = self.vector_index
+        marker = self._index_model_path()
+        model_changed = not marker.exists() or marker.read_text(encoding='utf-8') != self.model_name
+        if model_changed and len(index):
+            logger.info(f"Retrieval index was built by another model; rebuilding for {self.model_name}")
+            index.remove(index.ids())
+        signature = store.resume_signature(self.model_name)
+        stored = set(store.resume_ids(self.model_name))
+        indexed = set(index.ids())
+        
+        removed = list(indexed - stored)
+        if removed:
+            index.remove(removed)
+        
+        missing = sorted(stored - indexed)
+        added = 0
+        for start in range(0, len(missing), batch_size):
+            records = [
+                record for record in store.list_resumes(file_ids=missing[start:start + batch_size], embedding_model=self.model_name)
+                if record['embedding'] is not None
+            ]
+            if records:
+                index.add([record['file_id'] for record in records], np.stack([record['embedding'] for record in records]))
+                added += len(records)
+        
+        if added or removed:
+            logger.info(f"Retrieval index synced: {added} added, {len(removed)} removed")
+        if model_changed:
+            self.save_index()
+        self._index_signature = signature
+        return {'added': added, 'removed': len(removed)}
+    
+    def refresh_index(self, store):
+        """Catch the retrieval index up with uploads and deletes made through other processes.
+        
+        Same scheme as CandidateTable.sync: nothing to do while the store's
+        signature is unchanged, resumes uploaded since are upserted, and a
+        count mismatch (deletes) falls back to a full sync_index.
+        """
+        signature = store.resume_signature(self.model_name)
+        with self._index_lock:
+            previous = self._index_signature
+            if signature == previous:
+                return
+            
+            count, latest = signature
+            if previous is not None and previous[1] is not None and latest is not None:
+                records = [
+                    record for record in store.list_resumes(uploaded_after=previous[1], embedding_model=self.model_name)
+                    if record['embedding'] is not None
+                ]
+                if records:
+                    self.vector_index.add(
+                        [record['file_id'] for record in records], np.stack([record['embedding'] for record in records])
+                    )
+            
+            if previous is None or len(self.vector_index) != count:
+                self.sync_index(store)
+            self._index_signature = signature
+    
+    def _index_model_path(self) -> Path:
+        """Marker naming the model whose vectors the saved index holds"""
+        settings = get_settings()
+        if settings.EMBEDDING_QUANTIZATION != "none":
+            return Path(self.vector_index.directory) / "embedding_model"
+        return Path(f"{settings.VECTOR_INDEX_PATH}.model")
+    
+    def save_index(self):
+        """Persist the retrieval index"""
+        self.vector_index.save(get_settings().VECTOR_INDEX_PATH)
+        marker = self._index_model_path()
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.write_text(self.model_name, encoding='utf-8')
     
     def match_skills(
         self,
         required_skills: List[str],
         candidate_skills: List[str]
     ) -> Dict:
-        """Match skills between job and candidate"""
-        required_set = set(skill.lower() for skill in required_skills)
-        candidate_set = set(skill.lower() for skill in candidate_skills)
-        
-        matched = required_set.intersection(candidate_set)
-        missing = required_set - candidate_set
+        """Match skills between job and candidate (one row of the CandidateTable bitset match)"""
+        vocabulary = get_skill_vocabulary()
+        required_bits, candidate_bits = vocabulary.encode_all([required_skills, candidate_skills])
+        matched_bits = required_bits & candidate_bits
         
-        match_percentage = (len(matched) / len(required_set) * 100) if required_set else 0
+        matched_count = int(np.bitwise_count(matched_bits).sum())
+        required_count = int(np.bitwise_count(required_bits).sum())
+        match_percentage = (matched_count / required_count * 100) if required_count else 0
         
         return {
-            'matched_skills': list(matched),
-            'missing_skills': list(missing),
+            'matched_skills': vocabulary.decode(matched_bits),
+            'missing_skills': vocabulary.decode(required_bits & ~candidate_bits),
             'match_percentage': match_percentage,
-            'matched_count': len(matched),
-            'required_count': len(required_set)
+            'matched_count': matched_count,
+            'required_count': required_count
         }
     
     def calculate_match_score(
@@ -57,14 +354,7 @@ class MLService:
         education_match: bool
     ) -> float:
         """Calculate weighted match score"""
-        
-        # Weights for different factors
-        weights = {
-            'semantic': 0.4,      # 40%
-            'skills': 0.35,       # 35%
-            'experience': 0.15,   # 15%
-            'education': 0.10     # 10%
-        }
+        weights = self.SCORE_WEIGHTS
         
         score = (
             semantic_score * weights['semantic'] * 100 +
@@ -75,6 +365,230 @@ class MLService:
         
         return min(100, max(0, score))
     
+    def calculate_match_scores(
+        self,
+        semantic_scores: np.ndarray,
+        skill_matches: np.ndarray,
+        experience_matches: np.ndarray,
+        education_matches: np.ndarray
+    ) -> np.ndarray:
+        """Vectorized calculate_match_score over many candidates"""
+        weights = self.SCORE_WEIGHTS
+        
+        scores = (
+            np.asarray(semantic_scores, dtype=np.float64) * weights['semantic'] * 100 +
+            np.asarray(skill_matches, dtype=np.float64) * weights['skills'] +
+            np.where(experience_matches, 100, 0) * weights['experience'] +
+            np.where(education_matches, 100, 0) * weights['education']
+        )
+        
+        return np.clip(scores, 0, 100)
+    
+    def score_components(
+        self,
+        job_embedding: Optional[np.ndarray],
+        job_skills: Optional[List[str]],
+        required_years: Optional[int],
+        table: CandidateTable,
+        rows: Optional[np.ndarray] = None,
+        components: Iterable[str] = SCORE_COMPONENTS,
+        job_chunks: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """Vectorized score components for table rows (default: all), computing only those asked for.
+        
+        'semantic' needs the job embedding (plus chunks for max-sim, see
+        document_similarities); 'skills' (fraction matched, plus the job's
+        'skill_bits' for table.skill_split) needs job_skills; 'experience'
+        needs required_years.
+        """
+        components = set(components)
+        if rows is None:
+            rows = table.select()
+        result = {}
+        
+        metrics = get_metrics()
+        
+        if 'semantic' in components:
+            with metrics.stage("score", "semantic"):
+                result['semantic'] = self.similarities(
+                    job_embedding,
+                    job_chunks,
+                    table.embeddings[rows],
+                    [table.chunks[row] for row in rows]
+                )
+        
+        if 'skills' in components:
+            # Skill overlap as popcount(AND) of the bitsets
+            with metrics.stage("score", "skills"):
+                job_bits = table.skill_bits_for(job_skills)
+                required_count = int(np.bitwise_count(job_bits).sum())
+                if required_count:
+                    result['skills'] = table.skill_counts(rows, job_bits) / required_count
+                else:
+                    result['skills'] = np.zeros(len(rows))
+                result['skill_bits'] = job_bits
+        
+        if 'experience' in components:
+            with metrics.stage("score", "experience"):
+                result['experience'] = table.experience[rows] >= required_years
+        
+        return result
+    
+    def rank_candidates(
+        self,
+        job_embedding: np.ndarray,
+        job_skills: List[str],
+        required_years: int,
+        candidates: List[Dict],
+        top_k: int = 10,
+        job_chunks: Optional[np.ndarray] = None
+    ) -> List[Dict]:
+        """rank_table over a list of candidate dicts; 'index' is the position in the list"""
+        if not candidates:
+            return []
+        
+        return self.rank_table(
+            CandidateTable.from_records(candidates),
+            None,
+            job_embedding,
+            job_skills,
+            required_years,
+            top_k,
+            job_chunks
+        )
+    
+    def rank_table(
+        self,
+        table: CandidateTable,
+        rows: Optional[np.ndarray],
+        job_embedding: np.ndarray,
+        job_skills: List[str],
+        required_years: int,
+        top_k: int = 10,
+        job_chunks: Optional[np.ndarray] = None,
+        lexical: Optional[Dict[str, float]] = None,
+        lexical_weight: float = 0.0
+    ) -> List[Dict]:
+        """Score table rows (default: all) against one job in a single pass and return the top-K.
+        
+        With `lexical` (file_id -> normalized BM25 score, see LexicalIndex)
+        rows are ordered by a blend of match score and BM25 instead; the
+        match score itself is unchanged.
+        """
+        if rows is None:
+            rows = table.select()
+        if len(rows) == 0:
+            return []
+        
+        scored = self.score_table(table, rows, job_embedding, job_skills, required_years, job_chunks)
+        scores = scored['score']
+        if lexical is not None:
+            scored['lexical'] = np.fromiter(
+                (lexical.get(table.ids[row], 0.0) for row in rows), dtype=np.float64, count=len(rows)
+            ) * 100
+            scored['combined'] = (1 - lexical_weight) * scores + lexical_weight * scored['lexical']
+            scores = scored['combined']
+        
+        # Top-K selection without sorting the whole candidate pool; ties go to
+        # the lower file id, as in rank_page and the shard merge
+        k = min(top_k, len(rows))
+        threshold = np.partition(scores, len(rows) - k)[len(rows) - k]
+        top = np.flatnonzero(scores >= threshold)
+        ids = np.array([table.ids[rows[i]] for i in top])
+        top = top[np.lexsort((ids, -scores[top]))][:k]
+        
+        return [self.ranked_result(table, rows, i, scored) for i in top]
+    
+    def rank_page(
+        self,
+        table: CandidateTable,
+        rows: Optional[np.ndarray],
+        job_embedding: np.ndarray,
+        job_skills: List[str],
+        required_years: int,
+        limit: int,
+        after: Optional[Tuple[float, str]] = None,
+        job_chunks: Optional[np.ndarray] = None
+    ) -> Tuple[int, Iterator[Dict]]:
+        """The next `limit` rows of the full ranking after an (score, file_id) position.
+        
+        Rows are ordered by score, then file id, so a page resumes exactly
+        after the last row of the previous one even if resumes were added
+        in between. Returns how many rows remain from `after` on, and the
+        page's results as a lazy iterator, so a large page is never
+        materialized at once.
+        """
+        if rows is None:
+            rows = table.select()
+        if len(rows) == 0:
+            return 0, iter(())
+        
+        scored = self.score_table(table, rows, job_embedding, job_skills, required_years, job_chunks)
+        scores = scored['score']
+        ids = np.array([table.ids[row] for row in rows])
+        
+        candidates = np.arange(len(rows))
+        if after is not None:
+            score, file_id = after
+            candidates = np.flatnonzero((scores < score) | ((scores == score) & (ids > file_id)))
+        remaining = len(candidates)
+        
+        if remaining > limit:
+            # Everything scoring at least the limit-th best; ties at the cut are settled by the sort
+            threshold = np.partition(scores[candidates], remaining - limit)[remaining - limit]
+            candidates = candidates[scores[candidates] >= threshold]
+        order = candidates[np.lexsort((ids[candidates], -scores[candidates]))][:limit]
+        
+        return remaining, (self.ranked_result(table, rows, i, scored) for i in order)
+    
+    def score_table(
+        self,
+        table: CandidateTable,
+        rows: np.ndarray,
+        job_embedding: np.ndarray,
+        job_skills: List[str],
+        required_years: int,
+        job_chunks: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """score_components of table rows plus their overall 'score'.
+        
+        Embeddings are the ones stored at upload, so nothing is re-encoded.
+        Scores follow calculate_match_score exactly, so they agree with the
+        pairwise path.
+        """
+        scored = self.score_components(
+            job_embedding, job_skills, required_years, table, rows, job_chunks=job_chunks
+        )
+        scored['score'] = self.calculate_match_scores(
+            scored['semantic'],
+            scored['skills'],
+            scored['experience'],
+            np.ones(len(rows), dtype=bool)
+        )
+        return scored
+    
+    @staticmethod
+    def ranked_result(table: CandidateTable, rows: np.ndarray, i: int, scored: Dict[str, np.ndarray]) -> Dict:
+        """Result entry for the i-th scored row; carries its table row as 'index'"""
+        row = int(rows[i])
+        matched, missing = table.skill_split(row, scored['skill_bits'])
+        return {
+            'index': row,
+            'file_id': table.ids[row],
+            'filename': table.filenames[row],
+            'match_score': float(scored['score'][i]),
+            'similarity_score': float(scored['semantic'][i]),
+            'skill_match_percentage': float(scored['skills'][i] * 100),
+            'matched_skills': matched,
+            'missing_skills': missing,
+            'experience_match': bool(scored['experience'][i]),
+            'education_match': True,
+            **({
+                'lexical_score': float(scored['lexical'][i]),
+                'combined_score': float(scored['combined'][i])
+            } if 'lexical' in scored else {})
+        }
+    
     def generate_recommendations(
         self,
         match_score: float,
@@ -102,3 +616,10 @@ class MLService:
             recommendations.append("Consider providing technical training or mentoring.")
         
         return recommendations
+
+@lru_cache()
+def get_ml_service() -> MLService:
+    """Shared MLService; its sentence encoder lives in the model registry"""
+    return MLService()
+
+get_model_registry().register(SBERT_MODEL_KEY, MLService.load_model)
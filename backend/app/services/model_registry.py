@@ -0,0 +1,85 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ModelRegistry:
+    """Process-wide home of the heavy models (spaCy pipeline, sentence encoder).
+
+    Services register a loader per model name at import time; the model is
+    built once, on first use or during warm_up(), and shared by every
+    caller in the process. Per-model status lets /health report readiness
+    without triggering a load.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._status: Dict[str, Dict] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """Declare how to build a model; nothing is loaded yet"""
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            self._status.setdefault(name, {'state': 'not_loaded', 'load_seconds': None, 'error': None})
+
+    def get(self, name: str) -> Any:
+        """The loaded model, building it on first access"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        if name not in self._loaders:
+            raise KeyError(f"No model registered under '{name}'")
+
+        # Concurrent first callers wait for a single load
+        with self._locks[name]:
+            if name in self._models:
+                return self._models[name]
+
+            self._status[name] = {'state': 'loading', 'load_seconds': None, 'error': None}
+            start = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                self._status[name] = {'state': 'failed', 'load_seconds': None, 'error': str(e)}
+                logger.error(f"Error loading model '{name}': {e}")
+                raise
+
+            elapsed = round(time.perf_counter() - start, 3)
+            self._models[name] = model
+            self._status[name] = {'state': 'ready', 'load_seconds': elapsed, 'error': None}
+            logger.info(f"Model '{name}' loaded in {elapsed}s")
+            return model
+
+    def warm_up(self, names: Optional[Iterable[str]] = None):
+        """Load the given models (default: all registered) now rather than on first request"""
+        for name in list(names or self._loaders):
+            try:
+                self.get(name)
+            except Exception:
+                # Already logged and recorded; the next get() retries
+                pass
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    @property
+    def ready(self) -> bool:
+        """True once every registered model is loaded"""
+        return bool(self._loaders) and all(name in self._models for name in self._loaders)
+
+    def status(self) -> Dict[str, Dict]:
+        """Per-model load state, without loading anything"""
+        with self._lock:
+            return {name: dict(status) for name, status in self._status.items()}
+
+@lru_cache()
+def get_model_registry() -> ModelRegistry:
+    return ModelRegistry()
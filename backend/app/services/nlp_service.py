@@ -1,89 +1,87 @@
 import spacy
 from typing import List, Set, Dict, Tuple
-import re
 from datetime import datetime
+from functools import lru_cache
+from app.core.config import get_settings
+from app.services.skill_matcher import get_skill_matcher
+from app.services.model_registry import get_model_registry
+from app.services.text_patterns import ExperienceExtractor, clean_text
 import logging
 
 logger = logging.getLogger(__name__)
 
+SPACY_MODEL_KEY = "spacy"
+
 class NLPService:
     """NLP processing for resume and job descriptions"""
     
+    # Only NER is read from the parse; stop-word flags are lexical attributes
+    REQUIRED_COMPONENTS = {'ner'}
+    MAX_PARSE_CHARS = 1000000
+    MAX_TOKEN_CHARS = 500000
+    
     def __init__(self):
+        settings = get_settings()
+        
+        self.batch_size = settings.SPACY_BATCH_SIZE
+        self.n_process = settings.SPACY_N_PROCESS
+        
+        # Compiled once per process and shared by every NLPService instance
+        self.skill_matcher = get_skill_matcher(settings.SKILLS_TAXONOMY_PATH)
+        self.experience_extractor = ExperienceExtractor()
+    
+    @property
+    def nlp(self):
+        """Shared spaCy pipeline, loaded by the model registry on first use"""
+        return get_model_registry().get(SPACY_MODEL_KEY)
+    
+    @classmethod
+    def load_pipeline(cls):
+        """Load the configured spaCy model with unused components disabled"""
+        settings = get_settings()
+        
         try:
-            self.nlp = spacy.load("en_core_web_sm")
+            nlp = spacy.load(settings.SPACY_MODEL)
             logger.info("SpaCy model loaded successfully")
         except OSError:
-            logger.error("SpaCy model not found. Running: python -m spacy download en_core_web_sm")
+            logger.error(f"SpaCy model not found. Running: python -m spacy download {settings.SPACY_MODEL}")
             raise
-    
-    def clean_text(self, text: str) -> str:
-        """Clean and normalize text"""
-        # Convert to lowercase
-        text = text.lower()
         
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        for name in cls._unused_components(nlp):
+            nlp.disable_pipe(name)
+        logger.info(f"SpaCy pipeline: {nlp.pipe_names}")
+        return nlp
+    
+    @classmethod
+    def _unused_components(cls, nlp) -> List[str]:
+        """Pipeline components whose output process_document never reads"""
+        keep = set(cls.REQUIRED_COMPONENTS)
         
-        # Remove special characters but keep important ones
-        text = re.sub(r'[^\w\s\-\.]', ' ', text)
+        # A shared tok2vec is only needed if a kept component listens to it
+        if 'tok2vec' in nlp.pipe_names:
+            listeners = getattr(nlp.get_pipe('tok2vec'), 'listening_components', [])
+            if keep.intersection(listeners):
+                keep.add('tok2vec')
         
-        return text.strip()
+        return [name for name in nlp.pipe_names if name not in keep]
+    
+    def clean_text(self, text: str) -> str:
+        """Clean and normalize text"""
+        return clean_text(text)
     
     def extract_skills(self, text: str) -> Set[str]:
         """Extract technical skills from text"""
-        # Common technical skills list
-        common_skills = {
-            'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'go', 'rust',
-            'react', 'angular', 'vue', 'nodejs', 'express', 'fastapi', 'django',
-            'sql', 'mongodb', 'postgresql', 'mysql', 'redis', 'elasticsearch',
-            'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'git', 'jenkins',
-            'machine learning', 'deep learning', 'nlp', 'computer vision', 'tensorflow',
-            'pytorch', 'scikit-learn', 'pandas', 'numpy', 'spacy', 'html', 'css',
-            'rest', 'graphql', 'microservices', 'agile', 'scrum', 'devops'
-        }
-        
-        cleaned_text = self.clean_text(text)
-        tokens = cleaned_text.split()
-        
-        found_skills = set()
-        for skill in common_skills:
-            if skill in cleaned_text:
-                found_skills.add(skill)
-        
-        return found_skills
+        return self.skill_matcher.find(text)
     
     def extract_experience_years(self, text: str) -> Tuple[int, int]:
         """Extract experience years from text"""
-        # Pattern matching for years of experience
-        patterns = [
-            r'(\d+)\s*(?:\+)?\s*years?',
-            r'(\d+)\s*(?:to|-)\s*(\d+)\s*years?'
-        ]
-        
-        years_found = []
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if len(match.groups()) == 2:
-                    try:
-                        years_found.append(int(match.group(2)) - int(match.group(1)))
-                    except:
-                        pass
-                else:
-                    try:
-                        years_found.append(int(match.group(1)))
-                    except:
-                        pass
-        
-        if years_found:
-            return min(years_found), max(years_found)
-        return 0, 0
+        return self.experience_extractor.years(text)
     
-    def extract_entities(self, text: str) -> Dict[str, List[str]]:
-        """Extract named entities using spaCy"""
-        doc = self.nlp(text[:1000000])  # Limit text size for processing
-        
+    def extract_experience_spans(self, text: str) -> List[Dict]:
+        """Experience mentions with offsets (years, ranges, date ranges)"""
+        return self.experience_extractor.spans(text)
+    
+    def _entities_from_doc(self, doc) -> Dict[str, List[str]]:
         entities = {
             'ORG': [],
             'PERSON': [],
@@ -97,22 +95,58 @@ class NLPService:
         
         return entities
     
+    def _tokens_from_doc(self, doc) -> List[str]:
+        return [
+            token.text for token in doc
+            if token.idx < self.MAX_TOKEN_CHARS and not token.is_stop
+        ]
+    
+    def extract_entities(self, text: str) -> Dict[str, List[str]]:
+        """Extract named entities using spaCy"""
+        return self._entities_from_doc(self.nlp(text[:self.MAX_PARSE_CHARS]))
+    
     def tokenize(self, text: str) -> List[str]:
         """Tokenize text"""
-        doc = self.nlp(text[:500000])
-        return [token.text for token in doc if not token.is_stop]
+        return self._tokens_from_doc(self.nlp(text[:self.MAX_TOKEN_CHARS]))
     
-    def process_document(self, text: str, doc_type: str = "resume") -> Dict:
-        """Complete document processing"""
-        cleaned_text = self.clean_text(text)
-        
+    def _build_result(self, text: str, doc, doc_type: str) -> Dict:
+        """Assemble the process_document dict from one parsed Doc"""
         return {
             'original_text': text,
-            'cleaned_text': cleaned_text,
+            'cleaned_text': self.clean_text(text),
             'skills': list(self.extract_skills(text)),
-            'entities': self.extract_entities(text),
-            'tokens': self.tokenize(text),
+            'entities': self._entities_from_doc(doc),
+            'tokens': self._tokens_from_doc(doc),
             'experience_years': self.extract_experience_years(text),
             'document_type': doc_type,
             'processed_at': datetime.now().isoformat()
         }
+    
+    def process_document(self, text: str, doc_type: str = "resume") -> Dict:
+        """Complete document processing, parsing the text once"""
+        return self._build_result(text, self.nlp(text[:self.MAX_PARSE_CHARS]), doc_type)
+    
+    def process_documents(
+        self,
+        texts: List[str],
+        doc_type: str = "resume",
+        batch_size: int = None,
+        n_process: int = None
+    ) -> List[Dict]:
+        """Process many documents with nlp.pipe; same dict shape as process_document"""
+        docs = self.nlp.pipe(
+            (text[:self.MAX_PARSE_CHARS] for text in texts),
+            batch_size=batch_size or self.batch_size,
+            n_process=n_process or self.n_process
+        )
+        return [
+            self._build_result(text, doc, doc_type)
+            for text, doc in zip(texts, docs)
+        ]
+
+@lru_cache()
+def get_nlp_service() -> NLPService:
+    """Shared NLPService; its spaCy pipeline lives in the model registry"""
+    return NLPService()
+
+get_model_registry().register(SPACY_MODEL_KEY, NLPService.load_pipeline)
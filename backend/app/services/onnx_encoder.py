@@ -0,0 +1,191 @@
+from pathlib import Path
+from typing import Dict, List, Union
+import argparse
+import json
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Optional: only needed for EMBEDDING_BACKEND="onnx"
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:
+    Tokenizer = None
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+CONFIG_FILE = "encoder_config.json"
+
+class OnnxEncoder:
+    """Sentence encoder running an exported transformer with onnxruntime.
+
+    Stands in for the SentenceTransformer.encode calls MLService makes:
+    the exported fast tokenizer, the ONNX graph, then the same pooling and
+    normalization the sentence-transformers pipeline applies. The int8
+    variant is the same graph with its weights dynamically quantized.
+    No torch import, so it is cheaper to load and to keep resident.
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        quantized: bool = False,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 1
+    ):
+        if onnxruntime is None or Tokenizer is None:
+            raise ImportError("EMBEDDING_BACKEND=onnx needs the onnxruntime and tokenizers packages")
+
+        model_dir = Path(model_dir)
+        path = model_dir / (QUANTIZED_MODEL_FILE if quantized else MODEL_FILE)
+        if not path.exists():
+            raise FileNotFoundError(f"{path} not found; export it with: python -m app.services.onnx_encoder")
+
+        with open(model_dir / CONFIG_FILE, encoding='utf-8') as f:
+            self.config = json.load(f)
+        self.model_name = self.config['model']
+        self.quantized = quantized
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        options.execution_mode = (
+            onnxruntime.ExecutionMode.ORT_SEQUENTIAL if inter_op_threads <= 1
+            else onnxruntime.ExecutionMode.ORT_PARALLEL
+        )
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+        # Same truncation and padding as the sentence-transformers tokenize step
+        self.tokenizer = Tokenizer.from_file(str(model_dir / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(self.config['max_seq_length'])
+        self.tokenizer.enable_padding(pad_id=self.config['pad_token_id'], pad_token=self.config['pad_token'])
+
+        logger.info(f"ONNX encoder loaded: {path} ({intra_op_threads} intra-op / {inter_op_threads} inter-op threads)")
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config['dimension']
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_tensor: bool = False,
+        normalize_embeddings: bool = False,
+        **kwargs
+    ) -> np.ndarray:
+        """float32 embeddings, one row per sentence (a vector for a single string)"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        embeddings = np.empty((len(texts), self.config['dimension']), dtype=np.float32)
+        # Longest first, so each batch pads to similar lengths
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            embeddings[rows] = self._encode_batch([texts[i] for i in rows])
+
+        if normalize_embeddings and not self.config['normalize']:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.maximum(norms, 1e-12)
+        return embeddings[0] if single else embeddings
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch([text.strip() for text in texts])
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        inputs = {
+            'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+            'attention_mask': attention_mask
+        }
+        if 'token_type_ids' in self.input_names:
+            inputs['token_type_ids'] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        hidden = self.session.run(["last_hidden_state"], inputs)[0]
+
+        pooling = self.config['pooling']
+        mask = attention_mask[:, :, None].astype(np.float32)
+        if pooling == "cls":
+            pooled = hidden[:, 0]
+        elif pooling == "max":
+            pooled = np.where(mask > 0, hidden, -1e9).max(axis=1)
+        else:
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+        if self.config['normalize']:
+            pooled = pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled.astype(np.float32)
+
+def export(model_name: str, output_dir: str, quantize: bool = True, opset: int = 14) -> Dict:
+    """Export a sentence-transformers model to ONNX (plus an int8 copy) for OnnxEncoder.
+
+    Needs torch and sentence-transformers, so run it once at build time,
+    not in the serving process.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    tokenizer = transformer.tokenizer
+    auto_model = transformer.auto_model.eval()
+
+    # Feed only the inputs the transformer takes, in its forward() order
+    sample = tokenizer(["An example sentence", "Another"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            auto_model,
+            tuple(sample[name] for name in input_names),
+            str(output / MODEL_FILE),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset
+        )
+    tokenizer.save_pretrained(str(output))
+
+    pooling = next((module for module in model if hasattr(module, "get_pooling_mode_str")), None)
+    config = {
+        'model': model_name,
+        'dimension': model.get_sentence_embedding_dimension(),
+        'max_seq_length': model.max_seq_length,
+        'pooling': pooling.get_pooling_mode_str() if pooling is not None else "mean",
+        'normalize': any(type(module).__name__ == "Normalize" for module in model),
+        'pad_token': tokenizer.pad_token,
+        'pad_token_id': tokenizer.pad_token_id
+    }
+    with open(output / CONFIG_FILE, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(str(output / MODEL_FILE), str(output / QUANTIZED_MODEL_FILE), weight_type=QuantType.QInt8)
+
+    logger.info(f"Exported {model_name} to {output}")
+    return config
+
+if __name__ == "__main__":
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Export the sentence encoder for EMBEDDING_BACKEND=onnx")
+    parser.add_argument("--model", default=settings.SBERT_MODEL)
+    parser.add_argument("--output", default=settings.ONNX_MODEL_DIR)
+    parser.add_argument("--no-quantize", action="store_true", help="skip the int8 copy")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(export(args.model, args.output, not args.no_quantize), indent=2))
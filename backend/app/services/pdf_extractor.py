@@ -0,0 +1,211 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional
+import multiprocessing
+import threading
+import logging
+import pdfplumber
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Optional faster backends; pdfplumber (a hard dependency) is the fallback
+try:
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+
+try:
+    from pdfminer.high_level import extract_pages as pdfminer_extract_pages
+    from pdfminer.layout import LTTextContainer
+except ImportError:
+    pdfminer_extract_pages = None
+
+# PDFium keeps global state and is not thread-safe, and pypdfium2 does not
+# serialize calls into it: every use goes through this lock
+_pdfium_lock = threading.Lock()
+
+def _pages_pdfium(file_path: str, start: int, stop: Optional[int]) -> Iterator[str]:
+    with _pdfium_lock:
+        pdf = pypdfium2.PdfDocument(file_path)
+        pages = len(pdf)
+    try:
+        for index in range(start, min(stop if stop is not None else pages, pages)):
+            # Held per page, not across the yield, so other threads interleave
+            with _pdfium_lock:
+                page = pdf[index]
+                textpage = page.get_textpage()
+                try:
+                    text = textpage.get_text_range().replace('\r\n', '\n')
+                finally:
+                    textpage.close()
+                    page.close()
+            yield text
+    finally:
+        with _pdfium_lock:
+            pdf.close()
+
+def _pages_pdfminer(file_path: str, start: int, stop: Optional[int]) -> Iterator[str]:
+    page_numbers = range(start, stop) if stop is not None else None
+    for index, layout in enumerate(pdfminer_extract_pages(file_path, page_numbers=page_numbers)):
+        if stop is None and index < start:
+            continue
+        yield "".join(
+            element.get_text() for element in layout if isinstance(element, LTTextContainer)
+        )
+
+def _pages_pdfplumber(file_path: str, start: int, stop: Optional[int]) -> Iterator[str]:
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages[start:stop]:
+            yield page.extract_text() or ""
+            # Drop the parsed object graph of pages already read
+            page.close()
+
+BACKENDS: Dict[str, Callable[[str, int, Optional[int]], Iterator[str]]] = {'pdfplumber': _pages_pdfplumber}
+if pypdfium2 is not None:
+    BACKENDS['pdfium'] = _pages_pdfium
+if pdfminer_extract_pages is not None:
+    BACKENDS['pdfminer'] = _pages_pdfminer
+
+# Preference order for backend="auto"
+AUTO_ORDER = ['pdfium', 'pdfminer', 'pdfplumber']
+
+def page_count(file_path: str) -> int:
+    """Number of pages, without extracting any text"""
+    if pypdfium2 is not None:
+        with _pdfium_lock:
+            pdf = pypdfium2.PdfDocument(file_path)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+def extract_page_range(backend: str, file_path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop); runs inside the page-parallel process pool"""
+    return list(BACKENDS[backend](file_path, start, stop))
+
+class PDFExtractor:
+    """Page-by-page PDF text extraction with page/character cutoffs.
+
+    Pages stream out of iter_pages() one at a time, so only the current
+    page is held in memory and reading stops as soon as max_pages or
+    max_chars is reached. Large documents are split into page ranges and
+    extracted in parallel processes; within a process, PDFium calls are
+    serialized by a lock (it is not thread-safe).
+    """
+
+    def __init__(
+        self,
+        backend: str = "auto",
+        max_pages: int = 0,
+        max_chars: int = 0,
+        parallel_workers: int = 0,
+        parallel_min_pages: int = 32
+    ):
+        if backend == "auto":
+            self.backends = [name for name in AUTO_ORDER if name in BACKENDS]
+        elif backend in BACKENDS:
+            # Explicit choice, still falling back to pdfplumber if it fails
+            self.backends = list(dict.fromkeys([backend, 'pdfplumber']))
+        else:
+            raise ValueError(f"Unknown or unavailable PDF backend: {backend}")
+
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.parallel_workers = parallel_workers
+        self.parallel_min_pages = parallel_min_pages
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.parallel_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def iter_pages(self, file_path: str) -> Iterator[str]:
+        """Yield page texts in order, honouring max_pages and max_chars"""
+        stop = self.max_pages or None
+        remaining = self.max_chars or None
+
+        for i, backend in enumerate(self.backends):
+            produced = False
+            try:
+                for text in BACKENDS[backend](file_path, 0, stop):
+                    produced = True
+                    if remaining is not None:
+                        text = text[:remaining]
+                        remaining -= len(text)
+                    yield text
+                    if remaining is not None and remaining <= 0:
+                        return
+                return
+            except Exception as e:
+                # Only fall back if nothing was emitted yet, so pages are never duplicated
+                if produced or i == len(self.backends) - 1:
+                    logger.error(f"Error extracting text from PDF with {backend}: {e}")
+                    raise
+                logger.warning(f"PDF backend {backend} failed on {file_path}, trying {self.backends[i + 1]}: {e}")
+
+    def extract(self, file_path: str) -> str:
+        """Full text of the (truncated) document"""
+        pages = self._extract_parallel(file_path) if self.parallel_workers > 1 else None
+        if pages is None:
+            pages = list(self.iter_pages(file_path))
+
+        text = "\n".join(pages).strip()
+        return text[:self.max_chars] if self.max_chars else text
+
+    def _extract_parallel(self, file_path: str) -> Optional[List[str]]:
+        """Split a long document into page ranges across processes; None if not worth it"""
+        try:
+            pages = page_count(file_path)
+        except Exception:
+            return None
+
+        if self.max_pages:
+            pages = min(pages, self.max_pages)
+        if pages < self.parallel_min_pages:
+            return None
+
+        chunk = -(-pages // self.parallel_workers)
+        ranges = [(start, min(start + chunk, pages)) for start in range(0, pages, chunk)]
+        executor = self._get_executor()
+
+        for backend in self.backends:
+            try:
+                futures = [
+                    executor.submit(extract_page_range, backend, file_path, start, stop)
+                    for start, stop in ranges
+                ]
+                return [text for future in futures for text in future.result()]
+            except Exception as e:
+                logger.warning(f"Parallel PDF extraction with {backend} failed on {file_path}: {e}")
+
+        return None
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+@lru_cache()
+def get_pdf_extractor() -> PDFExtractor:
+    """Process-wide extractor configured from settings"""
+    settings = get_settings()
+    # Inside a worker-pool process the pool is the parallelism; a page pool
+    # per worker would multiply processes (WORKER_POOL_SIZE x PDF_PARALLEL_WORKERS)
+    in_child = multiprocessing.parent_process() is not None
+    return PDFExtractor(
+        settings.PDF_BACKEND,
+        settings.PDF_MAX_PAGES,
+        settings.PDF_MAX_CHARS,
+        0 if in_child else settings.PDF_PARALLEL_WORKERS,
+        settings.PDF_PARALLEL_MIN_PAGES
+    )
@@ -0,0 +1,380 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import itertools
+import shutil
+import threading
+import json
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Optional: without it (Windows) every process uses slot 0, so run one process
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+class QuantizedVectorStore:
+    """Memory-mapped, quantized store of L2-normalized embeddings with two-stage search.
+
+    Every vector is kept twice in contiguous row-aligned files: a compact
+    code that is scanned for each query, and the float32 original that is
+    only read for the few hundred rows being re-ranked.
+
+    - "int8": per-vector symmetric scalar quantization (1 byte/dim + a scale)
+    - "binary": sign bits (1 bit/dim), scanned by Hamming distance
+
+    Same add/remove/search/save interface as IVFIndex, so MLService can
+    use either for candidate retrieval.
+
+    The files are private to one process: each claims a slot directory
+    under `directory`, held by an exclusive lock for its lifetime, so two
+    workers never write the same rows; every process fills its slot from
+    the database (MLService.sync_index). Ids added or removed since the
+    last snapshot are appended to a journal as they change, so a crash
+    loses nothing. Once most rows are dead, live rows are rewritten
+    into a new file generation and the old one is deleted.
+    """
+
+    MODES = ("int8", "binary")
+    SCAN_CHUNK = 4096  # rows per scan block, sized to stay in cache
+    COMPACT_MIN_DEAD = 1024  # dead rows tolerated before compaction is considered
+
+    def __init__(self, directory: str, mode: str = "int8", rerank: int = 256):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown quantization mode: {mode}")
+
+        self.root = Path(directory)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self.rerank = rerank
+
+        self.dim: Optional[int] = None
+        self.capacity = 0
+        self.generation = 0
+        self._size = 0
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._vectors = self._codes = self._scales = None
+        self._journal = None
+        self._lock = threading.RLock()
+
+        self.directory = self._claim_slot()
+        meta_path = self.directory / "meta.json"
+        if meta_path.exists():
+            self._load_meta(meta_path)
+
+    def _claim_slot(self) -> Path:
+        """The first slot directory no other live process holds; the lock lasts until exit"""
+        for slot in itertools.count():
+            lock_file = open(self.root / f"slot-{slot}.lock", 'a')
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    lock_file.close()
+                    continue
+            self._slot_lock = lock_file
+            directory = self.root / f"slot-{slot}"
+            directory.mkdir(exist_ok=True)
+            return directory
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._rows)
+
+    def _generation_dir(self, generation: int) -> Path:
+        return self.directory / f"gen-{generation}"
+
+    # Files: float originals, codes, and int8 scales, each `capacity` rows long
+    def _files(self, generation: Optional[int] = None) -> Dict[str, Tuple[Path, np.dtype, int]]:
+        directory = self._generation_dir(self.generation if generation is None else generation)
+        width = self.dim if self.mode == "int8" else (self.dim + 7) // 8
+        files = {
+            'vectors': (directory / "vectors.f32", np.dtype(np.float32), self.dim),
+            'codes': (directory / f"codes.{self.mode}", np.dtype(np.int8 if self.mode == "int8" else np.uint8), width)
+        }
+        if self.mode == "int8":
+            files['scales'] = (directory / "scales.f32", np.dtype(np.float32), 1)
+        return files
+
+    def _map(self):
+        for name, (path, dtype, width) in self._files().items():
+            array = np.memmap(path, dtype=dtype, mode='r+', shape=(self.capacity, width)) if self.capacity else None
+            setattr(self, f"_{name}", array)
+
+    def _allocate(self, generation: int, capacity: int):
+        """Create (or grow) the files of a generation to `capacity` rows"""
+        self._generation_dir(generation).mkdir(exist_ok=True)
+        for path, dtype, width in self._files(generation).values():
+            with open(path, 'ab') as f:
+                f.truncate(capacity * width * dtype.itemsize)
+
+    def _log(self, entries: List[list]):
+        """Append id changes to this generation's journal (after the rows they name are flushed)"""
+        if self._journal is None:
+            self._journal = open(self._generation_dir(self.generation) / "journal.log", 'a', encoding='utf-8')
+        self._journal.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        self._journal.flush()
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        if needed <= self.capacity:
+            return
+
+        capacity = max(needed, self.capacity * 2, 1024)
+        self.flush()
+        self._vectors = self._codes = self._scales = None
+        self._allocate(self.generation, capacity)
+        self.capacity = capacity
+        self._map()
+
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self._alive)] = self._alive
+        self._alive = alive
+        self._write_meta()
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _quantize(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        if self.mode == "binary":
+            return np.packbits(vectors > 0, axis=1), None
+        scales = np.abs(vectors).max(axis=1, keepdims=True) / 127
+        scales[scales == 0] = 1.0
+        return np.round(vectors / scales).astype(np.int8), scales.astype(np.float32)
+
+    def add(self, doc_ids: List[str], vectors: np.ndarray):
+        """Insert or replace vectors for the given ids"""
+        vectors = self._normalize(vectors)
+        if len(doc_ids) != len(vectors):
+            raise ValueError("doc_ids and vectors must have the same length")
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dim vectors, got {vectors.shape[1]}")
+
+            self.remove([doc_id for doc_id in doc_ids if doc_id in self._rows])
+            self._reserve(len(vectors))
+
+            rows = slice(self._size, self._size + len(vectors))
+            codes, scales = self._quantize(vectors)
+            self._vectors[rows] = vectors
+            self._codes[rows] = codes
+            if scales is not None:
+                self._scales[rows] = scales
+            self._alive[rows] = True
+            for offset, doc_id in enumerate(doc_ids):
+                self._ids.append(doc_id)
+                self._rows[doc_id] = self._size + offset
+            self._size += len(vectors)
+
+            self.flush()
+            self._log([["+", rows.start + offset, doc_id] for offset, doc_id in enumerate(doc_ids)])
+
+    def remove(self, doc_ids: List[str]):
+        """Delete vectors; their rows are skipped by every later scan until compaction"""
+        with self._lock:
+            removed = []
+            for doc_id in doc_ids:
+                row = self._rows.pop(doc_id, None)
+                if row is not None:
+                    self._alive[row] = False
+                    self._ids[row] = None
+                    removed.append(["-", row])
+            if removed:
+                self._log(removed)
+
+            dead = self._size - len(self._rows)
+            if dead >= max(self.COMPACT_MIN_DEAD, self._size // 2):
+                self.compact()
+
+    def compact(self):
+        """Rewrite the live rows into a new generation of files, in row order"""
+        with self._lock:
+            live = np.flatnonzero(self._alive[:self._size])
+            generation = self.generation + 1
+            capacity = max(2 * len(live), 1024)
+            self._allocate(generation, capacity)
+
+            for name, (path, dtype, width) in self._files(generation).items():
+                source = getattr(self, f"_{name}")
+                target = np.memmap(path, dtype=dtype, mode='r+', shape=(capacity, width))
+                for start in range(0, len(live), self.SCAN_CHUNK):
+                    rows = live[start:start + self.SCAN_CHUNK]
+                    target[start:start + len(rows)] = source[rows]
+                target.flush()
+                del target
+
+            previous = self.generation
+            self._vectors = self._codes = self._scales = None
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+            self.generation = generation
+            self.capacity = capacity
+            self._ids = [self._ids[row] for row in live]
+            self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+            self._size = len(live)
+            self._alive = np.zeros(capacity, dtype=bool)
+            self._alive[:self._size] = True
+            self._map()
+            # The new generation takes over once meta.json names it
+            self._write_meta()
+            shutil.rmtree(self._generation_dir(previous), ignore_errors=True)
+            logger.info(f"Quantized store compacted: {self.directory} ({len(self)} vectors)")
+
+    def _approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """Stage one: a score per row from the codes alone (higher is better)"""
+        scores = np.empty(self._size, dtype=np.float32)
+
+        if self.mode == "binary":
+            # Hamming distance between sign patterns, as a negative score
+            query_bits = np.packbits(query > 0)
+            for start in range(0, self._size, self.SCAN_CHUNK):
+                stop = min(start + self.SCAN_CHUNK, self._size)
+                distances = np.bitwise_count(self._codes[start:stop] ^ query_bits).sum(axis=1, dtype=np.int32)
+                np.negative(distances, out=scores[start:stop], casting='unsafe')
+            return scores
+
+        # Widen cache-sized blocks of codes into one reused float buffer
+        buffer = np.empty((self.SCAN_CHUNK, self.dim), dtype=np.float32)
+        for start in range(0, self._size, self.SCAN_CHUNK):
+            stop = min(start + self.SCAN_CHUNK, self._size)
+            block = buffer[:stop - start]
+            np.copyto(block, self._codes[start:stop], casting='unsafe')
+            np.dot(block, query, out=scores[start:stop])
+        scores *= self._scales[:self._size, 0]
+        return scores
+
+    def search(self, query: np.ndarray, k: int, rerank: Optional[int] = None) -> Tuple[List[str], np.ndarray]:
+        """Top-k ids and cosine scores: quantized scan, then float re-rank of the best `rerank`"""
+        query = self._normalize(query)[0]
+
+        with self._lock:
+            if not self._rows:
+                return [], np.zeros(0, dtype=np.float32)
+
+            n_candidates = min(max(k, rerank or self.rerank), len(self._rows))
+            scores = self._approximate_scores(query)
+            scores[~self._alive[:self._size]] = -np.inf
+            shortlist = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+
+            best_rows = np.sort(shortlist[np.isfinite(scores[shortlist])])
+
+            # Stage two: exact cosine on the float originals of the shortlist
+            exact = self._vectors[best_rows] @ query
+            k = min(k, len(best_rows))
+            if k == 0:
+                return [], np.zeros(0, dtype=np.float32)
+            top = np.argpartition(-exact, k - 1)[:k]
+            top = top[np.argsort(-exact[top], kind='stable')]
+
+            return [self._ids[best_rows[i]] for i in top], exact[top]
+
+    def flush(self):
+        for array in (self._vectors, self._codes, self._scales):
+            if array is not None:
+                array.flush()
+
+    def _write_meta(self):
+        """Snapshot the id table; the journal then only needs changes made after it"""
+        meta = {
+            'mode': self.mode,
+            'dim': self.dim,
+            'generation': self.generation,
+            'size': self._size,
+            'capacity': self.capacity,
+            'ids': self._ids
+        }
+        meta_path = self.directory / "meta.json"
+        tmp_path = meta_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+        if self._journal is not None:
+            self._journal.truncate(0)
+        else:
+            journal_path = self._generation_dir(self.generation) / "journal.log"
+            if journal_path.exists():
+                journal_path.unlink()
+
+    def save(self, path: Optional[str] = None):
+        """Flush the mapped files and snapshot the id table (path is unused; files live in the directory)"""
+        with self._lock:
+            self.flush()
+            self._write_meta()
+            logger.info(f"Quantized store saved: {self.directory} ({len(self)} vectors, {self.mode})")
+
+    def _load_meta(self, meta_path: Path):
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['mode'] != self.mode:
+            raise ValueError(f"Store at {self.directory} holds {meta['mode']} codes, not {self.mode}")
+
+        self.dim = meta['dim']
+        self.generation = meta.get('generation', 0)
+        self.capacity = meta['capacity']
+        self._size = meta['size']
+        self._ids = meta['ids']
+
+        # Replay the id changes made after the snapshot
+        journal_path = self._generation_dir(self.generation) / "journal.log"
+        if journal_path.exists():
+            with open(journal_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # torn last line of a crash
+                    row = entry[1]
+                    if row >= self.capacity:
+                        break
+                    if row >= len(self._ids):
+                        self._ids.extend([None] * (row + 1 - len(self._ids)))
+                    self._ids[row] = entry[2] if entry[0] == "+" else None
+            self._size = max(self._size, len(self._ids))
+
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids) if doc_id is not None}
+        self._alive = np.zeros(self.capacity, dtype=bool)
+        self._alive[list(self._rows.values())] = True
+        if self.dim is not None:
+            self._map()
+        logger.info(f"Quantized store loaded: {self.directory} ({len(self)} vectors, {self.mode})")
+
+    def nbytes_per_vector(self) -> Dict[str, int]:
+        """Bytes per vector scanned per query versus only read on re-rank"""
+        if self.dim is None:
+            return {'scanned': 0, 'rerank_only': 0}
+        code_bytes = self.dim if self.mode == "int8" else (self.dim + 7) // 8
+        return {
+            'scanned': code_bytes + (4 if self.mode == "int8" else 0),
+            'rerank_only': self.dim * 4
+        }
+
+@lru_cache()
+def get_quantized_store(directory: str, mode: str, rerank: int) -> QuantizedVectorStore:
+    """Process-wide quantized resume store"""
+    return QuantizedVectorStore(directory, mode, rerank)
+
+# A forked worker must claim a slot of its own, not reuse its parent's files
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=get_quantized_store.cache_clear)
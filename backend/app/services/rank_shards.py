@@ -0,0 +1,122 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Dict, List, Optional, Tuple
+import multiprocessing
+import asyncio
+import heapq
+import logging
+import numpy as np
+from app.core.config import get_settings
+from app.services.candidate_table import get_candidate_table
+from app.services.document_store import document_store
+from app.services.ml_service import get_ml_service
+
+logger = logging.getLogger(__name__)
+
+# Set in each shard process by its initializer: (shard index, shard count)
+_shard: Optional[Tuple[int, int]] = None
+
+def _init_shard(index: int, shards: int):
+    global _shard
+    _shard = (index, shards)
+
+def _shard_table():
+    ml_service = get_ml_service()
+    return ml_service, get_candidate_table(
+        document_store, ml_service.similarity_mode == "max_sim", _shard, ml_service.model_name
+    )
+
+def sync_shard() -> Dict:
+    """Load (or refresh) this process's shard of the candidate table"""
+    _, table = _shard_table()
+    return {'shard': _shard[0], 'resumes': len(table)}
+
+def rank_shard(
+    job_embedding: np.ndarray,
+    job_skills: List[str],
+    required_years: int,
+    top_k: int,
+    job_chunks: Optional[np.ndarray],
+    file_ids: Optional[List[str]],
+    min_experience_years: Optional[int],
+    must_have_skills: List[str],
+    lexical: Optional[Dict[str, float]],
+    lexical_weight: float
+) -> Dict:
+    """Local top-K of this process's shard; runs inside the shard process"""
+    ml_service, table = _shard_table()
+    rows = table.select(file_ids, min_experience_years, must_have_skills)
+    results = ml_service.rank_table(
+        table, rows, job_embedding, job_skills, required_years, top_k, job_chunks, lexical, lexical_weight
+    )
+    for result in results:
+        # Rows are local to the shard, meaningless to the coordinator
+        result.pop('index')
+    return {'candidates': len(rows), 'results': results}
+
+class RankShards:
+    """Scatter-gather ranking over resumes partitioned across worker processes.
+
+    Each shard is a single-process executor holding the candidate table of
+    the resumes whose shard_key falls in it (see document_store.shard_key),
+    selected and synced from the database like the in-process table. A query is sent to every shard,
+    each scores its rows with MLService.rank_table (so scores match the
+    unsharded path exactly) and returns its local top-K, and the
+    coordinator merges them. Scans run on N cores in parallel, and each
+    process holds only 1/N of the embeddings.
+    """
+
+    def __init__(self, shards: int):
+        self.shards = shards
+        # spawn: forking a process that already holds torch/spaCy state is unsafe
+        context = multiprocessing.get_context("spawn")
+        self._executors = [
+            ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_init_shard, initargs=(index, shards))
+            for index in range(shards)
+        ]
+        logger.info(f"Rank shards started: {shards} processes")
+
+    async def _scatter(self, fn, *args) -> List:
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(
+            loop.run_in_executor(executor, partial(fn, *args)) for executor in self._executors
+        ))
+
+    async def rank(
+        self,
+        job_embedding: np.ndarray,
+        job_skills: List[str],
+        required_years: int,
+        top_k: int = 10,
+        job_chunks: Optional[np.ndarray] = None,
+        file_ids: Optional[List[str]] = None,
+        min_experience_years: Optional[int] = None,
+        must_have_skills: Optional[List[str]] = None,
+        lexical: Optional[Dict[str, float]] = None,
+        lexical_weight: float = 0.0
+    ) -> Tuple[int, List[Dict]]:
+        """(candidates considered, global top-K) over every shard"""
+        replies = await self._scatter(
+            rank_shard, job_embedding, job_skills, required_years, top_k, job_chunks,
+            file_ids, min_experience_years, must_have_skills or [], lexical, lexical_weight
+        )
+        # The global top-K is within the union of the local ones; ties go to the lower id
+        merged = heapq.nsmallest(
+            top_k,
+            (result for reply in replies for result in reply['results']),
+            key=lambda result: (-result.get('combined_score', result['match_score']), result['file_id'])
+        )
+        return sum(reply['candidates'] for reply in replies), merged
+
+    async def sync(self) -> List[Dict]:
+        """Load every shard now rather than on the first query"""
+        return await self._scatter(sync_shard)
+
+    def shutdown(self):
+        for executor in self._executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+@lru_cache()
+def get_rank_shards() -> RankShards:
+    """Process-wide shard processes configured from settings"""
+    return RankShards(get_settings().RANK_SHARDS)
@@ -0,0 +1,62 @@
+from functools import lru_cache
+from typing import Dict
+import asyncio
+import logging
+from app.services.document_store import DocumentStore, document_store
+from app.services.inference_scheduler import get_inference_scheduler
+from app.services.ml_service import get_ml_service
+
+logger = logging.getLogger(__name__)
+
+class ReembedService:
+    """Re-embeds stored documents whose vectors another model produced.
+
+    Each document records the model its embeddings came from. After
+    SBERT_MODEL or EMBEDDING_BACKEND changes, run() re-encodes the stale
+    ones in the background, and current() does it on demand for a
+    document about to be scored, so vectors of two models are never
+    compared.
+    """
+
+    def __init__(self, store: DocumentStore, batch_size: int = 64):
+        self.store = store
+        self.batch_size = batch_size
+
+    async def current(self, document: Dict) -> Dict:
+        """The document with embeddings of the configured model, re-embedded and stored if stale"""
+        model_name = get_ml_service().model_name
+        if document.get('embedding_model') == model_name:
+            return document
+
+        embedded = (await get_inference_scheduler().embed_documents([document.get('text') or ""]))[0]
+        await asyncio.to_thread(
+            self.store.update_embedding,
+            document['file_id'], document['document_type'], embedded['embedding'], embedded['chunks'], model_name
+        )
+        return {**document, 'embedding': embedded['embedding'], 'chunks': embedded['chunks'], 'embedding_model': model_name}
+
+    async def run(self) -> int:
+        """Re-embed every stale document, a batch at a time; returns how many were updated"""
+        model_name = get_ml_service().model_name
+        updated = 0
+        try:
+            while True:
+                stale = await asyncio.to_thread(self.store.stale_documents, model_name, self.batch_size)
+                if not stale:
+                    break
+                embedded = await get_inference_scheduler().embed_documents([document['text'] for document in stale])
+                for document, vectors in zip(stale, embedded):
+                    await asyncio.to_thread(
+                        self.store.update_embedding,
+                        document['file_id'], document['document_type'], vectors['embedding'], vectors['chunks'], model_name
+                    )
+                updated += len(stale)
+                logger.info(f"Re-embedded {updated} documents with {model_name}")
+        except Exception as e:
+            logger.error(f"Error re-embedding documents: {str(e)}")
+            raise
+        return updated
+
+@lru_cache()
+def get_reembed_service() -> ReembedService:
+    return ReembedService(document_store)
@@ -0,0 +1,116 @@
+from functools import lru_cache
+from typing import Dict, Iterable, List
+import numpy as np
+import logging
+from app.services.candidate_table import CandidateTable
+from app.services.document_store import DocumentStore, document_store
+from app.services.ml_service import MLService, SCORE_COMPONENTS, get_ml_service
+
+logger = logging.getLogger(__name__)
+
+class RescoringService:
+    """Incremental re-scoring of stored match results after a job edit.
+
+    Each match result keeps its score components (similarity, skill
+    fraction, experience/education flags). When a job changes, only the
+    affected components are recomputed for all of its results at once and
+    combined with the stored ones, so e.g. a skills-only edit never touches
+    embeddings.
+    """
+
+    # Stored column holding each component
+    COLUMNS = {
+        'semantic': 'similarity_score',
+        'skills': 'skill_score',
+        'experience': 'experience_match'
+    }
+
+    def __init__(self, store: DocumentStore, ml_service: MLService):
+        self.store = store
+        self.ml_service = ml_service
+
+    def rescore_job(self, job: Dict, changed: Iterable[str]) -> int:
+        """Recompute the changed components of every match result of a job.
+
+        Returns the number of match results updated.
+        """
+        rows = self.store.match_components(job['file_id'])
+        changed = set(changed)
+        if not rows or not changed:
+            return 0
+
+        # Results saved without components (older rows) are recomputed in full
+        recompute = {
+            component for component in SCORE_COMPONENTS
+            if component in changed or any(row[self.COLUMNS[component]] is None for row in rows)
+        }
+
+        resumes = {
+            resume['file_id']: resume
+            for resume in self.store.list_resumes(
+                [row['resume_id'] for row in rows],
+                with_embedding='semantic' in recompute,
+                with_chunks=self.ml_service.similarity_mode == "max_sim",
+                # Vectors of another model are not comparable with the job's
+                embedding_model=self.ml_service.model_name if 'semantic' in recompute else None
+            )
+        }
+        # Results that cannot be rescored (resume gone, or not yet re-embedded
+        # with the current model) would keep a pre-edit score, so drop them;
+        # the next match of the pair computes them afresh
+        self.store.delete_matches([row['id'] for row in rows if row['resume_id'] not in resumes])
+        rows = [row for row in rows if row['resume_id'] in resumes]
+        if not rows:
+            return 0
+
+        table = CandidateTable.from_records([resumes[row['resume_id']] for row in rows])
+        computed = self.ml_service.score_components(
+            job['embedding'],
+            job['skills'],
+            job['experience_years'][0],
+            table,
+            components=recompute,
+            job_chunks=job.get('chunks')
+        )
+
+        def component(name: str) -> np.ndarray:
+            if name in computed:
+                return computed[name]
+            return np.array([row[self.COLUMNS[name]] for row in rows])
+
+        education = np.array([
+            True if row['education_match'] is None else row['education_match'] for row in rows
+        ])
+        scores = self.ml_service.calculate_match_scores(
+            component('semantic'),
+            component('skills'),
+            component('experience'),
+            education
+        )
+
+        updates: List[Dict] = []
+        for i, row in enumerate(rows):
+            # The old cache key describes the pre-edit inputs, so drop it
+            update = {
+                'id': row['id'],
+                'match_score': float(scores[i]),
+                'education_match': bool(education[i]),
+                'cache_key': None
+            }
+            if 'semantic' in computed:
+                update['similarity_score'] = float(computed['semantic'][i])
+            if 'skills' in computed:
+                update['skill_score'] = float(computed['skills'][i])
+                update['matched_skills'], update['missing_skills'] = table.skill_split(i, computed['skill_bits'])
+            if 'experience' in computed:
+                update['experience_match'] = bool(computed['experience'][i])
+            updates.append(update)
+
+        self.store.update_matches(updates)
+
+        logger.info(f"Rescored {len(updates)} matches for job {job['file_id']}: {sorted(recompute)}")
+        return len(updates)
+
+@lru_cache()
+def get_rescoring_service() -> RescoringService:
+    return RescoringService(document_store, get_ml_service())
@@ -0,0 +1,102 @@
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set
+import json
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Letters, digits and the symbols that belong to skill names (c++, c#);
+# everything else, including '-', '.' and '/', separates tokens
+TOKEN_PATTERN = re.compile(r'[a-z0-9+#]+')
+
+class SkillMatcher:
+    """Token-boundary trie that finds every known skill in one pass over a text.
+
+    Each skill and synonym is stored as a token sequence, so "go" never
+    matches inside "good" and "k8s" is reported as its canonical name.
+    """
+
+    _SKILL = object()  # key marking a terminal node
+
+    def __init__(self, taxonomy: Dict[str, Iterable[str]]):
+        self._root: Dict = {}
+        self.skills: Set[str] = set()
+
+        for canonical, synonyms in taxonomy.items():
+            canonical = canonical.lower().strip()
+            self.skills.add(canonical)
+            for phrase in [canonical, *synonyms]:
+                self._insert(phrase, canonical)
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Lowercase and split text into skill-matching tokens"""
+        return TOKEN_PATTERN.findall(text.lower())
+
+    def _insert(self, phrase: str, canonical: str):
+        tokens = self.tokenize(phrase)
+        if not tokens:
+            return
+
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[self._SKILL] = canonical
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillMatcher":
+        """Load a JSON taxonomy mapping canonical skill -> list of synonyms"""
+        with open(path, encoding='utf-8') as f:
+            taxonomy = json.load(f)
+
+        matcher = cls(taxonomy)
+        logger.info(f"Skill taxonomy loaded: {len(matcher.skills)} skills from {path}")
+        return matcher
+
+    def canonical(self, phrase: str) -> Optional[str]:
+        """Canonical name if the whole phrase is a skill or one of its synonyms, else None"""
+        node = self._root
+        for token in self.tokenize(phrase):
+            node = node.get(token)
+            if node is None:
+                return None
+        return node.get(self._SKILL)
+
+    def find(self, text: str) -> Set[str]:
+        """Return canonical skills found in text, preferring the longest phrase"""
+        tokens = self.tokenize(text)
+        root = self._root
+        n_tokens = len(tokens)
+        found = set()
+
+        i = 0
+        while i < n_tokens:
+            node = root.get(tokens[i])
+            if node is None:
+                i += 1
+                continue
+
+            # Walk forward while the phrase continues, keeping the longest match
+            match, match_end = node.get(self._SKILL), i + 1
+            j = i + 1
+            while j < n_tokens:
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                j += 1
+                if self._SKILL in node:
+                    match, match_end = node[self._SKILL], j
+
+            if match is None:
+                i += 1
+            else:
+                found.add(match)
+                i = match_end
+
+        return found
+
+@lru_cache()
+def get_skill_matcher(path: str) -> SkillMatcher:
+    """Build the matcher for a taxonomy file once per process"""
+    return SkillMatcher.from_file(path)
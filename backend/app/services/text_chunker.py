@@ -0,0 +1,47 @@
+from typing import List
+import re
+
+# Sentence ends, or line breaks (resume bullets and headings rarely end in a period)
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\s*\n\s*')
+
+class TextChunker:
+    """Split a document into sentence-aligned windows that fit the encoder.
+
+    all-MiniLM-L6-v2 reads at most 256 word pieces, so whole resumes are
+    silently truncated. Sentences are packed greedily into windows of at
+    most max_words words (over-long sentences are cut into word windows),
+    and at most max_chunks windows are kept so encoding cost per document
+    is bounded.
+    """
+
+    def __init__(self, max_words: int = 120, max_chunks: int = 32):
+        self.max_words = max_words
+        self.max_chunks = max_chunks
+
+    def chunk(self, text: str) -> List[str]:
+        """Chunks of a document, in order; never empty"""
+        chunks: List[str] = []
+        window: List[str] = []
+
+        for sentence in SENTENCE_BOUNDARY.split(text):
+            words = sentence.split()
+            if not words:
+                continue
+
+            if len(window) + len(words) > self.max_words and window:
+                chunks.append(" ".join(window))
+                window = []
+
+            # A sentence longer than a window is cut into full windows
+            while len(words) > self.max_words:
+                chunks.append(" ".join(words[:self.max_words]))
+                words = words[self.max_words:]
+
+            window.extend(words)
+            if len(chunks) >= self.max_chunks:
+                break
+
+        if window and len(chunks) < self.max_chunks:
+            chunks.append(" ".join(window))
+
+        return chunks[:self.max_chunks] or [text.strip()]
@@ -0,0 +1,126 @@
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+import re
+
+MONTHS = {
+    name: index + 1
+    for index, names in enumerate([
+        ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+        ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+        ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december")
+    ])
+    for name in names
+}
+
+_NUMBER = r'\d{1,2}(?:\.\d+)?'
+_UNIT = r'(?:years?|yrs?)\b'
+_PLUS = r'(?:\s*\+|\s+plus\b)'
+_SEPARATOR = r'\s*(?:-|–|—|to|until)\s*'
+_MONTH = r'(?:' + '|'.join(sorted(MONTHS, key=len, reverse=True)) + r')\.?'
+_YEAR = r'(?:19|20)\d{2}'
+
+# One alternation, so a single finditer finds every kind of mention. Every
+# branch starts at a digit (checked first, so most positions are rejected
+# at once); a month before a start year is read by MONTH_BEFORE instead.
+# At a given position the range is tried before the plain count, so
+# "5-7 years" is one range rather than "7 years".
+EXPERIENCE_PATTERN = re.compile(
+    r'(?<![\w.])(?=\d)(?:'
+    rf'(?P<range_lo>{_NUMBER}){_SEPARATOR}(?P<range_hi>{_NUMBER})(?P<range_plus>{_PLUS})?\s*{_UNIT}'
+    r'|'
+    rf'(?P<count>{_NUMBER})(?P<count_plus>{_PLUS})?\s*{_UNIT}'
+    r'|'
+    rf'(?P<from_year>{_YEAR}){_SEPARATOR}'
+    rf'(?:(?:(?P<to_month>{_MONTH})\s*)?(?P<to_year>{_YEAR})\b|(?P<to_now>present|current|now|today)\b)'
+    r')',
+    re.IGNORECASE
+)
+MONTH_BEFORE = re.compile(rf'\b({_MONTH})\s*$', re.IGNORECASE)
+
+# Whitespace runs and disallowed symbols each become one space
+CLEAN_PATTERN = re.compile(r'\s+|[^\w\s\-.]')
+
+def clean_text(text: str) -> str:
+    """Lowercase, collapse whitespace and blank out symbols other than '-' and '.'"""
+    return CLEAN_PATTERN.sub(' ', text.lower()).strip()
+
+class ExperienceExtractor:
+    """Years-of-experience mentions found in one pass of a precompiled pattern.
+
+    Each mention is a span dict with its character offsets and a year range:
+    - "years": "5 years", "3+ yrs" (min == max; 'plus' marks open-ended)
+    - "range": "5-7 years", "3 to 5 years"
+    - "dates": "2018 - 2022", "Mar 2019 - present", converted to a duration
+    """
+
+    def __init__(self, today: Optional[date] = None):
+        # Fixed in tests and benchmarks so "present" is reproducible
+        self.today = today
+
+    def _month_index(self, year: str, month: Optional[str], now: bool) -> int:
+        if now:
+            today = self.today or date.today()
+            return today.year * 12 + today.month - 1
+        return int(year) * 12 + MONTHS.get((month or "jan").lower().rstrip('.'), 1) - 1
+
+    def spans(self, text: str) -> List[Dict]:
+        """Every experience mention in text, in order"""
+        spans = []
+        for match in EXPERIENCE_PATTERN.finditer(text):
+            groups = match.groupdict()
+            span = {'start': match.start(), 'end': match.end(), 'text': match.group()}
+
+            if groups['range_lo'] is not None:
+                low, high = sorted((float(groups['range_lo']), float(groups['range_hi'])))
+                span.update(kind="range", min=low, max=high, plus=groups['range_plus'] is not None)
+            elif groups['count'] is not None:
+                years = float(groups['count'])
+                span.update(kind="years", min=years, max=years, plus=groups['count_plus'] is not None)
+            else:
+                month = MONTH_BEFORE.search(text, max(0, match.start() - 12), match.start())
+                if month is not None:
+                    span.update(start=month.start(), text=text[month.start():match.end()])
+                start = self._month_index(groups['from_year'], month and month.group(1), False)
+                end = self._month_index(groups['to_year'], groups['to_month'], groups['to_now'] is not None)
+                if end < start:
+                    continue
+                span.update(kind="dates", min=(end - start) / 12, max=(end - start) / 12, plus=False,
+                            months=(start, end))
+            spans.append(span)
+        return spans
+
+    @staticmethod
+    def _total_months(intervals: List[Tuple[int, int]]) -> int:
+        """Months covered by date ranges, counting overlaps once"""
+        total = 0
+        current_start = current_end = None
+        for start, end in sorted(intervals):
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    total += current_end - current_start
+                current_start, current_end = start, end
+            else:
+                current_end = max(current_end, end)
+        if current_end is not None:
+            total += current_end - current_start
+        return total
+
+    def years(self, text: str) -> Tuple[int, int]:
+        """(min, max) whole years over all mentions; (0, 0) if there are none.
+
+        Stated counts and ranges contribute their bounds; all date ranges
+        together contribute one value, the total time they cover.
+        """
+        values = []
+        intervals = []
+        for span in self.spans(text):
+            if span['kind'] == "dates":
+                intervals.append(span['months'])
+            else:
+                values += [span['min'], span['max']]
+        if intervals:
+            values.append(self._total_months(intervals) / 12)
+
+        if not values:
+            return 0, 0
+        return int(min(values)), int(max(values))
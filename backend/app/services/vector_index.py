@@ -0,0 +1,326 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import threading
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+class IVFIndex:
+    """Inverted-file (IVF-Flat) index over L2-normalized embeddings, pure NumPy.
+
+    Vectors are clustered with spherical k-means; a query only scans the
+    `nprobe` lists whose centroids are closest to it. Until there are enough
+    vectors to train, search falls back to an exact scan. Retraining, once
+    the data has doubled, runs on a background thread and swaps the new
+    lists in when done.
+    """
+
+    MIN_TRAIN_SIZE = 1024
+    ASSIGN_CHUNK = 65536
+
+    def __init__(self, n_lists: int = 0, nprobe: int = 16, seed: int = 42):
+        self.n_lists = n_lists  # 0 means choose from the data size at training time
+        self.nprobe = nprobe
+        self.seed = seed
+
+        self.dim: Optional[int] = None
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._size = 0
+        self._lists: List[List[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+        self._generation = 0  # bumped by every compaction, which renumbers rows
+        self._lock = threading.RLock()
+        self._train_lock = threading.Lock()
+        self._trainer: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._rows)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    @property
+    def needs_training(self) -> bool:
+        """Enough vectors to train, and twice as many as at the last training"""
+        return len(self) >= max(self.MIN_TRAIN_SIZE, 2 * self.trained_size)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+
+        capacity = max(needed, capacity * 2, 1024)
+        vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        assignments = np.full(capacity, -1, dtype=np.int32)
+        assignments[:self._size] = self._assignments[:self._size]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+
+        self._vectors, self._assignments, self._alive = vectors, assignments, alive
+
+    def _assign(self, vectors: np.ndarray, centroids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Nearest centroid per vector, in chunks to bound memory"""
+        centroids = self.centroids if centroids is None else centroids
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), self.ASSIGN_CHUNK):
+            chunk = vectors[start:start + self.ASSIGN_CHUNK]
+            labels[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+        return labels
+
+    def add(self, doc_ids: List[str], vectors: np.ndarray):
+        """Insert or replace vectors for the given ids"""
+        vectors = self._normalize(vectors)
+        if len(doc_ids) != len(vectors):
+            raise ValueError("doc_ids and vectors must have the same length")
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dim vectors, got {vectors.shape[1]}")
+
+            self.remove([doc_id for doc_id in doc_ids if doc_id in self._rows])
+            self._reserve(len(vectors))
+
+            rows = np.arange(self._size, self._size + len(vectors))
+            self._vectors[rows] = vectors
+            self._alive[rows] = True
+            for doc_id, row in zip(doc_ids, rows):
+                self._ids.append(doc_id)
+                self._rows[doc_id] = int(row)
+            self._size += len(vectors)
+
+            if self.is_trained:
+                labels = self._assign(vectors)
+                self._assignments[rows] = labels
+                for row, label in zip(rows, labels):
+                    self._lists[label].append(int(row))
+                    self._list_arrays.pop(int(label), None)
+
+            # Retrain once the data has doubled since the last training, off the caller's thread
+            if self.needs_training:
+                self._train_in_background()
+
+    def _train_in_background(self):
+        if self._trainer is None or not self._trainer.is_alive():
+            self._trainer = threading.Thread(target=self.train, name="ivf-train", daemon=True)
+            self._trainer.start()
+
+    def wait_for_training(self):
+        """Block until a background training (if any) has swapped its lists in"""
+        trainer = self._trainer
+        if trainer is not None:
+            trainer.join()
+
+    def remove(self, doc_ids: List[str]):
+        """Delete vectors; their rows are skipped until the next compaction"""
+        with self._lock:
+            for doc_id in doc_ids:
+                row = self._rows.pop(doc_id, None)
+                if row is None:
+                    continue
+                self._alive[row] = False
+                label = int(self._assignments[row])
+                if label >= 0:
+                    self._list_arrays.pop(label, None)
+
+    def _compact(self):
+        alive_rows = np.flatnonzero(self._alive[:self._size])
+        self._vectors = self._vectors[alive_rows].copy()
+        self._assignments = self._assignments[alive_rows].copy()
+        self._alive = np.ones(len(alive_rows), dtype=bool)
+        self._ids = [self._ids[row] for row in alive_rows]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._size = len(alive_rows)
+        self._generation += 1
+        if self.is_trained:
+            self._rebuild_lists()
+
+    def train(self, n_iter: int = 10):
+        """Fit centroids with spherical k-means and rebuild the inverted lists.
+
+        Clustering and assignment run on a snapshot of the rows without
+        holding the index lock, so searches and adds carry on meanwhile;
+        rows added in between are assigned when the new lists are swapped in.
+        """
+        with self._train_lock:
+            with self._lock:
+                self._compact()
+                # Rows below _size are never rewritten in place, only masked or reallocated
+                size, generation = self._size, self._generation
+                vectors = self._vectors[:size]
+            if size == 0:
+                return
+
+            centroids = self._kmeans(vectors, n_iter)
+            labels = self._assign(vectors, centroids)
+
+            with self._lock:
+                if self._generation != generation:
+                    # Compacted meanwhile (save()): row numbers changed, assign them all again
+                    size, labels = 0, np.zeros(0, dtype=np.int32)
+                self.centroids = centroids
+                self._assignments[:size] = labels
+                self._assignments[size:self._size] = self._assign(self._vectors[size:self._size])
+                self._rebuild_lists()
+                self.trained_size = len(self)
+
+            logger.info(f"Vector index trained: {len(vectors)} vectors, {len(centroids)} lists")
+
+    def _kmeans(self, vectors: np.ndarray, n_iter: int) -> np.ndarray:
+        """Spherical k-means centroids of the vectors"""
+        n_lists = self.n_lists or int(4 * np.sqrt(len(vectors)))
+        n_lists = max(1, min(n_lists, len(vectors)))
+        rng = np.random.default_rng(self.seed)
+
+        # Train on a sample; 64 points per list is plenty for IVF
+        sample_size = min(len(vectors), 64 * n_lists)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(n_iter):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=n_lists)
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = self._normalize(sums)
+        return centroids
+
+    def _rebuild_lists(self):
+        n_lists = len(self.centroids)
+        order = np.argsort(self._assignments[:self._size], kind='stable')
+        bounds = np.searchsorted(self._assignments[:self._size][order], np.arange(n_lists + 1))
+        self._lists = [order[bounds[i]:bounds[i + 1]].tolist() for i in range(n_lists)]
+        self._list_arrays = {}
+
+    def _list_rows(self, label: int) -> np.ndarray:
+        rows = self._list_arrays.get(label)
+        if rows is None:
+            rows = np.asarray(self._lists[label], dtype=np.int64)
+            rows = rows[self._alive[rows]]
+            self._lists[label] = rows.tolist()
+            self._list_arrays[label] = rows
+        return rows
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None) -> Tuple[List[str], np.ndarray]:
+        """Approximate top-k ids and cosine scores for one query vector"""
+        query = self._normalize(query)[0]
+
+        with self._lock:
+            if not self._rows:
+                return [], np.zeros(0, dtype=np.float32)
+
+            if self.is_trained:
+                nprobe = min(nprobe or self.nprobe, len(self.centroids))
+                centroid_scores = self.centroids @ query
+                probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+                rows = np.concatenate([self._list_rows(int(label)) for label in probe])
+            else:
+                rows = np.flatnonzero(self._alive[:self._size])
+
+            if len(rows) == 0:
+                return [], np.zeros(0, dtype=np.float32)
+
+            scores = self._vectors[rows] @ query
+            k = min(k, len(rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+
+            return [self._ids[rows[i]] for i in top], scores[top]
+
+    def brute_force_search(self, query: np.ndarray, k: int) -> Tuple[List[str], np.ndarray]:
+        """Exact top-k over every live vector, used as the recall baseline"""
+        query = self._normalize(query)[0]
+
+        with self._lock:
+            if not self._rows:
+                return [], np.zeros(0, dtype=np.float32)
+            scores = self._vectors[:self._size] @ query
+            scores[~self._alive[:self._size]] = -np.inf
+            k = min(k, len(self._rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [self._ids[i] for i in top], scores[top]
+
+    def save(self, path: str):
+        """Write the index to a single .npz file"""
+        with self._lock:
+            self._compact()
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.savez(
+                    f,
+                    vectors=self._vectors[:self._size],
+                    assignments=self._assignments[:self._size],
+                    ids=np.array(self._ids, dtype=str),
+                    centroids=self.centroids if self.is_trained else np.zeros((0, 0), dtype=np.float32),
+                    params=np.array([self.n_lists, self.nprobe, self.seed, self.trained_size])
+                )
+            os.replace(tmp_path, path)
+            logger.info(f"Vector index saved: {path} ({len(self)} vectors)")
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        """Read an index written by save()"""
+        with np.load(path) as data:
+            n_lists, nprobe, seed, trained_size = (int(v) for v in data['params'])
+            index = cls(n_lists=n_lists, nprobe=nprobe, seed=seed)
+
+            vectors = data['vectors'].astype(np.float32)
+            index._ids = data['ids'].tolist()
+            index._rows = {doc_id: row for row, doc_id in enumerate(index._ids)}
+            index._size = len(index._ids)
+            index._vectors = vectors
+            index._assignments = data['assignments'].astype(np.int32)
+            index._alive = np.ones(index._size, dtype=bool)
+            if index._size:
+                index.dim = vectors.shape[1]
+
+            if data['centroids'].size:
+                index.centroids = data['centroids'].astype(np.float32)
+                index.trained_size = trained_size
+                index._rebuild_lists()
+
+        logger.info(f"Vector index loaded: {path} ({len(index)} vectors)")
+        return index
+
+@lru_cache()
+def get_vector_index(path: str, n_lists: int, nprobe: int) -> IVFIndex:
+    """Process-wide resume index, loaded from disk when a saved copy exists"""
+    if Path(path).exists():
+        try:
+            return IVFIndex.load(path)
+        except Exception as e:
+            logger.error(f"Error loading vector index {path}: {e}")
+    return IVFIndex(n_lists=n_lists, nprobe=nprobe)
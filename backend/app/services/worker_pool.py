@@ -0,0 +1,172 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, List, Tuple
+import multiprocessing
+import asyncio
+import threading
+import logging
+import numpy as np
+from app.core.config import get_settings
+from app.services.file_service import FileService
+from app.services.nlp_service import get_nlp_service
+from app.services.ml_service import get_ml_service
+from app.services.model_registry import get_model_registry
+
+logger = logging.getLogger(__name__)
+
+# Tasks run inside the pool. They are module-level so a process pool can
+# pickle them; each worker process loads its own models once, on first use.
+
+def extract_text(file_path: str, file_type: str) -> str:
+    return FileService.extract_text(file_path, file_type)
+
+def extract_texts(files: List[Tuple[str, str]]) -> List[Dict]:
+    """Extract a batch of (file_path, file_type); failures are reported per file"""
+    results = []
+    for file_path, file_type in files:
+        try:
+            results.append({'text': FileService.extract_text(file_path, file_type)})
+        except Exception as e:
+            results.append({'error': str(e)})
+    return results
+
+def process_document(text: str, doc_type: str) -> Dict:
+    return get_nlp_service().process_document(text, doc_type)
+
+def process_documents(texts: List[str], doc_type: str) -> List[Dict]:
+    return get_nlp_service().process_documents(texts, doc_type)
+
+def get_embeddings(texts: List[str]) -> np.ndarray:
+    return get_ml_service().get_embeddings(texts)
+
+def embed_documents(texts: List[str]) -> List[Dict[str, np.ndarray]]:
+    return get_ml_service().embed_documents(texts)
+
+def semantic_similarity(text1: str, text2: str) -> float:
+    return get_ml_service().semantic_similarity(text1, text2)
+
+def _warm_up_worker() -> Dict[str, Dict]:
+    """Process pool initializer: load models before the first task arrives"""
+    registry = get_model_registry()
+    registry.warm_up()
+    return registry.status()
+
+class WorkerPool:
+    """Bounded executor for CPU-bound work, so the event loop only handles I/O.
+
+    At most `max_workers + max_queue` tasks may be running or waiting; beyond
+    that, run() rejects immediately with 429 instead of queueing unboundedly.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 4, max_queue: int = 32):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown worker pool kind: {kind}")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.capacity = max_workers + max_queue
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+        self._worker_models: Dict[str, Dict] = {}
+        self._executor = self._create_executor()
+
+        logger.info(f"Worker pool started: {max_workers} {kind} workers, capacity {self.capacity}")
+
+    def _create_executor(self) -> Executor:
+        if self.kind == "process":
+            # spawn: forking a process that already holds torch/spaCy state is unsafe
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_up_worker
+            )
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="worker")
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn in the pool, or raise 429 if the pool is saturated"""
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=429,
+                    detail="Server is busy processing other documents, retry shortly",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+    def warm_up(self):
+        """Load models where tasks will run, ahead of the first request.
+
+        Thread workers share this process's models, so the registry is
+        warmed here. Process workers each hold their own copy: one warm-up
+        task per worker spawns them and loads their models.
+        """
+        if self.kind == "thread":
+            get_model_registry().warm_up()
+            return
+
+        futures = [self._executor.submit(_warm_up_worker) for _ in range(self.max_workers)]
+        for future in futures:
+            try:
+                self._worker_models = future.result()
+            except Exception as e:
+                logger.error(f"Worker warm-up failed: {e}")
+
+    def model_status(self) -> Dict[str, Dict]:
+        """Load state of the models used by the workers"""
+        if self.kind == "thread":
+            return get_model_registry().status()
+        return dict(self._worker_models)
+
+    @property
+    def models_ready(self) -> bool:
+        status = self.model_status()
+        return bool(status) and all(model['state'] == 'ready' for model in status.values())
+
+    def stats(self) -> Dict:
+        """Current load of the pool"""
+        with self._lock:
+            return {
+                'kind': self.kind,
+                'workers': self.max_workers,
+                'capacity': self.capacity,
+                'pending': self._pending,
+                'completed': self._completed,
+                'rejected': self._rejected
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+@lru_cache()
+def get_worker_pool() -> WorkerPool:
+    """Process-wide pool configured from settings"""
+    settings = get_settings()
+    return WorkerPool(
+        settings.WORKER_POOL_KIND,
+        settings.WORKER_POOL_SIZE,
+        settings.WORKER_QUEUE_DEPTH
+    )
+
+def readiness() -> Dict:
+    """Readiness (as opposed to liveness) of this process to serve matching traffic.
+
+    With lazy loading the first request pays for model loading, so the
+    process counts as ready straight away.
+    """
+    pool = get_worker_pool()
+    return {
+        'ready': get_settings().MODEL_LOADING == "lazy" or pool.models_ready,
+        'models': pool.model_status()
+    }
@@ -0,0 +1,74 @@
+"""Skill and experience filtering: per-candidate Python sets versus CandidateTable bitsets.
+
+Usage (from backend/):
+    python -m benchmarks.bench_candidate_table --size 100000 --skills 2000
+"""
+import argparse
+import random
+import time
+import numpy as np
+from app.services.candidate_table import CandidateTable, SkillVocabulary
+
+def legacy_filter(candidates, job_skills, must_have, min_years):
+    """Per-candidate set matching, as the rank route did before CandidateTable"""
+    required = set(skill.lower() for skill in job_skills)
+    must_have = set(skill.lower() for skill in must_have)
+    fractions = []
+    for candidate in candidates:
+        if candidate['experience_years'][0] < min_years:
+            continue
+        skills = set(skill.lower() for skill in candidate['skills'])
+        if must_have <= skills:
+            fractions.append(len(required & skills) / len(required))
+    return np.array(fractions)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--skills", type=int, default=2000)
+    parser.add_argument("--per-resume", type=int, default=25)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Zipf-like popularity, so some skills are common and most are rare
+    vocabulary = [f"skill{i}" for i in range(args.skills)]
+    weights = [1 / (i + 1) for i in range(args.skills)]
+    candidates = [
+        {
+            'file_id': str(i),
+            'skills': set(rng.choices(vocabulary, weights, k=args.per_resume)),
+            'experience_years': (rng.randint(0, 15), 15)
+        }
+        for i in range(args.size)
+    ]
+    jobs = [
+        (rng.choices(vocabulary, weights, k=10), rng.choices(vocabulary[:20], k=1), rng.randint(0, 8))
+        for _ in range(args.queries)
+    ]
+
+    start = time.perf_counter()
+    table = CandidateTable.from_records(candidates, SkillVocabulary())
+    print(f"build: {args.size} resumes, {len(table.vocabulary)} skills, "
+          f"{table.skill_bits.shape[1]} uint64 blocks/row in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    expected = [legacy_filter(candidates, *job) for job in jobs]
+    legacy_ms = (time.perf_counter() - start) / len(jobs) * 1000
+
+    start = time.perf_counter()
+    found = []
+    for job_skills, must_have, min_years in jobs:
+        rows = table.select(None, min_years, must_have)
+        job_bits = table.skill_bits_for(job_skills)
+        found.append(table.skill_counts(rows, job_bits) / np.bitwise_count(job_bits).sum())
+    table_ms = (time.perf_counter() - start) / len(jobs) * 1000
+
+    assert all(np.allclose(e, f) for e, f in zip(expected, found)), "results differ"
+    print(f"{'method':<16} {'ms/query':>10} {'speedup':>8}")
+    print(f"{'python sets':<16} {legacy_ms:>10.2f} {1.0:>8.1f}")
+    print(f"{'bitset table':<16} {table_ms:>10.2f} {legacy_ms / table_ms:>8.1f}")
+
+if __name__ == "__main__":
+    main()
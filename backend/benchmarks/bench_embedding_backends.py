@@ -0,0 +1,111 @@
+"""Throughput, memory and score parity of the embedding backends.
+
+Each backend (torch, onnx, onnx-int8) is loaded in its own spawned
+process, so its peak RSS includes its imports and weights and nothing
+else. It embeds the chunks of a synthetic corpus, and the vectors come
+back for a parity check against torch: every job-to-resume cosine
+similarity must stay within the tolerance of the torch value, or the
+script exits with status 1.
+
+Export the ONNX model first:
+    python -m app.services.onnx_encoder --output ./models/onnx
+
+Usage (from backend/):
+    python -m benchmarks.bench_embedding_backends --docs 200 --threads 4
+"""
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+import numpy as np
+from app.core.config import get_settings
+from app.services.text_chunker import TextChunker
+from benchmarks.corpus import CorpusGenerator
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+def run_backend(backend: str, chunks: List[str], args) -> Dict:
+    """Load one backend and embed every chunk; runs in a fresh process"""
+    start = time.perf_counter()
+    if backend == "torch":
+        import torch
+        from sentence_transformers import SentenceTransformer
+        if args.threads:
+            torch.set_num_threads(args.threads)
+        encoder = SentenceTransformer(args.model, device="cpu")
+    else:
+        from app.services.onnx_encoder import OnnxEncoder
+        encoder = OnnxEncoder(args.onnx_dir, backend == "onnx-int8", args.threads, 1)
+    load_seconds = time.perf_counter() - start
+
+    encoder.encode(chunks[:args.batch_size], batch_size=args.batch_size)
+    start = time.perf_counter()
+    embeddings = encoder.encode(chunks, batch_size=args.batch_size, normalize_embeddings=True)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'load_seconds': load_seconds,
+        'seconds': elapsed,
+        # ru_maxrss is in KiB on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'embeddings': np.asarray(embeddings, dtype=np.float32)
+    }
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200, help="resumes embedded per backend")
+    parser.add_argument("--jobs", type=int, default=10, help="job descriptions for the parity check")
+    parser.add_argument("--words", type=int, default=400)
+    parser.add_argument("--model", default=settings.SBERT_MODEL)
+    parser.add_argument("--onnx-dir", default=settings.ONNX_MODEL_DIR)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--threads", type=int, default=0, help="intra-op threads; 0 = library default")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--tolerance", type=float, default=1e-3, help="max |cosine difference| for onnx (fp32)")
+    parser.add_argument("--int8-tolerance", type=float, default=0.03, help="max |cosine difference| for onnx-int8")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(args.seed)
+    chunker = TextChunker(settings.EMBED_CHUNK_WORDS, settings.EMBED_MAX_CHUNKS)
+    documents = [generator.resume(args.words) for _ in range(args.docs)] + [generator.job() for _ in range(args.jobs)]
+    chunked = [chunker.chunk(text) for text in documents]
+    chunks = [chunk for doc_chunks in chunked for chunk in doc_chunks]
+    offsets = np.cumsum([0] + [len(doc_chunks) for doc_chunks in chunked])
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for backend in args.backends:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[backend] = executor.submit(run_backend, backend, chunks, args).result()
+
+    def similarities(embeddings: np.ndarray) -> np.ndarray:
+        # Pooled document vectors, then every job against every resume
+        pooled = np.add.reduceat(embeddings, offsets[:-1], axis=0)
+        pooled /= np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled[args.docs:] @ pooled[:args.docs].T
+
+    print(f"{len(chunks)} chunks from {len(documents)} documents\n")
+    print(f"{'backend':<10} {'load s':>7} {'docs/s':>8} {'chunks/s':>9} {'peak RSS MB':>12} {'max |dcos|':>11}")
+    failed = False
+    reference = similarities(results["torch"]['embeddings']) if "torch" in results else None
+    for backend, result in results.items():
+        difference = None
+        if reference is not None and backend != "torch":
+            difference = float(np.abs(similarities(result['embeddings']) - reference).max())
+            tolerance = args.int8_tolerance if backend == "onnx-int8" else args.tolerance
+            failed |= difference > tolerance
+        print(f"{backend:<10} {result['load_seconds']:>7.2f} {len(documents) / result['seconds']:>8.1f} "
+              f"{len(chunks) / result['seconds']:>9.1f} {result['peak_rss_mb']:>12.0f} "
+              f"{'-' if difference is None else f'{difference:.5f}':>11}")
+
+    if failed:
+        print("\nParity check failed: a backend's similarities drifted beyond tolerance")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
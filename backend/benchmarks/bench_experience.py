@@ -0,0 +1,110 @@
+"""Experience extraction and text cleaning: the original multi-pass regexes versus text_patterns.
+
+Checks ExperienceExtractor against benchmarks/fixtures/experience_cases.json
+(and clean_text against the original on every generated document) before
+timing anything. The point of text_patterns is correctness: on 200-5000
+word documents the timings stay close to the original (experience 0.9x-1.2x,
+clean_text 1.0x-1.1x between runs).
+
+Usage (from backend/):
+    python -m benchmarks.bench_experience --docs 200 --words 5000
+"""
+import argparse
+import json
+import random
+import re
+import time
+from datetime import date
+from pathlib import Path
+from app.services.text_patterns import ExperienceExtractor, clean_text
+
+FIXTURES = Path(__file__).parent / "fixtures" / "experience_cases.json"
+
+def legacy_extract_experience_years(text: str):
+    """NLPService.extract_experience_years before text_patterns"""
+    patterns = [
+        r'(\d+)\s*(?:\+)?\s*years?',
+        r'(\d+)\s*(?:to|-)\s*(\d+)\s*years?'
+    ]
+    years_found = []
+    for pattern in patterns:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            if len(match.groups()) == 2:
+                years_found.append(int(match.group(2)) - int(match.group(1)))
+            else:
+                years_found.append(int(match.group(1)))
+    if years_found:
+        return min(years_found), max(years_found)
+    return 0, 0
+
+def legacy_clean_text(text: str) -> str:
+    """NLPService.clean_text before text_patterns"""
+    text = text.lower()
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s\-\.]', ' ', text)
+    return text.strip()
+
+def check_fixtures() -> ExperienceExtractor:
+    with open(FIXTURES, encoding='utf-8') as f:
+        fixtures = json.load(f)
+    extractor = ExperienceExtractor(date.fromisoformat(fixtures['today']))
+
+    failures = 0
+    legacy_wrong = 0
+    for case in fixtures['cases']:
+        found = list(extractor.years(case['text']))
+        if found != case['expected']:
+            failures += 1
+            print(f"FAIL {case['text']!r}: expected {case['expected']}, got {found} ({case['note']})")
+        if list(legacy_extract_experience_years(case['text'])) != case['expected']:
+            legacy_wrong += 1
+    print(f"fixtures: {len(fixtures['cases']) - failures}/{len(fixtures['cases'])} correct "
+          f"(original extractor: {len(fixtures['cases']) - legacy_wrong})")
+    if failures:
+        raise SystemExit(1)
+    return extractor
+
+def make_document(words: int, rng: random.Random) -> str:
+    """Resume-like text: filler prose, bullets, symbols and some experience mentions"""
+    filler = ["developed", "services", "team", "with", "python", "api", "led", "the", "and", "cloud",
+              "(aws)", "data", "pipelines;", "design", "c++", "reviews", "•", "e-mail:", "x@y.com"]
+    mentions = ["{n} years", "{n}+ yrs", "{n}-{m} years", "{y} – {z}", "Mar {y} - present"]
+    out = []
+    for i in range(words):
+        if i % 150 == 0:
+            n = rng.randint(1, 9)
+            y = rng.randint(2000, 2018)
+            out.append(rng.choice(mentions).format(n=n, m=n + 2, y=y, z=y + rng.randint(1, 5)))
+        out.append(rng.choice(filler) + ("\n" if i % 12 == 0 else ""))
+    return " ".join(out)
+
+def timed(fn, docs):
+    start = time.perf_counter()
+    results = [fn(doc) for doc in docs]
+    return results, (time.perf_counter() - start) / len(docs) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--words", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    extractor = check_fixtures()
+    rng = random.Random(args.seed)
+    docs = [make_document(args.words, rng) for _ in range(args.docs)]
+
+    expected, legacy_clean_ms = timed(legacy_clean_text, docs)
+    cleaned, clean_ms = timed(clean_text, docs)
+    assert cleaned == expected, "clean_text differs from the original"
+
+    _, legacy_years_ms = timed(legacy_extract_experience_years, docs)
+    _, years_ms = timed(extractor.years, docs)
+
+    print(f"{args.docs} documents of {args.words} words")
+    print(f"{'step':<20} {'original ms':>12} {'new ms':>8} {'speedup':>8}")
+    print(f"{'clean_text':<20} {legacy_clean_ms:>12.3f} {clean_ms:>8.3f} {legacy_clean_ms / clean_ms:>8.1f}")
+    print(f"{'experience years':<20} {legacy_years_ms:>12.3f} {years_ms:>8.3f} {legacy_years_ms / years_ms:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Encoder throughput of concurrent single-document requests, with and without micro-batching.
+
+Each request embeds one unique synthetic resume (so the embedding cache
+never answers), as an upload does. "direct" sends every request to the
+worker pool on its own; "batched" goes through InferenceScheduler with
+each of the given wait budgets.
+
+Usage (from backend/):
+    python -m benchmarks.bench_inference --requests 256 --concurrency 32 --wait-ms 2 5 10
+"""
+import argparse
+import asyncio
+import time
+from app.services import worker_pool as tasks
+from app.services.worker_pool import get_worker_pool
+from app.services.inference_scheduler import InferenceScheduler
+from benchmarks.corpus import CorpusGenerator, summarize
+
+async def drive(embed, texts, concurrency: int):
+    """Embed each text as its own request from `concurrency` concurrent callers"""
+    queue = list(reversed(texts))
+    latencies = []
+
+    async def caller():
+        while queue:
+            text = queue.pop()
+            start = time.perf_counter()
+            await embed(text)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start)
+
+async def main(args):
+    generator = CorpusGenerator(args.seed)
+    pool = get_worker_pool()
+    pool.warm_up()
+
+    def texts(run: str):
+        # Unique per run, so no run is served from the embedding cache
+        return [f"{generator.resume(args.words)}\n{run} {i}" for i in range(args.requests)]
+
+    runs = {'direct': await drive(
+        lambda text: pool.run(tasks.embed_documents, [text]), texts("direct"), args.concurrency
+    )}
+    for wait_ms in args.wait_ms:
+        scheduler = InferenceScheduler(args.max_batch_size, wait_ms)
+        runs[f"batched_{wait_ms:g}ms"] = {
+            **await drive(lambda text: scheduler.embed_documents([text]), texts(f"batched {wait_ms}"), args.concurrency),
+            'mean_batch_size': scheduler.stats()['mean_batch_size']
+        }
+
+    print(f"{'mode':<16} {'docs/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'texts/batch':>12}")
+    for name, result in runs.items():
+        print(f"{name:<16} {result['items_per_second']:>8.1f} {result['p50_ms']:>9.2f} "
+              f"{result['p99_ms']:>9.2f} {result.get('mean_batch_size', '-'):>12}")
+    pool.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--words", type=int, default=400, help="words per resume")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--wait-ms", type=float, nargs="+", default=[2, 5, 10])
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
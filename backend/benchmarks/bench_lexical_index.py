@@ -0,0 +1,68 @@
+"""Build time, size and query latency of the lexical (BM25) prefilter index.
+
+Synthetic resumes are tokenized on whitespace rather than with spaCy, so
+the run measures the index alone; their taxonomy skills are indexed as
+terms, as at upload. Queries are required-skill conjunctions and BM25
+keyword searches drawn from the skill taxonomy.
+
+Usage (from backend/):
+    python -m benchmarks.bench_lexical_index --size 100000 --queries 500
+"""
+import argparse
+import time
+import numpy as np
+from app.services.lexical_index import LexicalIndex
+from benchmarks.corpus import CorpusGenerator, load_skills, measure
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=20000, help="resumes indexed")
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-n", type=int, default=500, help="lexical_top_n of the keyword queries")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    skills = load_skills()
+    generator = CorpusGenerator(args.seed, skills)
+    records = []
+    for i in range(args.size):
+        text = generator.resume(args.words)
+        lowered = text.lower()
+        records.append({
+            'file_id': f"resume_{i}",
+            'tokens': text.split(),
+            'skills': [skill for skill in skills if skill in lowered]
+        })
+
+    index = LexicalIndex()
+    start = time.perf_counter()
+    index.add(records)
+    build_seconds = time.perf_counter() - start
+
+    postings = [index._terms[term] for term in index._terms]
+    compressed = sum(p.gaps.nbytes + p.tfs.nbytes + 8 * len(p.tail_docs) for p in postings)
+    plain = sum(8 * len(p) for p in postings)
+    print(f"{len(index)} resumes, {len(postings)} terms, built in {build_seconds:.2f}s "
+          f"({len(index) / build_seconds:.0f} docs/s)")
+    print(f"postings: {compressed / 2**20:.1f} MiB compressed vs {plain / 2**20:.1f} MiB as int64 doc ids\n")
+
+    required = [list(rng.choice(skills, 2, replace=False)) for _ in range(args.queries)]
+    keywords = [list(rng.choice(skills, 5, replace=False)) for _ in range(args.queries)]
+    results = {
+        'required x2': measure(lambda terms: index.search(required=terms), required),
+        'keywords x5': measure(lambda terms: index.search(keywords=terms, limit=args.top_n), keywords)
+    }
+    matches = {
+        'required x2': np.mean([len(index.search(required=terms)) for terms in required[:50]]),
+        'keywords x5': np.mean([len(index.search(keywords=terms, limit=args.top_n)) for terms in keywords[:50]])
+    }
+
+    print(f"{'query':<12} {'matches':>9} {'queries/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, result in results.items():
+        print(f"{name:<12} {matches[name]:>9.0f} {result['items_per_second']:>10.1f} "
+              f"{result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""PDF extraction: the original pdfplumber loop versus PDFExtractor backends.
+
+Generates a corpus of text PDFs (short resumes plus a few long portfolios),
+then times each backend sequentially, page-parallel, and with the page cap.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pdf --docs 20 --long-pages 200
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+import pdfplumber
+from app.services.pdf_extractor import BACKENDS, PDFExtractor
+
+WORDS = ("python react docker kubernetes engineer led team delivered platform "
+         "services reliability customers migrated latency pipelines analytics "
+         "years experience designed built scaled mentored").split()
+
+def legacy_extract(file_path: str) -> str:
+    """The loop FileService.extract_text_from_pdf used before PDFExtractor"""
+    text = ""
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages:
+            text += page.extract_text() or ""
+            text += "\n"
+    return text.strip()
+
+def make_pdf(pages: list) -> bytes:
+    """Minimal PDF with one Helvetica text stream per page"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        body = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(
+            "({}) '".format(line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)"))
+            for line in lines
+        ) + " ET"
+        content = body.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+def make_page(rng: random.Random, lines: int = 60) -> list:
+    return [" ".join(rng.choices(WORDS, k=12)) for _ in range(lines)]
+
+def timed(fn, files) -> tuple:
+    start = time.perf_counter()
+    chars = sum(len(fn(str(path))) for path in files)
+    return (time.perf_counter() - start) * 1000, chars
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=20, help="short (2-page) documents")
+    parser.add_argument("--long-docs", type=int, default=3)
+    parser.add_argument("--long-pages", type=int, default=200)
+    parser.add_argument("--max-pages", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        short, long = [], []
+        for i in range(args.docs):
+            path = Path(tmp) / f"short_{i}.pdf"
+            path.write_bytes(make_pdf([make_page(rng) for _ in range(2)]))
+            short.append(path)
+        for i in range(args.long_docs):
+            path = Path(tmp) / f"long_{i}.pdf"
+            path.write_bytes(make_pdf([make_page(rng) for _ in range(args.long_pages)]))
+            long.append(path)
+
+        print(f"{args.docs} x 2-page and {args.long_docs} x {args.long_pages}-page PDFs")
+        print(f"{'extractor':<32} {'short ms':>10} {'long ms':>10} {'long chars':>12}")
+
+        runs = [("pdfplumber loop (legacy)", legacy_extract)]
+        for backend in BACKENDS:
+            runs.append((f"{backend}", PDFExtractor(backend).extract))
+        parallel = PDFExtractor("auto", parallel_workers=args.workers, parallel_min_pages=32)
+        runs.append((f"auto, {args.workers} processes", parallel.extract))
+        runs.append((f"auto, first {args.max_pages} pages", PDFExtractor("auto", max_pages=args.max_pages).extract))
+
+        # Start the process pool before timing so spawn cost is not counted
+        parallel.extract(str(long[0]))
+
+        for name, fn in runs:
+            short_ms, _ = timed(fn, short)
+            long_ms, long_chars = timed(fn, long)
+            print(f"{name:<32} {short_ms:>10.1f} {long_ms:>10.1f} {long_chars:>12}")
+
+        parallel.shutdown()
+
+if __name__ == "__main__":
+    main()
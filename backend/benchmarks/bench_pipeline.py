@@ -0,0 +1,128 @@
+"""Per-stage throughput and latency percentiles of the matching pipeline.
+
+Stages: text extraction (docx, pdf), skill extraction, full NLP
+processing, embedding, single-pair scoring and batch ranking over a
+CandidateTable. Every stage runs in this process against the configured
+models, on a seeded synthetic corpus.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline --resumes 200 --jobs 20 --output run.json
+    python -m benchmarks.bench_pipeline --output new.json --compare run.json
+"""
+import argparse
+import tempfile
+from pathlib import Path
+from app.services.file_service import FileService
+from app.services.nlp_service import get_nlp_service
+from app.services.ml_service import get_ml_service
+from app.services.candidate_table import CandidateTable
+from benchmarks.corpus import CorpusGenerator, compare, environment, measure, to_file, write_report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--words", type=int, default=400, help="words per resume")
+    parser.add_argument("--files", type=int, default=30, help="documents per file type for extraction")
+    parser.add_argument("--rank-size", type=int, nargs="+", default=[1000, 10000],
+                        help="candidate pool sizes for batch ranking (resumes are repeated to fill them)")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(args.seed)
+    resume_texts = [generator.resume(args.words) for _ in range(args.resumes)]
+    job_texts = [generator.job() for _ in range(args.jobs)]
+    nlp_service = get_nlp_service()
+    ml_service = get_ml_service()
+    results = {}
+
+    # Extraction from each supported file type
+    with tempfile.TemporaryDirectory() as tmp:
+        for file_type in ("docx", "pdf"):
+            paths = []
+            for i, text in enumerate(resume_texts[:args.files]):
+                path = Path(tmp) / f"resume_{i}.{file_type}"
+                path.write_bytes(to_file(text, file_type))
+                paths.append(str(path))
+            results[f"extract_{file_type}"] = measure(
+                lambda path, file_type=file_type: FileService.extract_text(path, file_type), paths
+            )
+
+    results["skill_extraction"] = measure(nlp_service.extract_skills, resume_texts)
+    results["experience_extraction"] = measure(nlp_service.extract_experience_years, resume_texts)
+    results["nlp_process_document"] = measure(nlp_service.process_document, resume_texts[:50])
+
+    # Embedding: caching is bypassed by making every text unique to this run
+    unique = [f"{text}\nrun {id(results)}-{i}" for i, text in enumerate(resume_texts)]
+    results["embed_single"] = measure(lambda text: ml_service.embed_documents([text]), unique[:50])
+    batches = [unique[i:i + 16] for i in range(50, len(unique), 16)]
+    results["embed_batch_16"] = measure(ml_service.embed_documents, batches, items_per_call=16)
+
+    # Candidate records as the document store would return them
+    processed = nlp_service.process_documents(resume_texts, "resume")
+    embedded = ml_service.embed_documents(resume_texts)
+    resumes = [
+        {
+            'file_id': str(i),
+            'filename': f"resume_{i}.txt",
+            'skills': doc['skills'],
+            'experience_years': doc['experience_years'],
+            'embedding': vectors['embedding'],
+            'chunks': vectors['chunks']
+        }
+        for i, (doc, vectors) in enumerate(zip(processed, embedded))
+    ]
+    jobs = [
+        {**doc, 'text': text, **vectors}
+        for text, doc, vectors in zip(
+            job_texts, nlp_service.process_documents(job_texts, "job_description"), ml_service.embed_documents(job_texts)
+        )
+    ]
+
+    def score_pair(pair):
+        resume, job = pair
+        skills = ml_service.match_skills(job['skills'], resume['skills'])
+        semantic = float(ml_service.document_similarities(job, [resume])[0])
+        return ml_service.calculate_match_score(
+            semantic,
+            skills['match_percentage'] / 100,
+            resume['experience_years'][0] >= job['experience_years'][0],
+            True
+        )
+
+    pairs = [(resumes[i % len(resumes)], jobs[i % len(jobs)]) for i in range(200)]
+    results["score_single_pair"] = measure(score_pair, pairs)
+
+    for size in args.rank_size:
+        pool = [
+            {**resumes[i % len(resumes)], 'file_id': str(i)}
+            for i in range(size)
+        ]
+        table = CandidateTable.from_records(pool)
+        results[f"rank_{size}"] = measure(
+            lambda job: ml_service.rank_table(
+                table, None, job['embedding'], job['skills'], job['experience_years'][0],
+                args.top_k, job['chunks']
+            ),
+            jobs,
+            items_per_call=size
+        )
+
+    print(f"{'stage':<28} {'calls':>6} {'items/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, result in results.items():
+        if not result['calls']:
+            # e.g. embed_batch_16 when every resume went to embed_single
+            continue
+        print(f"{name:<28} {result['calls']:>6} {result['items_per_second']:>10.1f} "
+              f"{result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f} {result['p99_ms']:>9.3f}")
+
+    report = {'benchmark': "pipeline", 'args': vars(args), 'environment': environment(), 'results': results}
+    write_report(report, args.output)
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Recall@K, query latency and footprint of quantized search versus exact float search.
+
+Usage (from backend/):
+    python -m benchmarks.bench_quantized --size 200000 --k 10 --rerank 64 256 1024
+"""
+import argparse
+import tempfile
+import time
+import numpy as np
+from app.services.quantized_store import QuantizedVectorStore
+from benchmarks.bench_vector_index import make_corpus
+
+def exact_search(corpus: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    scores = corpus @ query
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank", type=int, nargs="+", default=[64, 256, 1024])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.size + args.queries, args.dim, 200, args.seed)
+    queries = corpus[args.size:]
+    corpus = np.ascontiguousarray(corpus[:args.size])
+    ids = [str(i) for i in range(args.size)]
+
+    start = time.perf_counter()
+    exact = [set(str(i) for i in exact_search(corpus, q, args.k)) for q in queries]
+    float_ms = (time.perf_counter() - start) / len(queries) * 1000
+    print(f"{args.size} x {args.dim}-dim vectors, recall@{args.k} against exact float search")
+    print(f"{'method':<24} {'scan B/vec':>10} {'recall':>8} {'ms/query':>10} {'speedup':>8}")
+    print(f"{'float32 exact':<24} {args.dim * 4:>10} {1.0:>8.3f} {float_ms:>10.3f} {1.0:>8.1f}")
+
+    for mode in QuantizedVectorStore.MODES:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = QuantizedVectorStore(tmp, mode)
+            store.add(ids, corpus)
+            scanned = store.nbytes_per_vector()['scanned']
+
+            for rerank in args.rerank:
+                # Warm the page cache so every method is measured from memory
+                store.search(queries[0], args.k, rerank=rerank)
+                start = time.perf_counter()
+                found = [store.search(q, args.k, rerank=rerank)[0] for q in queries]
+                ms = (time.perf_counter() - start) / len(queries) * 1000
+                recall = np.mean([len(exact[i] & set(f)) / args.k for i, f in enumerate(found)])
+                print(f"{mode + ', rerank ' + str(rerank):<24} {scanned:>10} {recall:>8.3f} "
+                      f"{ms:>10.3f} {float_ms / ms:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Ranking throughput of resumes sharded across processes versus one in-process table.
+
+Seeds the configured database with synthetic resumes (clustered random
+embeddings and taxonomy skills, so nothing is encoded), then sends
+ranking queries from concurrent callers to the in-process CandidateTable
+and to RankShards with each shard count, reporting queries/s and
+latency. Point DATABASE_URL at a scratch database first.
+
+Usage (from backend/):
+    DATABASE_URL=sqlite:////tmp/shards.db python -m benchmarks.bench_rank_shards --size 50000 --shards 2 4 8
+"""
+import argparse
+import asyncio
+import time
+import uuid
+import numpy as np
+from app.services.candidate_table import get_candidate_table
+from app.services.db_service import DatabaseService
+from app.services.document_store import document_store
+from app.services.ml_service import get_ml_service
+from app.services.rank_shards import RankShards
+from benchmarks.corpus import load_skills, summarize
+
+def seed(size: int, dim: int, chunks: int, rng: np.random.Generator, skills: list):
+    """Store `size` synthetic resumes (skipped if the database already holds them)"""
+    existing = document_store.count("resume")
+    topics = rng.normal(size=(50, dim)).astype(np.float32)
+    for i in range(existing, size):
+        vectors = topics[rng.integers(50)] + 0.6 * rng.normal(size=(chunks, dim)).astype(np.float32)
+        document_store.add(
+            str(uuid.uuid4()), f"resume_{i}.pdf", "resume",
+            {
+                'original_text': "",
+                'skills': list(rng.choice(skills, rng.integers(3, 20), replace=False)),
+                'experience_years': (int(rng.integers(0, 15)), 0)
+            },
+            vectors.mean(axis=0), vectors, get_ml_service().model_name
+        )
+
+async def drive(rank, queries: list, concurrency: int):
+    """Run every query once from `concurrency` concurrent callers"""
+    pending = list(queries)
+    latencies = []
+
+    async def caller():
+        while pending:
+            query = pending.pop()
+            start = time.perf_counter()
+            await rank(query)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start)
+
+async def main(args):
+    rng = np.random.default_rng(args.seed)
+    skills = load_skills()
+    DatabaseService.initialize()
+    print(f"seeding {args.size} resumes...")
+    seed(args.size, args.dim, args.chunks, rng, skills)
+
+    queries = []
+    for _ in range(args.queries):
+        chunks = rng.normal(size=(args.chunks, args.dim)).astype(np.float32)
+        queries.append((chunks.mean(axis=0), chunks, list(rng.choice(skills, 8, replace=False)), int(rng.integers(0, 8))))
+
+    ml_service = get_ml_service()
+    table = get_candidate_table(document_store, ml_service.similarity_mode == "max_sim", None, ml_service.model_name)
+
+    def rank_local(query):
+        embedding, chunks, job_skills, years = query
+        return asyncio.to_thread(ml_service.rank_table, table, None, embedding, job_skills, years, args.top_k, chunks)
+
+    results = {'in_process': await drive(rank_local, queries, args.concurrency)}
+
+    for shards in args.shards:
+        rank_shards = RankShards(shards)
+        await rank_shards.sync()
+
+        def rank_sharded(query, rank_shards=rank_shards):
+            embedding, chunks, job_skills, years = query
+            return rank_shards.rank(embedding, job_skills, years, args.top_k, chunks)
+
+        results[f"shards_{shards}"] = await drive(rank_sharded, queries, args.concurrency)
+        rank_shards.shutdown()
+
+    baseline = results['in_process']['items_per_second']
+    print(f"{'mode':<12} {'queries/s':>10} {'speedup':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, result in results.items():
+        print(f"{name:<12} {result['items_per_second']:>10.1f} {result['items_per_second'] / baseline:>7.2f}x "
+              f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=20000, help="resumes in the database")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--chunks", type=int, default=2, help="chunk embeddings per resume")
+    parser.add_argument("--shards", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
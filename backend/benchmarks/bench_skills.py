@@ -0,0 +1,80 @@
+"""Skill extraction: the original per-skill substring loop versus SkillMatcher.
+
+Usage (from backend/):
+    python -m benchmarks.bench_skills --skills 20000 --docs 200
+"""
+import argparse
+import json
+import random
+import re
+import time
+from app.core.config import get_settings
+from app.services.skill_matcher import SkillMatcher
+
+def legacy_extract_skills(text: str, skills: set) -> set:
+    """The substring scan NLPService.extract_skills used before SkillMatcher"""
+    cleaned_text = re.sub(r'\s+', ' ', text.lower())
+    cleaned_text = re.sub(r'[^\w\s\-\.]', ' ', cleaned_text).strip()
+    return {skill for skill in skills if skill in cleaned_text}
+
+def make_taxonomy(base: dict, size: int, rng: random.Random) -> dict:
+    """Pad the shipped taxonomy with synthetic one- to three-word skills"""
+    taxonomy = dict(base)
+    syllables = ["ka", "lo", "mi", "tr", "ex", "on", "ar", "zu", "pe", "vi", "qu", "sh"]
+    while len(taxonomy) < size:
+        words = ["".join(rng.choices(syllables, k=rng.randint(2, 4)))
+                 for _ in range(rng.randint(1, 3))]
+        taxonomy[" ".join(words)] = []
+    return taxonomy
+
+def make_document(taxonomy: dict, words: int, rng: random.Random) -> str:
+    filler = ("good team player interested in building reliable systems and going "
+              "the extra mile with stakeholders across the organisation").split()
+    skills = list(taxonomy)
+    tokens = []
+    while len(tokens) < words:
+        tokens.append(rng.choice(skills) if rng.random() < 0.05 else rng.choice(filler))
+    return " ".join(tokens)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--skills", type=int, default=20000)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--words", type=int, default=800)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with open(get_settings().SKILLS_TAXONOMY_PATH, encoding='utf-8') as f:
+        base = json.load(f)
+
+    for size in sorted({len(base), args.skills}):
+        taxonomy = make_taxonomy(base, size, rng)
+        docs = [make_document(taxonomy, args.words, rng) for _ in range(args.docs)]
+
+        start = time.perf_counter()
+        matcher = SkillMatcher(taxonomy)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        skills = set(taxonomy)
+        start = time.perf_counter()
+        legacy = [legacy_extract_skills(doc, skills) for doc in docs]
+        legacy_ms = (time.perf_counter() - start) / len(docs) * 1000
+
+        start = time.perf_counter()
+        found = [matcher.find(doc) for doc in docs]
+        trie_ms = (time.perf_counter() - start) / len(docs) * 1000
+
+        extra = sum(len(l - f) for l, f in zip(legacy, found)) / len(docs)
+        print(f"{size:>6d} skills: legacy {legacy_ms:8.3f} ms/doc, "
+              f"trie {trie_ms:6.3f} ms/doc ({legacy_ms / trie_ms:.1f}x), "
+              f"build {build_ms:.1f} ms, legacy-only hits/doc {extra:.1f}")
+
+    print("\nsubstring false positives removed:")
+    matcher = SkillMatcher(base)
+    for text in ["A good communicator", "Javanese cuisine", "Expressed ideas clearly"]:
+        print(f"  {text!r}: legacy={sorted(legacy_extract_skills(text, set(base)))} "
+              f"trie={sorted(matcher.find(text))}")
+
+if __name__ == "__main__":
+    main()
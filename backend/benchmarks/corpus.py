@@ -0,0 +1,164 @@
+"""Synthetic resumes and job descriptions, and the timing helpers shared by the suite.
+
+Documents draw skills from the shipped taxonomy and carry experience
+mentions, so skill extraction, experience parsing and ranking all have
+real work to do. Everything is seeded, so two runs with the same
+arguments see the same corpus.
+"""
+import io
+import json
+import platform
+import random
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+import numpy as np
+from docx import Document
+from app.core.config import get_settings
+from benchmarks.bench_pdf import make_pdf
+
+FILLER = ("led team delivered platform services reliability customers migrated latency "
+          "pipelines analytics designed built scaled mentored reviewed owned improved "
+          "stakeholders roadmap production incidents on-call automation").split()
+
+TITLES = ["Software Engineer", "Data Scientist", "Backend Developer", "DevOps Engineer",
+          "Machine Learning Engineer", "Frontend Developer", "Platform Engineer"]
+
+def load_skills() -> List[str]:
+    with open(get_settings().SKILLS_TAXONOMY_PATH, encoding='utf-8') as f:
+        return sorted(json.load(f))
+
+class CorpusGenerator:
+    """Seeded generator of resume and job description texts and files"""
+
+    def __init__(self, seed: int = 0, skills: Optional[List[str]] = None):
+        self.rng = random.Random(seed)
+        self.skills = skills or load_skills()
+
+    def _sentence(self, skills: List[str]) -> str:
+        words = self.rng.choices(FILLER, k=self.rng.randint(8, 16))
+        for skill in skills:
+            words.insert(self.rng.randrange(len(words) + 1), skill)
+        return " ".join(words).capitalize() + "."
+
+    def resume(self, words: int = 400) -> str:
+        """Resume text of roughly `words` words"""
+        skills = self.rng.sample(self.skills, min(len(self.skills), self.rng.randint(5, 20)))
+        start = self.rng.randint(2005, 2019)
+        lines = [
+            f"{self.rng.choice(TITLES)}",
+            f"Summary: {self.rng.randint(1, 15)} years of experience building software.",
+            f"Skills: {', '.join(skills)}",
+            f"Experience: {self.rng.choice(TITLES)}, Acme Corp, {start} - {start + self.rng.randint(1, 5)}"
+        ]
+        count = sum(len(line.split()) for line in lines)
+        while count < words:
+            sentence = self._sentence(self.rng.sample(skills, self.rng.randint(0, 2)))
+            lines.append(sentence)
+            count += len(sentence.split())
+        return "\n".join(lines)
+
+    def job(self, words: int = 250) -> str:
+        """Job description text of roughly `words` words"""
+        skills = self.rng.sample(self.skills, min(len(self.skills), self.rng.randint(4, 10)))
+        years = self.rng.randint(1, 8)
+        lines = [
+            f"We are hiring a {self.rng.choice(TITLES)}.",
+            f"Requirements: {years}+ years of experience with {', '.join(skills[:3])}.",
+            f"Nice to have: {', '.join(skills[3:])}."
+        ]
+        count = sum(len(line.split()) for line in lines)
+        while count < words:
+            sentence = self._sentence(self.rng.sample(skills, self.rng.randint(0, 1)))
+            lines.append(sentence)
+            count += len(sentence.split())
+        return "\n".join(lines)
+
+def to_file(text: str, file_type: str) -> bytes:
+    """Render text as an uploadable docx or pdf file"""
+    if file_type == "docx":
+        document = Document()
+        for line in text.split("\n"):
+            document.add_paragraph(line)
+        buffer = io.BytesIO()
+        document.save(buffer)
+        return buffer.getvalue()
+    if file_type == "pdf":
+        # Wrap to ~90 characters per line and 60 lines per page
+        lines = []
+        for paragraph in text.split("\n"):
+            words = paragraph.encode('latin-1', 'replace').decode('latin-1').split()
+            line = []
+            for word in words:
+                if sum(len(w) + 1 for w in line) + len(word) > 90:
+                    lines.append(" ".join(line))
+                    line = []
+                line.append(word)
+            lines.append(" ".join(line))
+        return make_pdf([lines[i:i + 60] for i in range(0, len(lines), 60)] or [[""]])
+    raise ValueError(f"Unknown file type: {file_type}")
+
+def summarize(latencies: Iterable[float], elapsed: Optional[float] = None, items: Optional[int] = None) -> Dict:
+    """Count, throughput and latency percentiles (ms) of a list of per-call seconds"""
+    latencies = np.asarray(list(latencies), dtype=np.float64)
+    if elapsed is None:
+        elapsed = float(latencies.sum())
+    items = len(latencies) if items is None else items
+    if not len(latencies):
+        return {'calls': 0}
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        'calls': int(len(latencies)),
+        'items': int(items),
+        'seconds': round(elapsed, 4),
+        'items_per_second': round(items / elapsed, 2) if elapsed else None,
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'mean_ms': round(float(latencies.mean()) * 1000, 3)
+    }
+
+def measure(fn: Callable, inputs: List, items_per_call: int = 1, warmup: int = 1) -> Dict:
+    """Call fn on each input (after `warmup` untimed calls) and summarize"""
+    for value in inputs[:warmup]:
+        fn(value)
+    latencies = []
+    start = time.perf_counter()
+    for value in inputs:
+        call_start = time.perf_counter()
+        fn(value)
+        latencies.append(time.perf_counter() - call_start)
+    return summarize(latencies, time.perf_counter() - start, len(inputs) * items_per_call)
+
+def environment() -> Dict:
+    """What a result file was measured on, so runs can be compared fairly"""
+    settings = get_settings()
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'numpy': np.__version__,
+        'sbert_model': settings.SBERT_MODEL,
+        'embedding_backend': settings.EMBEDDING_BACKEND,
+        'spacy_model': settings.SPACY_MODEL,
+        'similarity_mode': settings.SIMILARITY_MODE,
+        'worker_pool': f"{settings.WORKER_POOL_KIND} x {settings.WORKER_POOL_SIZE}"
+    }
+
+def write_report(report: Dict, path: Optional[str]):
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {path}")
+
+def compare(report: Dict, baseline_path: str, metric: str = 'p50_ms'):
+    """Print each stage's metric next to a baseline report's"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\n{'stage':<28} {'baseline':>10} {'current':>10} {'change':>8}  ({metric})")
+    for name, result in report['results'].items():
+        before = baseline.get('results', {}).get(name, {}).get(metric)
+        after = result.get(metric)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{name:<28} {before:>10.3f} {after:>10.3f} {change:>+7.1f}%")
@@ -0,0 +1,154 @@
+"""In-process load generator for the HTTP API.
+
+Drives the FastAPI app through httpx's ASGI transport (no sockets, no
+server process), so results measure the application itself: routing,
+validation, the worker pool, the stores and the models. Documents are
+seeded by uploading synthetic docx/pdf files, which is also reported as
+its own scenario. Each scenario then sends a fixed number of requests
+from `--concurrency` concurrent clients and reports RPS, latency
+percentiles and errors.
+
+Repeated analyze pairs are served by the match cache after their first
+request; use --pairs to control how many distinct pairs are cycled.
+
+Point DATABASE_URL, UPLOAD_DIR and friends at scratch locations first:
+the run writes real documents and matches.
+
+Usage (from backend/):
+    DATABASE_URL=sqlite:////tmp/load.db python -m benchmarks.load_test --concurrency 16 --output load.json
+    python -m benchmarks.load_test --scenarios rank --requests 500 --compare load.json
+"""
+import argparse
+import asyncio
+import itertools
+import time
+from typing import Callable, Dict, List
+import httpx
+from app.core.config import get_settings
+from app.main import app
+from benchmarks.corpus import CorpusGenerator, compare, environment, summarize, to_file, write_report
+
+SCENARIOS = ("analyze", "rank", "health")
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    make_request: Callable[[int], Dict],
+    requests: int,
+    concurrency: int
+) -> Dict:
+    """Send `requests` requests from `concurrency` clients; make_request(i) gives method, url and kwargs"""
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+
+    async def client_loop():
+        while (i := next(counter)) < requests:
+            request = make_request(i)
+            start = time.perf_counter()
+            try:
+                response = await client.request(request['method'], request['url'], **request.get('kwargs', {}))
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            if not status.startswith("2"):
+                errors[status] = errors.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    result = summarize(latencies, time.perf_counter() - start)
+    result['errors'] = errors
+    return result
+
+async def seed(client: httpx.AsyncClient, generator: CorpusGenerator, args, results: Dict):
+    """Upload the synthetic corpus; returns (resume ids, job ids)"""
+    prefix = get_settings().API_PREFIX
+    uploads = [("resume", generator.resume(args.words)) for _ in range(args.resumes)]
+    uploads += [("job", generator.job()) for _ in range(args.jobs)]
+    files = [
+        (kind, f"{kind}_{i}.{args.file_type}", to_file(text, args.file_type))
+        for i, (kind, text) in enumerate(uploads)
+    ]
+    ids = {"resume": [], "job": []}
+
+    def upload(i):
+        kind, filename, content = files[i]
+        return {
+            'method': "POST",
+            'url': f"{prefix}/upload/{kind}",
+            'kwargs': {'files': {'file': (filename, content)}}
+        }
+
+    # Upload sequentially first so the ids are known, timing each request
+    latencies = []
+    errors: Dict[str, int] = {}
+    start = time.perf_counter()
+    for i, (kind, _, _) in enumerate(files):
+        request = upload(i)
+        call_start = time.perf_counter()
+        response = await client.request(request['method'], request['url'], **request['kwargs'])
+        latencies.append(time.perf_counter() - call_start)
+        if response.status_code != 200:
+            errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+            continue
+        ids[kind].append(response.json()['file_id'])
+    results["upload"] = {**summarize(latencies, time.perf_counter() - start), 'errors': errors}
+
+    if not ids["resume"] or not ids["job"]:
+        raise RuntimeError(f"Seeding failed: {errors}")
+    return ids["resume"], ids["job"]
+
+async def main(args):
+    prefix = get_settings().API_PREFIX
+    generator = CorpusGenerator(args.seed)
+    results = {}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as client:
+            resume_ids, job_ids = await seed(client, generator, args, results)
+            pairs = [(r, j) for j in job_ids for r in resume_ids][:args.pairs]
+
+            requests = {
+                'analyze': lambda i: {
+                    'method': "POST",
+                    'url': f"{prefix}/match/analyze",
+                    'kwargs': {'json': {'resume_id': pairs[i % len(pairs)][0], 'job_id': pairs[i % len(pairs)][1]}}
+                },
+                'rank': lambda i: {
+                    'method': "POST",
+                    'url': f"{prefix}/match/rank",
+                    'kwargs': {'json': {'job_id': job_ids[i % len(job_ids)], 'top_k': args.top_k}}
+                },
+                'health': lambda i: {'method': "GET", 'url': "/health"}
+            }
+            for name in args.scenarios:
+                # Untimed warm-up so model loading is not billed to the first scenario
+                await run_scenario(client, requests[name], args.concurrency, args.concurrency)
+                results[name] = await run_scenario(client, requests[name], args.requests, args.concurrency)
+
+    print(f"{'scenario':<28} {'requests':>8} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, result in results.items():
+        print(f"{name:<28} {result['calls']:>8} {result['items_per_second']:>9.1f} {result['p50_ms']:>9.3f} "
+              f"{result['p95_ms']:>9.3f} {result['p99_ms']:>9.3f} {sum(result['errors'].values()):>7}")
+
+    report = {'benchmark': "load_test", 'args': vars(args), 'environment': environment(), 'results': results}
+    write_report(report, args.output)
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=50, help="resumes to upload before the scenarios")
+    parser.add_argument("--jobs", type=int, default=5, help="job descriptions to upload")
+    parser.add_argument("--words", type=int, default=400, help="words per resume")
+    parser.add_argument("--file-type", choices=("docx", "pdf"), default="docx")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--pairs", type=int, default=1000, help="distinct resume/job pairs cycled by analyze")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    asyncio.run(main(parser.parse_args()))
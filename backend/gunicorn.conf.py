@@ -0,0 +1,28 @@
+# Preload-then-fork deployment:
+#   gunicorn app.main:app -c gunicorn.conf.py
+# The master imports the app and loads the spaCy and sentence-transformer
+# models once; forked workers share those pages copy-on-write instead of
+# each loading their own copy.
+import os
+import shutil
+import tempfile
+
+os.environ.setdefault("MODEL_LOADING", "preload")
+# Tokenizer thread pools do not survive fork
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+# Workers publish metrics snapshots here, so /metrics reports all of them
+os.environ.setdefault(
+    "METRICS_MULTIPROCESS_DIR", os.path.join(tempfile.gettempdir(), f"resume-matcher-metrics-{os.getpid()}")
+)
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+# One worker by default: each worker keeps in-memory indexes of its own,
+# which only catch up with other workers' uploads from the database when
+# they are next queried.
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 120
+
+def on_exit(server):
+    shutil.rmtree(os.environ["METRICS_MULTIPROCESS_DIR"], ignore_errors=True)
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+from app.services.candidate_table import CandidateTable, SkillVocabulary
+
+def resume(file_id, skills, years=0):
+    return {'file_id': file_id, 'filename': f"{file_id}.pdf", 'skills': skills, 'experience_years': (years, years)}
+
+@pytest.fixture
+def vocabulary():
+    return SkillVocabulary()
+
+def test_encode_decode_round_trip(vocabulary):
+    skills = [f"skill{i}" for i in range(150)]
+    bits = vocabulary.encode(skills)
+    assert bits.shape == (3,)
+    assert vocabulary.decode(bits) == skills
+
+def test_skill_counts_and_split(vocabulary):
+    table = CandidateTable.from_records([
+        resume("a", ["Python", "Docker"]),
+        resume("b", ["python"]),
+        resume("c", [])
+    ], vocabulary)
+    job_bits = table.skill_bits_for(["python", "docker", "go"])
+    assert table.skill_counts(table.select(), job_bits).tolist() == [2, 1, 0]
+    assert table.skill_split(0, job_bits) == (["python", "docker"], ["go"])
+
+def test_skill_counts_after_table_widens(vocabulary):
+    table = CandidateTable.from_records([resume("a", ["python"])], vocabulary)
+    job_bits = table.skill_bits_for(["python"])
+    assert len(job_bits) == 1
+
+    # A concurrent sync adds resumes whose skills need more blocks
+    filler = [f"skill{i}" for i in range(130)]
+    table.add([resume("b", filler), resume("c", ["python", *filler])])
+    assert table.skill_bits.shape[1] == 3
+
+    rows = table.select()
+    assert table.skill_counts(rows, job_bits).tolist() == [1, 0, 1]
+    assert table.skill_split(int(rows[1]), job_bits) == ([], ["python"])
+
+def test_narrow_job_bits_do_not_match_other_blocks(vocabulary):
+    table = CandidateTable.from_records([resume("a", ["python"])], vocabulary)
+    job_bits = table.skill_bits_for(["python"])
+    # Skill id 64 is bit 0 of the second block, the same bit as "python" in the first
+    table.add([resume("b", [f"skill{i}" for i in range(64)])])
+    assert table.skill_counts(table.rows_for(["b"]), job_bits).tolist() == [0]
+
+def test_select_filters(vocabulary):
+    table = CandidateTable.from_records([
+        resume("a", ["python", "sql"], years=5),
+        resume("b", ["python"], years=1),
+        resume("c", ["sql"], years=8)
+    ], vocabulary)
+    ids = lambda rows: [table.ids[row] for row in rows]
+    assert ids(table.select(must_have_skills=["python"])) == ["a", "b"]
+    assert ids(table.select(min_experience_years=3, must_have_skills=["sql"])) == ["a", "c"]
+    assert ids(table.select(file_ids=["c", "b"])) == ["b", "c"]
+    assert len(table.select(must_have_skills=["cobol"])) == 0
+
+    table.remove(["a"])
+    assert ids(table.select(must_have_skills=["python"])) == ["b"]
+
+class FakeStore:
+    """resume_signature/list_resumes over a dict, with exclusive uploaded_after like DocumentStore"""
+
+    def __init__(self):
+        self.resumes = {}
+
+    def put(self, file_id, skills, uploaded_at):
+        self.resumes[file_id] = {**resume(file_id, skills), 'uploaded_at': uploaded_at}
+
+    def resume_signature(self, embedding_model=None, shard=None):
+        times = [record['uploaded_at'] for record in self.resumes.values()]
+        return len(times), max(times, default=None)
+
+    def list_resumes(self, uploaded_after=None, **kwargs):
+        return [
+            record for record in self.resumes.values()
+            if uploaded_after is None or record['uploaded_at'] > uploaded_after
+        ]
+
+def test_sync_adds_only_new_uploads(vocabulary):
+    store = FakeStore()
+    store.put("a", ["python"], 1)
+    table = CandidateTable(vocabulary).sync(store, with_chunks=False)
+    for i, timestamp in enumerate(range(2, 12)):
+        store.put(f"n{i}", ["sql"], timestamp)
+        table = table.sync(store, with_chunks=False)
+    assert len(table) == 11
+    assert table.dead_rows == 0
+
+def test_sync_compacts_replaced_rows(vocabulary):
+    store = FakeStore()
+    for i in range(4):
+        store.put(f"r{i}", ["python"], i)
+    table = CandidateTable(vocabulary).sync(store, with_chunks=False)
+
+    # Re-uploads replace rows in place, leaving the old ones dead
+    store.put("r0", ["go"], 10)
+    table = table.sync(store, with_chunks=False)
+    assert table.dead_rows == 1
+    store.put("r1", ["go"], 11)
+    compacted = table.sync(store, with_chunks=False)
+
+    assert compacted is not table
+    assert compacted.dead_rows == 0
+    assert sorted(compacted.ids) == ["r0", "r1", "r2", "r3"]
+    job_bits = compacted.skill_bits_for(["go"])
+    assert compacted.skill_counts(compacted.rows_for(["r0", "r1", "r2"]), job_bits).tolist() == [1, 1, 0]
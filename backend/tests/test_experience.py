@@ -0,0 +1,30 @@
+from datetime import date
+import json
+import random
+import pytest
+from app.services.text_patterns import ExperienceExtractor, clean_text
+from benchmarks.bench_experience import FIXTURES, legacy_clean_text, make_document
+
+with open(FIXTURES, encoding='utf-8') as f:
+    fixtures = json.load(f)
+
+@pytest.fixture(scope="module")
+def extractor():
+    return ExperienceExtractor(date.fromisoformat(fixtures['today']))
+
+@pytest.mark.parametrize("case", fixtures['cases'], ids=[case['note'] for case in fixtures['cases']])
+def test_experience_fixtures(extractor, case):
+    assert list(extractor.years(case['text'])) == case['expected']
+
+def test_span_kinds(extractor):
+    spans = extractor.spans("3+ yrs of Go, 5-7 years of Java, Mar 2019 - present at Acme")
+    assert [span['kind'] for span in spans] == ["years", "range", "dates"]
+    assert spans[0]['plus']
+    assert (spans[1]['min'], spans[1]['max']) == (5, 7)
+
+def test_clean_text_matches_original():
+    rng = random.Random(0)
+    documents = [make_document(300, rng) for _ in range(20)]
+    documents += ["", "  Tabs\tand\nnewlines  ", "C++ / C# (Azure), e-mail: x@y.com; 3.5 yrs!"]
+    for document in documents:
+        assert clean_text(document) == legacy_clean_text(document)
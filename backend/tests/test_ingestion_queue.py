@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta
+import pytest
+from app.services.ingestion_queue import IngestionQueue
+
+@pytest.fixture
+def queue(tmp_path):
+    return IngestionQueue(str(tmp_path / "queue.db"), lease_seconds=60)
+
+def enqueue(queue, name="a", **kwargs):
+    return queue.enqueue(f"id-{name}", f"{name}.pdf", f"/uploads/{name}.pdf", "pdf", "resume", **kwargs)
+
+def expire(queue, job_id):
+    """Age a job's heartbeat past the lease, as if its worker had died"""
+    stale = (datetime.utcnow() - timedelta(seconds=2 * queue.lease_seconds)).isoformat()
+    queue._conn.execute("UPDATE ingestion_jobs SET heartbeat_at = ? WHERE id = ?", (stale, job_id))
+
+@pytest.fixture
+def as_other_worker(monkeypatch):
+    """Run the following calls as another process sharing the queue"""
+    return lambda: monkeypatch.setattr(IngestionQueue, "owner", staticmethod(lambda: "elsewhere:1"))
+
+def test_stages_in_order(queue):
+    job_id = enqueue(queue)
+    for stage in IngestionQueue.STAGES:
+        job = queue.claim(stage)
+        assert job['id'] == job_id
+        assert job['status'] == "running"
+        assert job['owner'] == IngestionQueue.owner()
+        assert queue.advance(job_id, {**job['payload'], stage: True})
+        assert queue.claim(stage) is None
+
+    job = queue.get(job_id)
+    assert (job['stage'], job['status']) == ("done", "completed")
+    assert job['payload'] == {stage: True for stage in IngestionQueue.STAGES}
+
+def test_claim_takes_oldest_once(queue):
+    first, second = enqueue(queue, "a"), enqueue(queue, "b")
+    assert queue.claim("extract")['id'] == first
+    assert queue.claim("extract")['id'] == second
+    assert queue.claim("extract") is None
+
+def test_enqueue_skipping_ahead(queue):
+    job_id = enqueue(queue, stage="embed", payload={'text': "cached"})
+    assert queue.claim("extract") is None
+    assert queue.claim("embed")['payload'] == {'text': "cached"}
+    assert queue.get(job_id)['stage'] == "embed"
+
+def test_live_lease_is_not_taken_over(queue, as_other_worker):
+    job_id = enqueue(queue)
+    queue.claim("extract")
+    as_other_worker()
+    assert queue.claim("extract") is None
+    assert queue.recover() == 0
+    assert queue.heartbeat([job_id]) == 0
+    assert not queue.advance(job_id, {})
+    assert queue.get(job_id)['stage'] == "extract"
+
+def test_expired_lease_is_taken_over(queue, as_other_worker):
+    job_id = enqueue(queue)
+    queue.claim("extract")
+    expire(queue, job_id)
+    owner = IngestionQueue.owner()
+
+    as_other_worker()
+    job = queue.claim("extract")
+    assert job['id'] == job_id
+    assert job['owner'] == "elsewhere:1" != owner
+    assert queue.advance(job_id, {'text': "x"})
+    assert queue.get(job_id)['stage'] == "nlp"
+
+def test_heartbeat_keeps_lease(queue):
+    job_id = enqueue(queue)
+    queue.claim("extract")
+    expire(queue, job_id)
+    assert queue.heartbeat([job_id, "missing"]) == 1
+    assert queue.recover() == 0
+
+def test_recover_requeues_only_expired(queue):
+    live, dead = enqueue(queue, "a"), enqueue(queue, "b")
+    queue.claim("extract")
+    queue.claim("extract")
+    expire(queue, dead)
+
+    assert queue.recover() == 1
+    assert queue.get(live)['status'] == "running"
+    job = queue.get(dead)
+    assert (job['status'], job['owner']) == ("queued", None)
+    assert queue.claim("extract")['id'] == dead
+
+def test_fail_retries_with_backoff_then_gives_up(queue):
+    job_id = enqueue(queue)
+    queue.claim("extract")
+    assert queue.fail(job_id, "boom", max_attempts=2, backoff_seconds=0)
+    job = queue.get(job_id)
+    assert (job['status'], job['attempts'], job['error']) == ("queued", 1, "boom")
+
+    queue.claim("extract")
+    assert not queue.fail(job_id, "boom again", max_attempts=2)
+    assert queue.get(job_id)['status'] == "failed"
+
+    later = enqueue(queue, "b")
+    queue.claim("extract")
+    queue.fail(later, "slow", max_attempts=3, backoff_seconds=60)
+    assert queue.claim("extract") is None
+
+def test_fail_after_takeover_is_ignored(queue, as_other_worker):
+    job_id = enqueue(queue)
+    queue.claim("extract")
+    as_other_worker()
+    assert not queue.fail(job_id, "not mine", max_attempts=1)
+    assert queue.get(job_id)['attempts'] == 0
+
+def test_release_does_not_count_an_attempt(queue):
+    job_id = enqueue(queue)
+    queue.claim("extract")
+    queue.release(job_id)
+    job = queue.get(job_id)
+    assert (job['status'], job['attempts']) == ("queued", 0)
+    assert queue.claim("extract")['id'] == job_id
+
+def test_counts(queue):
+    enqueue(queue, "a")
+    enqueue(queue, "b")
+    queue.claim("extract")
+    assert sorted((row['stage'], row['status'], row['jobs']) for row in queue.counts()) == [
+        ("extract", "queued", 1), ("extract", "running", 1)
+    ]
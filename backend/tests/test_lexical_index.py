@@ -0,0 +1,165 @@
+import math
+import numpy as np
+import pytest
+from app.services.lexical_index import TAIL_SIZE, LexicalIndex, Postings
+from app.services.skill_matcher import SkillMatcher
+
+def doc(file_id, text, skills=()):
+    return {'file_id': file_id, 'tokens': text.split(), 'skills': list(skills)}
+
+def test_postings_round_trip_across_settles():
+    rng = np.random.default_rng(0)
+    # Gaps of every width, so settled blocks need uint8, uint16 and uint32
+    gaps = np.concatenate((rng.integers(1, 200, 100), [70000], rng.integers(1, 2000, 100)))
+    docs = np.cumsum(gaps)
+    tfs = rng.integers(1, 50, len(docs))
+
+    postings = Postings()
+    for i, (d, tf) in enumerate(zip(docs, tfs), 1):
+        postings.append(int(d), int(tf))
+        assert len(postings) == i
+        decoded_docs, decoded_tfs = postings.decode()
+        assert decoded_docs.tolist() == docs[:i].tolist()
+        assert decoded_tfs.tolist() == tfs[:i].tolist()
+
+    assert len(postings.tail_docs) == len(docs) % TAIL_SIZE
+    assert postings.gaps.dtype == np.uint32
+
+def test_postings_narrow_gaps_and_clamped_tf():
+    postings = Postings()
+    for d in range(TAIL_SIZE):
+        postings.append(d * 3, 100000 if d == 5 else 1)
+    assert postings.gaps.dtype == np.uint8
+    assert postings.decode()[1][5] == np.iinfo(np.uint16).max
+
+def reference_bm25(docs, query, k1=1.2, b=0.75):
+    """Textbook BM25 over token lists, for the same idf as LexicalIndex"""
+    n = len(docs)
+    average = sum(len(tokens) for tokens in docs.values()) / n
+    scores = {}
+    for file_id, tokens in docs.items():
+        score = 0.0
+        for term in query:
+            tf = tokens.count(term)
+            if not tf:
+                continue
+            df = sum(term in other for other in docs.values())
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens) / average))
+        if score:
+            scores[file_id] = score
+    best = max(scores.values())
+    return {file_id: score / best for file_id, score in scores.items()}
+
+@pytest.fixture
+def corpus():
+    return [
+        doc("a", "python django python postgres"),
+        doc("b", "python"),
+        doc("c", "java spring postgres docker kubernetes cloud"),
+        doc("d", "python docker docker"),
+        doc("e", "go kubernetes")
+    ]
+
+def test_bm25_matches_reference(corpus):
+    index = LexicalIndex()
+    index.add(corpus)
+    tokens = {record['file_id']: record['tokens'] for record in corpus}
+
+    for query in (["python"], ["docker", "postgres"], ["python", "kubernetes"]):
+        scores = index.search(keywords=query)
+        expected = reference_bm25(tokens, query)
+        assert scores.keys() == expected.keys()
+        for file_id, score in expected.items():
+            assert scores[file_id] == pytest.approx(score)
+
+def test_bm25_ordering():
+    index = LexicalIndex()
+    index.add([
+        doc("more", "python python sql sql"),
+        doc("fewer", "python sql sql sql"),
+        doc("shorter", "python sql"),
+        doc("none", "java sql")
+    ])
+    scores = index.search(keywords=["python"])
+    # More occurrences win at equal length; at equal frequency the shorter document wins
+    assert scores["more"] > scores["fewer"]
+    assert scores["shorter"] > scores["fewer"]
+    assert "none" not in scores
+    assert max(scores.values()) == 1.0
+
+def test_required_terms_intersect(corpus):
+    index = LexicalIndex()
+    index.add(corpus)
+    assert set(index.search(required=["docker", "python"])) == {"d"}
+    assert set(index.search(required=["postgres"], keywords=["python"])) == {"a", "c"}
+    assert index.search(required=["cobol"]) == {}
+    assert set(index.search(required=["python"], limit=2)) == {"a", "b"}
+
+def test_remove_and_replace(corpus):
+    index = LexicalIndex()
+    index.add(corpus)
+    index.remove(["a"])
+    assert "a" not in index.search(keywords=["python"])
+    assert index._df["python"] == 2
+
+    index.add([doc("b", "rust")])
+    assert set(index.search(keywords=["python"])) == {"d"}
+    assert set(index.search(keywords=["rust"])) == {"b"}
+    assert index.dead_docs == 2
+
+def test_skill_phrases_and_synonyms():
+    matcher = SkillMatcher({"kubernetes": ["k8s"], "machine learning": []})
+    index = LexicalIndex(skill_matcher=matcher)
+    index.add([
+        doc("a", "built machine learning models", skills=["machine learning"]),
+        doc("b", "learning kubernetes on a machine", skills=["kubernetes"])
+    ])
+    assert set(index.search(required=["Machine  Learning"])) == {"a"}
+    assert set(index.search(required=["k8s"])) == {"b"}
+
+class FakeStore:
+    """resume_signature/list_resumes over a dict, with exclusive uploaded_after like DocumentStore"""
+
+    def __init__(self):
+        self.resumes = {}
+
+    def put(self, record, uploaded_at):
+        self.resumes[record['file_id']] = {**record, 'uploaded_at': uploaded_at}
+
+    def resume_signature(self):
+        times = [record['uploaded_at'] for record in self.resumes.values()]
+        return len(times), max(times, default=None)
+
+    def list_resumes(self, uploaded_after=None, **kwargs):
+        return [
+            record for record in self.resumes.values()
+            if uploaded_after is None or record['uploaded_at'] > uploaded_after
+        ]
+
+def test_sync_indexes_only_new_uploads():
+    store = FakeStore()
+    store.put(doc("a", "python"), 1)
+    index = LexicalIndex().sync(store)
+    for timestamp in range(2, 12):
+        store.put(doc(f"n{timestamp}", "sql"), timestamp)
+        index = index.sync(store)
+    assert len(index) == 11
+    assert index.dead_docs == 0
+
+def test_sync_rebuilds_once_dead_documents_pile_up():
+    store = FakeStore()
+    for i in range(4):
+        store.put(doc(f"r{i}", "python"), i)
+    index = LexicalIndex().sync(store)
+
+    store.put(doc("r0", "go"), 10)
+    index = index.sync(store)
+    assert index.dead_docs == 1
+    store.put(doc("r1", "go"), 11)
+    rebuilt = index.sync(store)
+
+    assert rebuilt is not index
+    assert rebuilt.dead_docs == 0
+    assert set(rebuilt.search(keywords=["go"])) == {"r0", "r1"}
+    assert set(rebuilt.search(keywords=["python"])) == {"r2", "r3"}
@@ -0,0 +1,77 @@
+import pytest
+from app.services.match_cache import MatchCache
+
+RESUME = {'text': "Python developer,  five years", 'skills': ["Python", "SQL"], 'experience_years': (5, 5)}
+JOB = {'text': "Need a Python developer", 'skills': ["python"], 'experience_years': (3, 0)}
+
+def cache(**kwargs):
+    return MatchCache(**{'model_name': "model-a", 'scoring_version': "v1", **kwargs})
+
+class FakeStore:
+    """find_match over saved rows, like DocumentStore with cache_key columns"""
+
+    def __init__(self, rows=(), error=None):
+        self.rows = {(row['job_id'], row['resume_id'], row['cache_key']): row for row in rows}
+        self.error = error
+
+    def find_match(self, job_id, resume_id, cache_key):
+        if self.error is not None:
+            raise self.error
+        return self.rows.get((job_id, resume_id, cache_key))
+
+def test_key_ignores_formatting_only_changes():
+    reformatted = {**RESUME, 'text': " Python  developer, five\nyears ", 'skills': ["sql", "python"]}
+    assert cache().key(RESUME, JOB) == cache().key(reformatted, JOB)
+
+@pytest.mark.parametrize("resume, job", [
+    ({**RESUME, 'text': "Java developer, five years"}, JOB),
+    ({**RESUME, 'skills': ["Python"]}, JOB),
+    ({**RESUME, 'experience_years': (6, 6)}, JOB),
+    (RESUME, {**JOB, 'text': "Need a Go developer"}),
+    (RESUME, {**JOB, 'experience_years': (4, 0)})
+])
+def test_content_change_invalidates(resume, job):
+    assert cache().key(resume, job) != cache().key(RESUME, JOB)
+
+@pytest.mark.parametrize("changed", [{'model_name': "model-b"}, {'scoring_version': "v2"}])
+def test_model_or_scoring_change_invalidates(changed):
+    old = cache()
+    key = old.key(RESUME, JOB)
+    old.put(key, {'match_score': 50.0})
+
+    new = cache(**changed)
+    assert new.key(RESUME, JOB) != key
+    assert new.get(new.key(RESUME, JOB), "job", "resume") is None
+
+def test_memory_hit_and_ttl():
+    fresh, expired = cache(), cache(ttl=-1)
+    for tier in (fresh, expired):
+        tier.put("k", {'match_score': 50.0})
+    assert fresh.get("k", "job", "resume") == {'match_score': 50.0}
+    assert expired.get("k", "job", "resume") is None
+    assert fresh.stats()['memory_hits'] == 1
+    assert expired.stats()['misses'] == 1
+
+def test_lru_eviction():
+    lru = cache(max_items=2)
+    lru.put("a", {})
+    lru.put("b", {})
+    lru.get("a", "job", "resume")
+    lru.put("c", {})
+    assert lru.get("b", "job", "resume") is None
+    assert lru.get("a", "job", "resume") == {}
+    assert lru.stats()['memory_items'] == 2
+
+def test_persistent_tier_only_serves_matching_key():
+    tier = cache(store=FakeStore([{'job_id': "job", 'resume_id': "resume", 'cache_key': "old", 'match_score': 40.0}]))
+    assert tier.get("new", "job", "resume") is None
+    assert tier.get("old", "job", "resume")['match_score'] == 40.0
+    # Promoted into memory
+    tier.store = None
+    assert tier.get("old", "job", "resume")['match_score'] == 40.0
+    assert tier.stats()['persistent_hits'] == 1
+
+def test_store_error_is_a_miss():
+    tier = cache(store=FakeStore(error=RuntimeError("database is locked")))
+    assert tier.get("k", "job", "resume") is None
+    assert tier.stats()['misses'] == 1
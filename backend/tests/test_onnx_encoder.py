@@ -0,0 +1,109 @@
+import json
+from types import SimpleNamespace
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+tokenizers = pytest.importorskip("tokenizers")
+
+from app.services import onnx_encoder
+from app.services.onnx_encoder import OnnxEncoder
+
+VOCAB = {"[PAD]": 0, "[UNK]": 1, "hello": 2, "world": 3, "again": 4}
+
+# Hidden state of each token id; padding gets a large vector that pooling must mask out
+HIDDEN = np.array([
+    [100.0, 100.0, 100.0],
+    [0.0, 0.0, 1.0],
+    [1.0, 0.0, 0.0],
+    [0.0, 2.0, 0.0],
+    [3.0, 0.0, 4.0]
+], dtype=np.float32)
+
+SENTENCES = ["hello", "hello world", "world again hello"]
+
+# Expected pooled vectors of SENTENCES, worked out by hand from HIDDEN
+POOLED = {
+    'mean': [[1.0, 0.0, 0.0], [0.5, 1.0, 0.0], [4 / 3, 2 / 3, 4 / 3]],
+    'max': [[1.0, 0.0, 0.0], [1.0, 2.0, 0.0], [3.0, 2.0, 4.0]],
+    'cls': [[1.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 2.0, 0.0]]
+}
+
+class FakeSession:
+    """Stands in for the ONNX graph: last_hidden_state is a lookup of HIDDEN"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input_ids"), SimpleNamespace(name="attention_mask")]
+
+    def run(self, outputs, inputs):
+        return [HIDDEN[inputs['input_ids']]]
+
+def write_model_dir(path, pooling, normalize):
+    tokenizer = tokenizers.Tokenizer(tokenizers.models.WordLevel(VOCAB, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.Whitespace()
+    tokenizer.save(str(path / onnx_encoder.TOKENIZER_FILE))
+    (path / onnx_encoder.MODEL_FILE).write_bytes(b"")
+    config = {
+        'model': "fixture",
+        'dimension': HIDDEN.shape[1],
+        'max_seq_length': 8,
+        'pooling': pooling,
+        'normalize': normalize,
+        'pad_token': "[PAD]",
+        'pad_token_id': 0
+    }
+    with open(path / onnx_encoder.CONFIG_FILE, 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+    return path
+
+@pytest.fixture
+def encoder_for(tmp_path, monkeypatch):
+    monkeypatch.setattr(onnx_encoder.onnxruntime, "InferenceSession", FakeSession)
+    return lambda pooling, normalize=False: OnnxEncoder(str(write_model_dir(tmp_path, pooling, normalize)))
+
+@pytest.mark.parametrize("pooling", ["mean", "max", "cls"])
+def test_pooling_matches_fixture(encoder_for, pooling):
+    embeddings = encoder_for(pooling).encode(SENTENCES)
+    np.testing.assert_allclose(embeddings, POOLED[pooling], rtol=1e-6)
+
+def test_normalized_and_batched_in_input_order(encoder_for):
+    encoder = encoder_for("mean", normalize=True)
+    expected = np.array(POOLED['mean'])
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+
+    # Batches are formed longest first; rows must still follow the input
+    np.testing.assert_allclose(encoder.encode(SENTENCES, batch_size=2), expected, rtol=1e-6)
+    np.testing.assert_allclose(encoder.encode(SENTENCES[1]), expected[1], rtol=1e-6)
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    pytest.importorskip("torch")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    from app.core.config import get_settings
+
+    model_name = get_settings().SBERT_MODEL
+    try:
+        reference = sentence_transformers.SentenceTransformer(model_name, device="cpu")
+    except OSError as e:
+        pytest.skip(f"{model_name} is not available: {e}")
+    output = tmp_path_factory.mktemp("onnx")
+    onnx_encoder.export(model_name, str(output))
+    return reference, output
+
+@pytest.mark.parametrize("quantized, tolerance", [(False, 1e-4), (True, 0.02)])
+def test_onnx_matches_torch(exported, quantized, tolerance):
+    reference, output = exported
+    sentences = [
+        "Senior Python developer with 7 years of Django and PostgreSQL",
+        "Registered nurse, ICU and emergency care",
+        "Kubernetes",
+        "Led a team of five building data pipelines on Spark and Airflow for retail analytics. " * 4
+    ]
+    expected = reference.encode(sentences, normalize_embeddings=True)
+    embeddings = OnnxEncoder(str(output), quantized=quantized).encode(sentences, normalize_embeddings=True)
+
+    cosine = (embeddings * expected).sum(axis=1)
+    assert cosine.min() >= 1 - tolerance
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from app.services.quantized_store import QuantizedVectorStore
+
+DIM = 32
+
+def unit_vectors(n, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def reopen(store):
+    """Simulate the owning process exiting and a new one loading its slot"""
+    store.flush()
+    if store._journal is not None:
+        store._journal.close()
+    store._slot_lock.close()
+    return QuantizedVectorStore(str(store.root), store.mode, store.rerank)
+
+@pytest.fixture(params=QuantizedVectorStore.MODES)
+def store(request, tmp_path):
+    return QuantizedVectorStore(str(tmp_path), request.param, rerank=64)
+
+def test_search_matches_exact_ranking(store):
+    vectors = unit_vectors(500)
+    store.add([f"d{i}" for i in range(500)], vectors)
+
+    for query in unit_vectors(20, seed=1):
+        exact = np.argsort(-(vectors @ query), kind='stable')[:5]
+        ids, scores = store.search(query, 5, rerank=500)
+        assert ids == [f"d{i}" for i in exact]
+        np.testing.assert_allclose(scores, (vectors @ query)[exact], rtol=1e-5)
+
+    # The quantized shortlist alone must keep each vector's own row on top
+    assert store.search(vectors[42], 1)[0] == ["d42"]
+
+def test_remove_and_replace(store):
+    vectors = unit_vectors(10)
+    store.add([f"d{i}" for i in range(10)], vectors)
+    store.remove(["d3"])
+    assert "d3" not in store
+    assert "d3" not in store.search(vectors[3], 10)[0]
+
+    store.add(["d4"], vectors[3])
+    assert len(store) == 9
+    assert store.search(vectors[3], 1)[0] == ["d4"]
+
+def test_journal_replays_changes_after_snapshot(store):
+    vectors = unit_vectors(30)
+    store.add([f"d{i}" for i in range(20)], vectors[:20])
+    store.save()
+    store.add([f"d{i}" for i in range(20, 30)], vectors[20:])
+    store.remove(["d0", "d25"])
+
+    # No save(): only the journal knows about the last add and remove
+    loaded = reopen(store)
+    assert loaded.directory == store.directory
+    assert sorted(loaded.ids()) == sorted(store.ids())
+    assert loaded.search(vectors[27], 1)[0] == ["d27"]
+    assert "d25" not in loaded.search(vectors[25], 30)[0]
+
+def test_torn_journal_line_is_ignored(store):
+    vectors = unit_vectors(5)
+    store.add([f"d{i}" for i in range(4)], vectors[:4])
+    store.save()
+    store.add(["d4"], vectors[4:])
+    store._journal.write('["+", 5, "d')
+    store._journal.flush()
+
+    loaded = reopen(store)
+    assert sorted(loaded.ids()) == [f"d{i}" for i in range(5)]
+
+def test_compaction_swaps_generation(store, monkeypatch):
+    monkeypatch.setattr(QuantizedVectorStore, "COMPACT_MIN_DEAD", 8)
+    vectors = unit_vectors(20)
+    store.add([f"d{i}" for i in range(20)], vectors)
+    old_directory = store._generation_dir(store.generation)
+
+    # Compaction starts once half the rows are dead
+    store.remove([f"d{i}" for i in range(9)])
+    assert store.generation == 0
+    store.remove(["d9"])
+    assert store.generation == 1
+    assert not old_directory.exists()
+    assert store._size == len(store) == 10
+    assert store.search(vectors[15], 1)[0] == ["d15"]
+
+    loaded = reopen(store)
+    assert loaded.generation == 1
+    assert sorted(loaded.ids()) == sorted(f"d{i}" for i in range(10, 20))
+    assert loaded.search(vectors[12], 1)[0] == ["d12"]
+
+def test_mode_mismatch_on_load(tmp_path):
+    store = QuantizedVectorStore(str(tmp_path), "int8")
+    store.add(["a"], unit_vectors(1))
+    store.save()
+    store._slot_lock.close()
+    with pytest.raises(ValueError):
+        QuantizedVectorStore(str(tmp_path), "binary")
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from app.routes.matching import decode_cursor, encode_cursor
+from app.services.candidate_table import CandidateTable
+from app.services.ml_service import MLService
+
+DIM = 8
+JOB = np.eye(DIM, dtype=np.float32)[0]
+
+def resumes(prefix, n, seed):
+    """Resumes drawn from a few distinct profiles, so many scores tie exactly"""
+    rng = np.random.default_rng(seed)
+    profiles = np.random.default_rng(0).normal(size=(4, DIM)).astype(np.float32)
+    return [
+        {
+            'file_id': f"{prefix}{i:03d}",
+            'filename': f"{prefix}{i:03d}.pdf",
+            'skills': ["python"] if i % 2 else ["python", "sql"],
+            'experience_years': (int(rng.integers(0, 6)), 0),
+            'embedding': profiles[rng.integers(4)]
+        }
+        for i in range(n)
+    ]
+
+@pytest.fixture(scope="module")
+def ml_service():
+    return MLService()
+
+def page(ml_service, table, limit, cursor=None):
+    after = None if cursor is None else decode_cursor("job", cursor)[0]
+    remaining, results = ml_service.rank_page(table, None, JOB, ["python", "sql"], 3, limit, after)
+    results = list(results)
+    next_cursor = encode_cursor("job", results[-1], 0) if results else None
+    return remaining, results, next_cursor
+
+def test_cursor_round_trip():
+    result = {'match_score': 61.23456789012345, 'file_id': "r042"}
+    assert decode_cursor("job", encode_cursor("job", result, 17)) == ((61.23456789012345, "r042"), 17)
+
+@pytest.mark.parametrize("cursor", ["not base64!", "bm90IGpzb24=", encode_cursor("other", {'match_score': 1.0, 'file_id': "a"}, 0)])
+def test_invalid_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as e:
+        decode_cursor("job", cursor)
+    assert e.value.status_code == 400
+
+def test_pages_cover_full_ranking_without_duplicates_or_gaps(ml_service):
+    table = CandidateTable.from_records(resumes("r", 50, seed=1))
+    _, full, _ = page(ml_service, table, 50)
+    scores = [result['match_score'] for result in full]
+    assert len(set(scores)) < len(scores)  # ties must be exercised
+
+    seen, cursor, remaining = [], None, 50
+    while True:
+        left, results, cursor = page(ml_service, table, 7, cursor)
+        assert left == remaining
+        if not results:
+            break
+        seen.extend(result['file_id'] for result in results)
+        remaining -= len(results)
+
+    assert seen == [result['file_id'] for result in full]
+
+def test_continuation_after_concurrent_uploads(ml_service):
+    table = CandidateTable.from_records(resumes("r", 30, seed=2))
+    _, first, cursor = page(ml_service, table, 10)
+
+    # New resumes land between pages; the cursor still resumes after the last row served
+    table.add(resumes("n", 20, seed=3))
+    rest = []
+    while cursor is not None:
+        _, results, cursor = page(ml_service, table, 10, cursor)
+        rest.extend(results)
+
+    served = [result['file_id'] for result in first + rest]
+    assert len(served) == len(set(served))
+    assert {f"r{i:03d}" for i in range(30)} <= set(served)
+
+    last = (first[-1]['match_score'], first[-1]['file_id'])
+    assert all((-result['match_score'], result['file_id']) > (-last[0], last[1]) for result in rest)
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from app.services.vector_index import IVFIndex
+
+DIM = 16
+
+def clustered(n, seed=0, clusters=32):
+    """Unit vectors around random centres, the shape IVF is built for"""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, DIM))
+    vectors = centres[rng.integers(clusters, size=n)] + 0.1 * rng.normal(size=(n, DIM))
+    return vectors.astype(np.float32)
+
+def recall(index, queries, k, nprobe=None):
+    hits = 0
+    for query in queries:
+        approximate, _ = index.search(query, k, nprobe=nprobe)
+        exact, _ = index.brute_force_search(query, k)
+        hits += len(set(approximate) & set(exact))
+    return hits / (k * len(queries))
+
+@pytest.fixture
+def trained():
+    index = IVFIndex(nprobe=8)
+    vectors = clustered(IVFIndex.MIN_TRAIN_SIZE + 500)
+    index.add([f"d{i}" for i in range(len(vectors))], vectors)
+    index.wait_for_training()
+    return index
+
+def test_exact_scan_before_training():
+    index = IVFIndex()
+    vectors = clustered(200)
+    index.add([f"d{i}" for i in range(200)], vectors)
+    assert not index.is_trained
+
+    ids, scores = index.search(vectors[7], 5)
+    assert ids == index.brute_force_search(vectors[7], 5)[0]
+    assert ids[0] == "d7"
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+    assert list(scores) == sorted(scores, reverse=True)
+
+def test_trains_in_background_once_large_enough(trained):
+    assert trained.is_trained
+    assert trained.trained_size == len(trained)
+    assert not trained.needs_training
+    assert sum(len(rows) for rows in trained._lists) == len(trained)
+
+def test_recall_against_brute_force(trained):
+    queries = clustered(50, seed=1)
+    assert recall(trained, queries, 10, nprobe=len(trained.centroids)) == 1.0
+    assert recall(trained, queries, 10) >= 0.9
+
+def test_add_after_training_is_searchable(trained):
+    vector = clustered(1, seed=2)
+    trained.add(["new"], vector)
+    assert trained.search(vector[0], 1)[0] == ["new"]
+
+def test_remove_and_replace(trained):
+    vector = trained._vectors[trained._rows["d3"]].copy()
+    trained.remove(["d3", "missing"])
+    assert "d3" not in trained
+    assert "d3" not in trained.search(vector, 20, nprobe=len(trained.centroids))[0]
+    assert "d3" not in trained.brute_force_search(vector, 20)[0]
+
+    # Re-adding an id replaces its vector rather than duplicating it
+    size = len(trained)
+    trained.add(["d4"], vector)
+    assert len(trained) == size
+    assert trained.search(vector, 1)[0] == ["d4"]
+
+def test_train_compacts_dead_rows(trained):
+    trained.remove([f"d{i}" for i in range(100)])
+    queries = clustered(20, seed=3)
+    before = [trained.brute_force_search(query, 5)[0] for query in queries]
+
+    trained.train()
+    assert trained._size == len(trained) == IVFIndex.MIN_TRAIN_SIZE + 400
+    assert trained._alive.all()
+    assert [trained.brute_force_search(query, 5)[0] for query in queries] == before
+    assert recall(trained, queries, 5, nprobe=len(trained.centroids)) == 1.0
+
+def test_save_and_load_round_trip(trained, tmp_path):
+    trained.remove(["d0", "d1"])
+    path = str(tmp_path / "index.npz")
+    trained.save(path)
+    loaded = IVFIndex.load(path)
+
+    assert sorted(loaded.ids()) == sorted(trained.ids())
+    assert loaded.trained_size == trained.trained_size
+    np.testing.assert_allclose(loaded.centroids, trained.centroids)
+    for query in clustered(10, seed=4):
+        assert loaded.search(query, 5)[0] == trained.search(query, 5)[0]
+
+def test_dimension_mismatch():
+    index = IVFIndex()
+    index.add(["a"], np.ones((1, DIM)))
+    with pytest.raises(ValueError):
+        index.add(["b"], np.ones((1, DIM + 1)))
+    with pytest.raises(ValueError):
+        index.add(["b", "c"], np.ones((1, DIM)))